@@ -0,0 +1,345 @@
+"""This script benchmarks the throughput of water boxes parameterized with the custom
+damped Buckingham and double exponential potentials, sweeping the number of molecules,
+the cutoff, the switch width, the nonbonded method, the combination of the parameters
+and the tabulation of the damped Buckingham potential.
+
+Each configuration is run in a fresh process so that its peak memory usage can be
+measured in isolation, and the results are appended as JSON lines to a file that can
+be compared between releases, e.g.
+
+    python benchmark.py --platforms CPU --n-molecules 256 1024 --output results.jsonl
+
+The spline tabulation is only expected to pay off on the GPU platforms, e.g.
+
+    python benchmark.py --platforms CUDA --tabulations none spline
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+from typing import Any, Dict, List
+
+import openmm
+import openmm.unit
+from openff.interchange import Interchange
+from openff.interchange.interop.openmm._positions import to_openmm_positions
+from openff.toolkit.typing.engines.smirnoff import ForceField, ParameterList
+from openff.units import unit
+from openff.units.openmm import ensure_quantity
+
+import smirnoff_plugins
+from smirnoff_plugins.utilities.openmm import water_box
+from smirnoff_plugins.utilities.timing import PhaseTimer
+
+
+def build_force_field(potential: str) -> ForceField:
+    """Construct a rigid water model whose vdW interactions are described by either
+    the damped Buckingham or the double exponential potential."""
+
+    force_field = ForceField(load_plugins=True)
+
+    constraint_handler = force_field.get_parameter_handler("Constraints")
+    constraint_handler.add_parameter(
+        {"smirks": "[#1:1]-[#8X2H2+0:2]-[#1]", "distance": 0.9572 * unit.angstrom}
+    )
+    constraint_handler.add_parameter(
+        {"smirks": "[#1:1]-[#8X2H2+0]-[#1:2]", "distance": 1.5139 * unit.angstrom}
+    )
+
+    force_field.get_parameter_handler("Electrostatics")
+
+    if potential == "DampedBuckingham68":
+        force_field.get_parameter_handler(
+            "ChargeIncrementModel",
+            {"version": "0.3", "partial_charge_method": "formal_charge"},
+        )
+
+        virtual_site_handler = force_field.get_parameter_handler("VirtualSites")
+        virtual_site_handler.add_parameter(
+            {
+                "smirks": "[#1:2]-[#8X2H2+0:1]-[#1:3]",
+                "type": "DivalentLonePair",
+                "distance": -0.0106 * unit.nanometers,
+                "outOfPlaneAngle": 0.0 * unit.degrees,
+                "match": "once",
+                "charge_increment1": 1.0552 * 0.5 * unit.elementary_charge,
+                "charge_increment2": 0.0 * unit.elementary_charge,
+                "charge_increment3": 1.0552 * 0.5 * unit.elementary_charge,
+            }
+        )
+        virtual_site_handler._parameters = ParameterList(
+            virtual_site_handler._parameters
+        )
+
+        buckingham_handler = force_field.get_parameter_handler(
+            "DampedBuckingham68",
+            {"version": "0.3", "gamma": unit.Quantity(35.8967 / unit.nanometer)},
+        )
+        buckingham_handler.add_parameter(
+            {
+                "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+                "a": 0.0 * unit.kilojoule_per_mole,
+                "b": 0.0 / unit.nanometer,
+                "c6": 0.0 * unit.kilojoule_per_mole * unit.nanometer**6,
+                "c8": 0.0 * unit.kilojoule_per_mole * unit.nanometer**8,
+            }
+        )
+        buckingham_handler.add_parameter(
+            {
+                "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+                "a": 1600000.0 * unit.kilojoule_per_mole,
+                "b": 42.00 / unit.nanometer,
+                "c6": 0.003 * unit.kilojoule_per_mole * unit.nanometer**6,
+                "c8": 0.00003 * unit.kilojoule_per_mole * unit.nanometer**8,
+            }
+        )
+
+    elif potential == "DoubleExponential":
+        library_charge = force_field.get_parameter_handler("LibraryCharges")
+        library_charge.add_parameter(
+            {
+                "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+                "charge1": -0.834 * unit.elementary_charge,
+            }
+        )
+        library_charge.add_parameter(
+            {
+                "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+                "charge1": 0.417 * unit.elementary_charge,
+            }
+        )
+
+        double_exponential_handler = force_field.get_parameter_handler(
+            "DoubleExponential"
+        )
+        double_exponential_handler.add_parameter(
+            {
+                "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+                "r_min": 3.5366 * unit.angstrom,
+                "epsilon": 0.152 * unit.kilocalorie_per_mole,
+            }
+        )
+        double_exponential_handler.add_parameter(
+            {
+                "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+                "r_min": 1.0 * unit.angstrom,
+                "epsilon": 0.0 * unit.kilocalorie_per_mole,
+            }
+        )
+
+    else:
+        raise NotImplementedError(f"Unsupported potential: {potential}")
+
+    return force_field
+
+
+def run_configuration(configuration: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameterize, build a context for and simulate a single configuration, returning
+    its timings and peak memory usage."""
+
+    force_field = build_force_field(configuration["potential"])
+
+    handler = force_field.get_parameter_handler(configuration["potential"])
+    handler.cutoff = configuration["cutoff"] * unit.angstrom
+    handler.switch_width = configuration["switch_width"] * unit.angstrom
+    handler.method = configuration["method"]
+
+    handler.combination = configuration["combination"]
+
+    if configuration["tabulation"] != "none":
+        handler.tabulation = configuration["tabulation"]
+
+    timer = PhaseTimer()
+
+    topology, positions = water_box(configuration["n_molecules"], random_seed=0)
+
+    with timer.phase("interchange"):
+        interchange = Interchange.from_smirnoff(
+            force_field=force_field, topology=topology, positions=positions
+        )
+
+    with timer.phase("to_openmm"):
+        system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    openmm_positions = ensure_quantity(
+        to_openmm_positions(interchange, include_virtual_sites=True), "openmm"
+    )
+
+    timestep = 2.0 * openmm.unit.femtoseconds
+
+    with timer.phase("context"):
+        integrator = openmm.LangevinMiddleIntegrator(
+            300.0 * openmm.unit.kelvin, 1.0 / openmm.unit.picosecond, timestep
+        )
+        context = openmm.Context(
+            system,
+            integrator,
+            openmm.Platform.getPlatformByName(configuration["platform"]),
+        )
+        context.setPeriodicBoxVectors(*topology.box_vectors.to_openmm())
+        context.setPositions(openmm_positions)
+        context.computeVirtualSites()
+
+        # Include the first evaluation, which may compile the kernels of the platform.
+        context.getState(getEnergy=True)
+
+    with timer.phase("minimization"):
+        openmm.LocalEnergyMinimizer.minimize(context, maxIterations=100)
+
+    context.setVelocitiesToTemperature(300.0 * openmm.unit.kelvin)
+
+    # Equilibrate briefly so that the timed steps do not include any warm-up.
+    integrator.step(10)
+
+    with timer.phase("md"):
+        integrator.step(configuration["n_steps"])
+        # Wait for the platform to finish the queued steps.
+        context.getState(getEnergy=True)
+
+    simulated_time = configuration["n_steps"] * timestep.value_in_unit(
+        openmm.unit.nanoseconds
+    )
+
+    return {
+        **configuration,
+        "n_particles": system.getNumParticles(),
+        "phases": dict(timer.phases),
+        "ns_per_day": simulated_time / timer.phases["md"] * 86400.0,
+        # ``ru_maxrss`` is reported in kilobytes on Linux but in bytes on macOS.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024.0**2 if sys.platform == "darwin" else 1024.0),
+    }
+
+
+def configurations(
+    potentials: List[str],
+    n_molecules: List[int],
+    cutoffs: List[float],
+    switch_widths: List[float],
+    methods: List[str],
+    combinations: List[str],
+    tabulations: List[str],
+    platforms: List[str],
+    n_steps: int,
+) -> List[Dict[str, Any]]:
+    """Return every combination of the swept settings which the potentials support."""
+
+    return [
+        {
+            "potential": potential,
+            "n_molecules": n,
+            "cutoff": cutoff,
+            "switch_width": switch_width,
+            "method": method,
+            "combination": combination,
+            "tabulation": tabulation,
+            "platform": platform_name,
+            "n_steps": n_steps,
+        }
+        for (
+            potential,
+            n,
+            cutoff,
+            switch_width,
+            method,
+            combination,
+            tabulation,
+            platform_name,
+        ) in itertools.product(
+            potentials,
+            n_molecules,
+            cutoffs,
+            switch_widths,
+            methods,
+            combinations,
+            tabulations,
+            platforms,
+        )
+        # Only the damped Buckingham potential supports a PME dispersion and tables.
+        if method == "cutoff" or potential == "DampedBuckingham68"
+        if tabulation == "none" or potential == "DampedBuckingham68"
+        # The switch must start inside the cutoff.
+        if switch_width < cutoff
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--potentials",
+        nargs="+",
+        default=["DampedBuckingham68", "DoubleExponential"],
+    )
+    parser.add_argument(
+        "--n-molecules", nargs="+", type=int, default=[256, 1024, 4096, 32768]
+    )
+    parser.add_argument(
+        "--cutoffs", nargs="+", type=float, default=[9.0, 12.0], help="in angstrom"
+    )
+    parser.add_argument(
+        "--switch-widths", nargs="+", type=float, default=[0.0, 1.0], help="in angstrom"
+    )
+    parser.add_argument("--methods", nargs="+", default=["cutoff", "PME"])
+    parser.add_argument(
+        "--combinations",
+        nargs="+",
+        default=["per-particle"],
+        choices=["per-particle", "pair-table"],
+    )
+    parser.add_argument(
+        "--tabulations", nargs="+", default=["none"], choices=["none", "spline"]
+    )
+    parser.add_argument(
+        "--platforms",
+        nargs="+",
+        default=["CPU"],
+        choices=["CPU", "Reference", "OpenCL", "CUDA"],
+    )
+    parser.add_argument("--n-steps", type=int, default=500)
+    parser.add_argument("--output", default="benchmark-results.jsonl")
+
+    args = parser.parse_args()
+
+    metadata = {
+        "smirnoff_plugins": smirnoff_plugins.__version__,
+        "openmm": openmm.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "n_cpus": os.cpu_count(),
+    }
+
+    # Spawn a fresh process per configuration so the peak memory usage of one does
+    # not carry over into the next.
+    context = multiprocessing.get_context("spawn")
+
+    for configuration in configurations(
+        args.potentials,
+        args.n_molecules,
+        args.cutoffs,
+        args.switch_widths,
+        args.methods,
+        args.combinations,
+        args.tabulations,
+        args.platforms,
+        args.n_steps,
+    ):
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(run_configuration, (configuration,))
+            except Exception as e:
+                result = {**configuration, "error": f"{type(e).__name__}: {e}"}
+
+        result.update(metadata)
+
+        print(json.dumps(result))
+
+        with open(args.output, "a") as file:
+            file.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,11 @@
 """This script provides an example of how to construct a force field for a four site
 water model which uses a custom Buckingham potential to describe the non-bonded vdW
 interactions."""
-import math
-
-import numpy
 import openmm.unit
-from openff.toolkit.topology import Molecule, Topology
 from openff.toolkit.typing.engines.smirnoff import ForceField, ParameterList
 from openff.units import unit
 
-from smirnoff_plugins.utilities.openmm import simulate
+from smirnoff_plugins.utilities.openmm import simulate, water_box
 
 
 def build_force_field() -> ForceField:
@@ -90,38 +86,10 @@ def main():
     force_field = build_force_field()
     force_field.to_file("buckingham-force-field.offxml")
 
-    # Create a topology containing water molecules.
-    molecule: Molecule = Molecule.from_mapped_smiles("[H:2][O:1][H:3]")
-    molecule.generate_conformers(n_conformers=1)
-
+    # Create a box of randomly oriented water molecules (without the v-sites).
     n_molecules = 256
 
-    conformer = molecule.conformers[0].m_as(unit.angstrom)
-
-    # Remove the conformers from the molecule to work around an Interchange bug,
-    # otherwise the hand-crafted positions defined later would be ignored.
-    # https://github.com/openforcefield/openff-interchange/issues/616
-    molecule._conformers = None
-
-    topology: Topology = Topology.from_molecules([molecule] * n_molecules)
-
-    # Create some coordinates (without the v-sites) and estimate box vectors.
-    topology.box_vectors = unit.Quantity(
-        numpy.eye(3) * math.ceil(n_molecules ** (1 / 3) + 2) * 2.5,
-        unit.angstrom,
-    )
-
-    positions = openmm.unit.Quantity(
-        numpy.vstack(
-            [
-                (conformer + numpy.array([[x, y, z]]) * 2.5)
-                for x in range(math.ceil(n_molecules ** (1 / 3)))
-                for y in range(math.ceil(n_molecules ** (1 / 3)))
-                for z in range(math.ceil(n_molecules ** (1 / 3)))
-            ]
-        ),
-        openmm.unit.angstrom,
-    )
+    topology, positions = water_box(n_molecules, random_seed=0)
 
     # Simulate the water box.
     simulate(
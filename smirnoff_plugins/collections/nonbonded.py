@@ -1,7 +1,27 @@
+import copy
+import logging
 import math
-from typing import Dict, Iterable, Literal, Type, TypeVar
+from collections import Counter
+from typing import (
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from openff.interchange.exceptions import InvalidParameterHandlerError
+import numpy
+import openmm
+from openff.interchange.exceptions import (
+    InvalidParameterHandlerError,
+    UnsupportedExportError,
+)
+from openff.interchange.models import PotentialKey, TopologyKey, VirtualSiteKey
 from openff.interchange.smirnoff._nonbonded import (
     SMIRNOFFvdWCollection,
     _SMIRNOFFNonbondedCollection,
@@ -15,9 +35,80 @@ from smirnoff_plugins.handlers.nonbonded import (
     DampedBuckingham68Handler,
     DoubleExponentialHandler,
 )
+from smirnoff_plugins.utilities.contexts import get_context_pool
+from smirnoff_plugins.utilities.expressions import (
+    PairKernel,
+    compile_pair_expression,
+    expressions_agree,
+    join_expression,
+    replace_definitions,
+    split_expression,
+)
+from smirnoff_plugins.utilities.profiling import benchmark_expression
 
 T = TypeVar("T", bound="_NonbondedPlugin")
 
+logger = logging.getLogger(__name__)
+
+# The lattice sum of the C6 dispersion is evaluated by an LJPME NonbondedForce whose
+# particles share a sigma small enough that the r^-12 term vanishes, so that the mixed
+# C6 coefficients follow a geometric combining rule.
+_DISPERSION_PME_SIGMA = 0.01
+_DISPERSION_PME_TOLERANCE = 1.0e-5
+
+# The OpenMM methods of the custom nonbonded force and of the electrostatics that each
+# of the non-periodic plugin methods maps onto.
+_NONPERIODIC_METHODS = {
+    "no-cutoff": (
+        openmm.CustomNonbondedForce.NoCutoff,
+        openmm.NonbondedForce.NoCutoff,
+    ),
+    "cutoff-nonperiodic": (
+        openmm.CustomNonbondedForce.CutoffNonPeriodic,
+        openmm.NonbondedForce.CutoffNonPeriodic,
+    ),
+}
+
+# The force group of the attractive forces when a collection splits its repulsion into
+# a separate force, which a multiple time step integrator evaluates once per outer step
+# while every force in group 0 is evaluated at each inner step.
+SLOW_FORCE_GROUP = 1
+# The force group of the repulsive forces whose repulsion cutoff differs from the
+# cutoff of the other nonbonded forces, as the CUDA and OpenCL platforms require every
+# nonbonded force in a force group to share the same cutoff. A multiple time step
+# integrator evaluates it alongside group 0 at each inner step.
+REPULSION_FORCE_GROUP = 2
+
+
+def _copy_nonbonded_force_settings(
+    source: openmm.CustomNonbondedForce, target: openmm.CustomNonbondedForce
+):
+    """Copy everything but the energy expression, the per-particle parameters and the
+    particles themselves from one custom nonbonded force to another."""
+    target.setName(source.getName())
+    target.setForceGroup(source.getForceGroup())
+
+    target.setNonbondedMethod(source.getNonbondedMethod())
+    target.setCutoffDistance(source.getCutoffDistance())
+    target.setUseSwitchingFunction(source.getUseSwitchingFunction())
+    target.setSwitchingDistance(source.getSwitchingDistance())
+    target.setUseLongRangeCorrection(source.getUseLongRangeCorrection())
+
+    for i in range(source.getNumGlobalParameters()):
+        target.addGlobalParameter(
+            source.getGlobalParameterName(i), source.getGlobalParameterDefaultValue(i)
+        )
+    for i in range(source.getNumTabulatedFunctions()):
+        target.addTabulatedFunction(
+            source.getTabulatedFunctionName(i),
+            copy.deepcopy(source.getTabulatedFunction(i)),
+        )
+
+    for i in range(source.getNumExclusions()):
+        target.addExclusion(*source.getExclusionParticles(i))
+    for i in range(source.getNumInteractionGroups()):
+        target.addInteractionGroup(*source.getInteractionGroupParameters(i))
+
 
 class _NonbondedPlugin(_SMIRNOFFNonbondedCollection):
 
@@ -28,6 +119,12 @@ class _NonbondedPlugin(_SMIRNOFFNonbondedCollection):
     mixing_rule: str = ""
     switch_width: FloatQuantity["angstrom"] = unit.Quantity(1.0, unit.angstrom)  # noqa
 
+    combination: Literal["per-particle", "pair-table"] = "per-particle"
+    long_range_correction: Optional[Literal["analytic"]] = None
+    derived_terms: Literal["constant", "expression"] = "constant"
+    splitting: Optional[Literal["repulsion"]] = None
+    repulsion_cutoff: Optional[FloatQuantity["angstrom"]] = None  # noqa
+
     @classmethod
     def check_openmm_requirements(cls: Type[T], combine_nonbonded_forces: bool):
         """SMIRNOFF plugins using non-LJ functional forms cannot combine forces."""
@@ -38,11 +135,631 @@ class _NonbondedPlugin(_SMIRNOFFNonbondedCollection):
         """Return an iterable of global parameters, i.e. not per-potential parameters."""
         return tuple()
 
+    @classmethod
+    def handler_options(cls: Type[T]) -> Iterable[str]:
+        """Return an iterable of handler attributes which control how the OpenMM force is
+        built, but which are not passed to the force as parameters."""
+        return (
+            "combination",
+            "long_range_correction",
+            "derived_terms",
+            "splitting",
+            "repulsion_cutoff",
+        )
+
+    def derived_term_expressions(self) -> Dict[str, str]:
+        """Return the OpenMM expressions which evaluate each of the pre-computed terms
+        from the global parameters, for use when ``derived_terms`` is ``"expression"``.
+
+        As with any OpenMM expression, a definition may only reference the definitions
+        which follow it.
+        """
+        return {}
+
+    def split_energy(self) -> Tuple[str, str]:
+        """Split the leading energy term of the expression into the steep short-range
+        repulsion and the smoother attraction, which sum to the original term and may
+        reference any of its definitions."""
+        raise NotImplementedError(
+            f"The {self.type} plugin does not define how its energy is split, which is "
+            f"required when the splitting is 'repulsion' or a repulsion cutoff is set."
+        )
+
+    def mix_parameters(
+        self, parameters_1: Dict[str, float], parameters_2: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Combine the modified per-particle parameters of two particles into the pair
+        parameters that are referenced by the energy expression.
+
+        When ``combination`` is ``"pair-table"`` this is evaluated once per pair of
+        particle types to build the pair parameter tables, and so it may be overridden
+        to implement arbitrary combining rules or pair specific overrides at no cost.
+        NBFIX-style overrides are applied by subclassing a collection and returning
+        different pair parameters for the particular pairs of per-particle parameters,
+        and then replacing the collection in ``interchange.collections`` with an
+        instance of the subclass, or registering it as a plugin, before the system is
+        created. Overrides only affect the energy with ``"pair-table"``, as otherwise
+        the parameters are mixed within the energy expression itself.
+        """
+        raise NotImplementedError(
+            f"The {self.type} plugin does not define how its parameters are mixed, "
+            f"which is required when the combination is 'pair-table' or the "
+            f"long-range correction is 'analytic'."
+        )
+
+    def is_non_interacting(self, parameters: Dict[str, float]) -> bool:
+        """Return whether a particle with the given modified per-particle parameters has
+        a vanishing interaction with every other particle, in which case it is left out
+        of the pairs that OpenMM evaluates."""
+        return False
+
+    def pair_energy(
+        self, r: numpy.ndarray, pair_parameters: Dict[str, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """Evaluate the pair energy [kJ/mol] at distances ``r`` [nm] for the pair
+        parameters returned by ``mix_parameters``, broadcasting over both."""
+        raise NotImplementedError(
+            f"The {self.type} plugin does not define its pair energy, which is required "
+            f"when the long-range correction is 'analytic'."
+        )
+
+    def long_range_coefficient(
+        self, particle_parameters: Iterable[Sequence[float]], n_nodes: int = 64
+    ) -> float:
+        """Return the coefficient ``K`` [kJ/mol nm^3] of the long-range correction
+        ``K / V`` for a set of particles.
+
+        The tail of every pair beyond the cutoff, plus the part of the pair energy
+        removed by the switching function, is integrated once per pair of particle
+        classes using Gauss-Legendre quadrature.
+
+        Parameters
+        ----------
+        particle_parameters
+            The modified per-particle parameters of every particle, in the order of
+            ``potential_parameters``.
+        n_nodes
+            The number of quadrature nodes to use for each integration interval.
+        """
+        parameter_names = list(self.potential_parameters())
+
+        class_counts = Counter(tuple(parameters) for parameters in particle_parameters)
+        classes = [
+            dict(zip(parameter_names, parameters)) for parameters in class_counts
+        ]
+        counts = list(class_counts.values())
+
+        class_pairs = [
+            (i, j) for i in range(len(classes)) for j in range(i, len(classes))
+        ]
+
+        if len(class_pairs) == 0:
+            return 0.0
+
+        pair_counts = numpy.array(
+            [counts[i] * counts[j] * (1.0 if i == j else 2.0) for i, j in class_pairs]
+        )
+        mixed_parameters = [
+            self.mix_parameters(classes[i], classes[j]) for i, j in class_pairs
+        ]
+        pair_parameters = {
+            name: numpy.array([parameters[name] for parameters in mixed_parameters])[
+                :, None
+            ]
+            for name in mixed_parameters[0]
+        }
+
+        cutoff = self.cutoff.m_as(unit.nanometer)
+        switch_width = self.switch_width.m_as(unit.nanometer)
+
+        nodes, weights = numpy.polynomial.legendre.leggauss(n_nodes)
+        u, weights = 0.5 * (nodes + 1.0), 0.5 * weights
+
+        # Integrate the tail from the cutoff to infinity by substituting r = cutoff / u.
+        r = cutoff / u
+        integrals = (
+            self._long_range_pair_energy(r, pair_parameters) * r**2 * cutoff / u**2
+        ) @ weights
+
+        if switch_width > 0.0:
+            r = cutoff - switch_width + switch_width * u
+            switch = 1.0 - 10.0 * u**3 + 15.0 * u**4 - 6.0 * u**5
+
+            integrals += (
+                self._long_range_pair_energy(r, pair_parameters)
+                * r**2
+                * (1.0 - switch)
+            ) @ (weights * switch_width)
+
+        return float(2.0 * math.pi * pair_counts @ integrals)
+
+    def _long_range_pair_energy(
+        self, r: numpy.ndarray, pair_parameters: Dict[str, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """The part of the pair energy which is truncated at the cutoff, and so needs
+        to be included in the long-range correction."""
+        return self.pair_energy(r, pair_parameters)
+
+    def _long_range_parameter(self) -> str:
+        """The name of the global parameter which stores the long-range coefficient."""
+        return f"{self.type}LongRangeCoefficient"
+
+    def global_parameter_values(self) -> Dict[str, float]:
+        """Return the values of the global parameters and pre-computed terms which are
+        referenced by the energy expression."""
+        values = {
+            **{
+                global_parameter: getattr(self, global_parameter)
+                for global_parameter in self.global_parameters()
+            },
+            **self.pre_computed_terms(),
+        }
+        return {
+            name: float(getattr(value, "m", value)) for name, value in values.items()
+        }
+
+    def compile_numpy_kernel(self) -> PairKernel:
+        """Compile the energy expression of this collection into a NumPy function which
+        returns the pair energies [kJ/mol] and their derivatives with respect to the
+        pair distance [kJ/mol/nm] for arrays of distances [nm] and of the modified
+        per-particle parameters of both particles in each pair."""
+        return compile_pair_expression(
+            self.expression, self.potential_parameters(), self.global_parameter_values()
+        )
+
+    def modify_parameter_derivatives(
+        self,
+        original_parameters: Dict[str, unit.Quantity],
+    ) -> Dict[str, float]:
+        """Return the derivatives of each parameter returned by ``modify_parameters``
+        with respect to the corresponding original parameter, in the unit that the
+        original parameter is stored in."""
+        raise NotImplementedError(
+            f"The {self.type} plugin does not define the derivatives of its modified "
+            f"parameters, which are required by evaluate_parameter_gradients."
+        )
+
+    def expression_variants(self) -> Dict[str, str]:
+        """Return the mathematically equivalent forms of the energy expression, keyed by
+        name, which ``optimize_expression`` chooses between.
+
+        Any variant must keep the names of the definitions which the OpenMM force is
+        later modified through, e.g. when tabulating the expression.
+        """
+        return {"default": self.__fields__["expression"].default}
+
+    def optimize_expression(
+        self,
+        platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "CPU",
+        n_particles: int = 2000,
+        n_repeats: int = 10,
+        rtol: float = 1.0e-6,
+    ) -> Dict[str, float]:
+        """Replace the energy expression with the fastest of its variants.
+
+        Each variant is first checked to give the same pair energies and forces as the
+        current expression for random pair distances within the cutoff and random
+        pairs of the parameters of this collection, and is otherwise discarded. The
+        remaining variants are timed on a periodic box of particles.
+
+        Parameters
+        ----------
+        platform
+            The platform to time the variants on, which should be that the system
+            will be simulated on.
+        n_particles
+            The number of particles in the box to time the variants on.
+        n_repeats
+            The number of times to evaluate each variant.
+        rtol
+            The tolerance, relative to the largest magnitude of the energies and of
+            their derivatives, within which a variant must agree with the expression.
+
+        Returns
+        -------
+            The mean time in seconds of evaluating each of the verified variants.
+        """
+        parameter_names = list(self.potential_parameters())
+        global_parameters = self.global_parameter_values()
+
+        particle_parameters = numpy.array(
+            [
+                list(self.modify_parameters(potential.parameters).values())
+                for potential in self.potentials.values()
+            ]
+            or [list(self.default_parameter_values())],
+            dtype=float,
+        ).reshape(-1, len(parameter_names))
+
+        cutoff = self.cutoff.m_as(unit.nanometer)
+
+        random = numpy.random.default_rng(0)
+        n_samples = 1000
+
+        r = random.uniform(0.1 * cutoff, cutoff, n_samples)
+        parameters_1, parameters_2 = (
+            dict(zip(parameter_names, particle_parameters[indices].T))
+            for indices in random.integers(0, len(particle_parameters), (2, n_samples))
+        )
+
+        timings = {}
+
+        for name, expression in self.expression_variants().items():
+            if not expressions_agree(
+                self.expression,
+                expression,
+                parameter_names,
+                global_parameters,
+                r,
+                parameters_1,
+                parameters_2,
+                rtol,
+            ):
+                logger.warning(
+                    f"The {name} form of the {self.type} expression does not agree with "
+                    f"the current expression and will not be used."
+                )
+                continue
+
+            timings[name] = benchmark_expression(
+                expression,
+                parameter_names,
+                global_parameters,
+                particle_parameters,
+                cutoff,
+                n_particles,
+                platform,
+                n_repeats,
+            )
+
+            logger.debug(f"The {name} form took {timings[name]:.6f} seconds.")
+
+        if len(timings) > 0:
+            self.expression = self.expression_variants()[min(timings, key=timings.get)]
+
+        return timings
+
+    def particle_parameters(self, topology: Topology) -> numpy.ndarray:
+        """Return the modified per-particle parameters of every atom in a topology with
+        shape=(n_atoms, n_parameters), in the order of ``potential_parameters``. Atoms
+        without a potential are assigned the default parameter values."""
+        n_atoms = topology.n_atoms
+
+        particle_parameters = numpy.array(
+            [list(self.default_parameter_values())] * n_atoms, dtype=float
+        ).reshape(n_atoms, -1)
+
+        for topology_key, potential_key in self.key_map.items():
+            if isinstance(topology_key, VirtualSiteKey):
+                continue
+
+            particle_parameters[topology_key.atom_indices[0]] = list(
+                self.modify_parameters(
+                    self.potentials[potential_key].parameters
+                ).values()
+            )
+
+        return particle_parameters
+
+    def _conformer_pairs(
+        self, topology: Topology
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """Return the indices of every interacting pair of atoms in a topology, the
+        scale factor applied to each pair and the modified per-particle parameters of
+        every atom."""
+        n_atoms = topology.n_atoms
+        particle_parameters = self.particle_parameters(topology)
+
+        # Scale the pairs separated by up to four bonds in the same way as the 1-2, 1-3,
+        # 1-4 and 1-5 pairs of the OpenMM system.
+        neighbours: List[List[int]] = [[] for _ in range(n_atoms)]
+
+        for bond in topology.bonds:
+            index_1 = topology.atom_index(bond.atom1)
+            index_2 = topology.atom_index(bond.atom2)
+
+            neighbours[index_1].append(index_2)
+            neighbours[index_2].append(index_1)
+
+        scales = numpy.ones((n_atoms, n_atoms))
+
+        for index in range(n_atoms):
+            visited, shell = {index}, [index]
+
+            for separation in range(1, 5):
+                shell = [
+                    neighbour
+                    for atom in shell
+                    for neighbour in neighbours[atom]
+                    if neighbour not in visited
+                ]
+                visited.update(shell)
+
+                scales[index, shell] = getattr(self, f"scale_1{separation + 1}")
+
+        parameter_names = list(self.potential_parameters())
+
+        interacting = [
+            index
+            for index in range(n_atoms)
+            if not self.is_non_interacting(
+                dict(zip(parameter_names, particle_parameters[index]))
+            )
+        ]
+        pairs = numpy.array(
+            [
+                (index_1, index_2)
+                for i, index_1 in enumerate(interacting)
+                for index_2 in interacting[i + 1 :]
+                if scales[index_1, index_2] != 0.0
+            ],
+            dtype=int,
+        ).reshape(-1, 2)
+
+        return pairs, scales[pairs[:, 0], pairs[:, 1]], particle_parameters
+
+    def evaluate_conformers(
+        self,
+        topology: Topology,
+        conformers: unit.Quantity,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Evaluate the energy and forces of this collection for a batch of gas-phase
+        conformers of a topology using NumPy, i.e. without building an OpenMM context.
+
+        All pairs of atoms are included without a cutoff, and the 1-2 to 1-5 pairs are
+        scaled in the same way as when exporting to OpenMM. Virtual sites are ignored.
+
+        Parameters
+        ----------
+        topology
+            The topology that this collection was created for.
+        conformers
+            The coordinates of the atoms with shape=(n_conformers, n_atoms, 3).
+        chunk_size
+            The number of conformers to evaluate at once. By default this is chosen so
+            that each chunk evaluates at most roughly a million pairs, which bounds the
+            memory used for intermediate terms.
+
+        Returns
+        -------
+            The energies [kJ/mol] with shape=(n_conformers,) and the forces [kJ/mol/nm]
+            with shape=(n_conformers, n_atoms, 3).
+        """
+        n_atoms = topology.n_atoms
+
+        coordinates = numpy.asarray(conformers.m_as(unit.nanometer), dtype=float)
+        coordinates = coordinates.reshape(-1, n_atoms, 3)
+
+        n_conformers = len(coordinates)
+
+        pairs, scales, particle_parameters = self._conformer_pairs(topology)
+
+        parameter_names = list(self.potential_parameters())
+        parameters_1, parameters_2 = (
+            {
+                name: particle_parameters[pairs[:, i], j]
+                for j, name in enumerate(parameter_names)
+            }
+            for i in (0, 1)
+        )
+
+        if chunk_size is None:
+            chunk_size = max(1, 2**20 // max(1, len(pairs)))
+
+        kernel = self.compile_numpy_kernel()
+
+        energies = numpy.zeros(n_conformers)
+        forces = numpy.zeros((n_conformers, n_atoms, 3))
+
+        for start in range(0, n_conformers, chunk_size):
+            chunk = coordinates[start : start + chunk_size]
+            n_chunk = len(chunk)
+
+            vectors = chunk[:, pairs[:, 1]] - chunk[:, pairs[:, 0]]
+            r = numpy.linalg.norm(vectors, axis=-1)
+
+            pair_energies, pair_derivatives, _ = kernel(r, parameters_1, parameters_2)
+
+            energies[start : start + n_chunk] = (pair_energies * scales).sum(axis=-1)
+
+            # The force on the second atom of each pair, and minus that on the first.
+            pair_forces = (-pair_derivatives * scales / r)[:, :, None] * vectors
+
+            offsets = numpy.arange(n_chunk)[:, None] * n_atoms
+            index_1 = (offsets + pairs[:, 0]).ravel()
+            index_2 = (offsets + pairs[:, 1]).ravel()
+
+            for axis in range(3):
+                weights = pair_forces[:, :, axis].ravel()
+
+                forces[start : start + n_chunk, :, axis] = (
+                    numpy.bincount(index_2, weights, minlength=n_chunk * n_atoms)
+                    - numpy.bincount(index_1, weights, minlength=n_chunk * n_atoms)
+                ).reshape(n_chunk, n_atoms)
+
+        return energies, forces
+
+    def evaluate_parameter_gradients(
+        self,
+        topology: Topology,
+        conformers: unit.Quantity,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Evaluate the energy of this collection and its analytic derivatives with
+        respect to every potential and global parameter for a batch of gas-phase
+        conformers of a topology using NumPy.
+
+        The pairs are selected and scaled as in ``evaluate_conformers``. Particles with
+        a vanishing interaction are left out, and so do not contribute to the gradient.
+
+        Parameters
+        ----------
+        topology
+            The topology that this collection was created for.
+        conformers
+            The coordinates of the atoms with shape=(n_conformers, n_atoms, 3).
+        chunk_size
+            The number of conformers to evaluate at once, by default chosen as in
+            ``evaluate_conformers``.
+
+        Returns
+        -------
+            The energies [kJ/mol] with shape=(n_conformers,) and the Jacobian of the
+            energies with shape=(n_conformers, n_parameters), whose columns are
+            labelled by ``parameter_labels`` and are in kJ/mol per the unit that each
+            parameter is stored in.
+        """
+        n_atoms = topology.n_atoms
+
+        coordinates = numpy.asarray(conformers.m_as(unit.nanometer), dtype=float)
+        coordinates = coordinates.reshape(-1, n_atoms, 3)
+
+        n_conformers = len(coordinates)
+
+        pairs, scales, particle_parameters = self._conformer_pairs(topology)
+
+        parameter_names = list(self.potential_parameters())
+        global_names = list(self.global_parameters())
+
+        parameters_1, parameters_2 = (
+            {
+                name: particle_parameters[pairs[:, i], j]
+                for j, name in enumerate(parameter_names)
+            }
+            for i in (0, 1)
+        )
+
+        # The column of, and the chain rule factor for, each modified parameter of
+        # every atom. Atoms without a potential keep a column of -1.
+        potential_indices = {
+            potential_key: i for i, potential_key in enumerate(self.potentials)
+        }
+
+        columns = numpy.full((n_atoms, len(parameter_names)), -1, dtype=int)
+        factors = numpy.zeros((n_atoms, len(parameter_names)))
+
+        for topology_key, potential_key in self.key_map.items():
+            if isinstance(topology_key, VirtualSiteKey):
+                continue
+
+            index = topology_key.atom_indices[0]
+
+            columns[index] = potential_indices[potential_key] * len(
+                parameter_names
+            ) + numpy.arange(len(parameter_names))
+            factors[index] = list(
+                self.modify_parameter_derivatives(
+                    self.potentials[potential_key].parameters
+                ).values()
+            )
+
+        n_potential_columns = len(self.potentials) * len(parameter_names)
+        n_columns = n_potential_columns + len(global_names)
+
+        # Differentiate through the derived terms so that the gradients with respect
+        # to the global parameters include their contribution via the derived terms.
+        energy, definitions = split_expression(self.expression)
+        kernel = compile_pair_expression(
+            join_expression(energy, {**definitions, **self.derived_term_expressions()}),
+            parameter_names,
+            self.global_parameter_values(),
+            [f"{name}{i}" for name in parameter_names for i in (1, 2)] + global_names,
+        )
+
+        if chunk_size is None:
+            chunk_size = max(1, 2**20 // max(1, len(pairs)))
+
+        energies = numpy.zeros(n_conformers)
+        jacobian = numpy.zeros((n_conformers, n_columns))
+
+        for start in range(0, n_conformers, chunk_size):
+            chunk = coordinates[start : start + chunk_size]
+            n_chunk = len(chunk)
+
+            r = numpy.linalg.norm(
+                chunk[:, pairs[:, 1]] - chunk[:, pairs[:, 0]], axis=-1
+            )
+
+            pair_energies, _, derivatives = kernel(r, parameters_1, parameters_2)
+
+            energies[start : start + n_chunk] = (pair_energies * scales).sum(axis=-1)
+
+            offsets = numpy.arange(n_chunk)[:, None] * n_columns
+
+            for j, name in enumerate(parameter_names):
+                for i in (0, 1):
+                    pair_columns = columns[pairs[:, i], j]
+                    valid = pair_columns >= 0
+
+                    pair_derivatives = (
+                        derivatives[f"{name}{i + 1}"][:, valid] * scales[valid]
+                    )
+                    # Avoid 0 * inf for modified parameters which are not
+                    # differentiable where they vanish but have no effect.
+                    with numpy.errstate(invalid="ignore"):
+                        weights = numpy.where(
+                            pair_derivatives == 0.0,
+                            0.0,
+                            pair_derivatives * factors[pairs[valid, i], j],
+                        )
+
+                    jacobian[start : start + n_chunk] += numpy.bincount(
+                        (offsets + pair_columns[valid]).ravel(),
+                        weights.ravel(),
+                        minlength=n_chunk * n_columns,
+                    ).reshape(n_chunk, n_columns)
+
+            for j, name in enumerate(global_names):
+                jacobian[start : start + n_chunk, n_potential_columns + j] = (
+                    derivatives[name] * scales
+                ).sum(axis=-1)
+
+        return energies, jacobian
+
     # This method could be copy-pasted intead of monkey-patched. It's defined in the default
     # vdW class (SMIRNOFFvdWCollection), not the base non-bonded class
     # (_SMIRNOFF_NonbondedCollection) so it's not brought in by _NonbondedPlugin.
     store_potentials = SMIRNOFFvdWCollection.store_potentials
 
+    def store_matches(
+        self,
+        parameter_handler: ParameterHandler,
+        topology: Topology,
+    ):
+        """Populate the key map with the parameters matched to every atom.
+
+        Each unique molecule in the topology is only matched once, and the resulting
+        keys are replicated onto every identical copy of it by offsetting the atom
+        indices, so that the cost scales with the number of unique molecules rather
+        than the number of atoms.
+        """
+        key_map: Dict[TopologyKey, PotentialKey] = {}
+
+        for unique_index, group in topology.identical_molecule_groups.items():
+            matches = parameter_handler.find_matches(
+                topology.molecule(unique_index).to_topology()
+            )
+
+            for molecule_index, atom_map in group:
+                offset = topology.molecule_atom_start_index(
+                    topology.molecule(molecule_index)
+                )
+
+                for atom_indices, match in matches.items():
+                    topology_key = TopologyKey(
+                        atom_indices=tuple(offset + atom_map[i] for i in atom_indices)
+                    )
+                    key_map[topology_key] = PotentialKey(
+                        id=match.parameter_type.smirks,
+                        associated_handler=parameter_handler.TAGNAME,
+                    )
+
+        # Keep the keys in the same atom order as matching the whole topology would.
+        self.key_map = dict(
+            sorted(key_map.items(), key=lambda item: item[0].atom_indices)
+        )
+
     @classmethod
     def create(
         cls: Type[T],
@@ -69,6 +786,9 @@ class _NonbondedPlugin(_SMIRNOFFNonbondedCollection):
         for global_parameter in cls.global_parameters():
             _args[global_parameter] = getattr(parameter_handler, global_parameter)
 
+        for option in cls.handler_options():
+            _args[option] = getattr(parameter_handler, option)
+
         handler = cls(**_args)
 
         handler.store_matches(parameter_handler=parameter_handler, topology=topology)
@@ -76,6 +796,593 @@ class _NonbondedPlugin(_SMIRNOFFNonbondedCollection):
 
         return handler
 
+    def _find_openmm_forces(self, system: openmm.System) -> List[int]:
+        """Find the indices of the custom nonbonded forces that evaluate this
+        collection, i.e. the force that Interchange created or the forces it was split
+        into."""
+        parameter_names = list(self.potential_parameters())
+
+        return [
+            force_index
+            for force_index, force in enumerate(system.getForces())
+            if isinstance(force, openmm.CustomNonbondedForce)
+            and [
+                force.getPerParticleParameterName(i)
+                for i in range(force.getNumPerParticleParameters())
+            ]
+            == parameter_names
+        ]
+
+    def _find_openmm_force(self, system: openmm.System) -> Optional[int]:
+        """Find the index of the custom nonbonded force that Interchange created for
+        this collection."""
+        force_indices = self._find_openmm_forces(system)
+        return force_indices[0] if len(force_indices) > 0 else None
+
+    def parameter_vector(self) -> numpy.ndarray:
+        """Return the potential parameters of every stored potential as a flat vector,
+        ordered first by potential and then as in ``potential_parameters``, with each
+        value in the unit it is stored in."""
+        return numpy.array(
+            [
+                potential.parameters[name].m
+                for potential in self.potentials.values()
+                for name in self.potential_parameters()
+            ]
+        )
+
+    def parameter_labels(self) -> List[Tuple[str, str]]:
+        """Return the ``(id, name)`` label of every column of the Jacobian returned by
+        ``evaluate_parameter_gradients``, i.e. of every element of ``parameter_vector``
+        followed by the global parameters, whose id is the collection type."""
+        return [
+            (potential_key.id, name)
+            for potential_key in self.potentials
+            for name in self.potential_parameters()
+        ] + [(self.type, name) for name in self.global_parameters()]
+
+    def set_parameter_vector(self, vector: Sequence[float]):
+        """Replace the potential parameters of every stored potential with the values of
+        a vector in the same order and units as returned by ``parameter_vector``."""
+        parameter_names = list(self.potential_parameters())
+
+        assert len(vector) == len(self.potentials) * len(parameter_names), (
+            "the parameter vector must contain one value per parameter of every "
+            "potential."
+        )
+
+        for i, potential in enumerate(self.potentials.values()):
+            for j, name in enumerate(parameter_names):
+                potential.parameters[name] = unit.Quantity(
+                    float(vector[i * len(parameter_names) + j]),
+                    potential.parameters[name].units,
+                )
+
+    def update_potentials(self, parameter_handler: ParameterHandler):
+        """Replace the stored potentials with the parameters of a modified copy of the
+        parameter handler that this collection was created from."""
+        self.store_potentials(parameter_handler=parameter_handler)  # type: ignore[misc]
+
+    def update_openmm_forces(
+        self, system: openmm.System, context: Optional[openmm.Context] = None
+    ):
+        """Push the current potentials of this collection into the forces of an OpenMM
+        system that was previously created from it, and optionally into a context that
+        was created for that system, without rebuilding either.
+
+        The per-particle parameters of every atom are recomputed through
+        ``modify_parameters``, alongside those of the scaled 1-4 pairs and of any
+        forces which depend on them such as the analytic long-range correction. Virtual
+        sites keep their current parameters.
+
+        The particles which do not interact are skipped through an interaction group,
+        which is rebuilt in the system if needed. It cannot be changed within a
+        context, however, and so a context must be recreated once a particle which was
+        skipped starts to interact, e.g. a hydrogen whose parameters were zero.
+
+        The system is invalidated in the context pool, so that the energy evaluation
+        utilities do not reuse a context created for its previous parameters.
+
+        Parameters
+        ----------
+        system
+            The system to update.
+        context
+            The optional context to update.
+
+        Raises
+        ------
+        ValueError
+            If the parameters are stored in pair tables, or a context is given and a
+            particle which is skipped by it now interacts.
+        """
+        if self.combination == "pair-table":
+            raise ValueError(
+                "Pair parameter tables cannot be updated in place, the system must be "
+                "rebuilt instead."
+            )
+
+        forces = [
+            system.getForce(force_index)
+            for force_index in self._find_openmm_forces(system)
+        ]
+
+        if len(forces) == 0:
+            raise ValueError(f"The system does not contain a {self.type} force.")
+
+        values = {
+            potential_key: list(self.modify_parameters(potential.parameters).values())
+            for potential_key, potential in self.potentials.items()
+        }
+
+        # Interchange adds every atom in topology order, but virtual sites may be placed
+        # either after all atoms or after the atoms of each molecule.
+        atom_particles = [
+            i for i in range(system.getNumParticles()) if not system.isVirtualSite(i)
+        ]
+
+        particle_values = {
+            atom_particles[topology_key.atom_indices[0]]: values[potential_key]
+            for topology_key, potential_key in self.key_map.items()
+            if not isinstance(topology_key, VirtualSiteKey)
+        }
+
+        # Check the interaction groups before changing anything, so that the system is
+        # left untouched if the context cannot be updated.
+        interaction_groups = [
+            self._interaction_group(force, particle_values, context) for force in forces
+        ]
+
+        for force, interaction_group in zip(forces, interaction_groups):
+            for particle, particle_value in particle_values.items():
+                force.setParticleParameters(particle, particle_value)
+
+            if interaction_group is not None:
+                force.setInteractionGroupParameters(
+                    0, interaction_group, interaction_group
+                )
+
+        updated_forces = [*forces, *self._update_dependent_forces(system, forces[0])]
+
+        global_values = self.global_parameter_values()
+
+        for updated_force in updated_forces:
+            for i in range(updated_force.getNumGlobalParameters()):
+                name = updated_force.getGlobalParameterName(i)
+
+                if name in global_values:
+                    updated_force.setGlobalParameterDefaultValue(i, global_values[name])
+
+        get_context_pool().invalidate(system)
+
+        if context is None:
+            return
+
+        for name, value in global_values.items():
+            context.setParameter(name, value)
+
+        for updated_force in updated_forces:
+            if isinstance(updated_force, openmm.CustomVolumeForce):
+                context.setParameter(
+                    self._long_range_parameter(),
+                    updated_force.getGlobalParameterDefaultValue(0),
+                )
+            else:
+                updated_force.updateParametersInContext(context)
+
+    def _interaction_group(
+        self,
+        force: openmm.CustomNonbondedForce,
+        particle_values: Dict[int, List[float]],
+        context: Optional[openmm.Context],
+    ) -> Optional[List[int]]:
+        """Return the particles which interact once the per-particle parameters of a
+        force are updated, if they differ from those in its interaction group, or
+        ``None`` if the interaction group is unchanged or the force has none."""
+        if force.getNumInteractionGroups() == 0:
+            return None
+
+        parameter_names = list(self.potential_parameters())
+
+        interacting = [
+            i
+            for i in range(force.getNumParticles())
+            if not self.is_non_interacting(
+                dict(
+                    zip(
+                        parameter_names,
+                        particle_values.get(i, force.getParticleParameters(i)),
+                    )
+                )
+            )
+        ]
+
+        group, _ = force.getInteractionGroupParameters(0)
+
+        if set(interacting) == set(group):
+            return None
+
+        if context is None:
+            return interacting
+
+        # Particles which no longer interact only add pairs of zero energy, and so the
+        # interaction group is kept in step with that of the context.
+        if set(interacting).issubset(group):
+            return None
+
+        raise ValueError(
+            f"The updated {self.type} parameters make particles interact which are "
+            f"skipped by the context, whose interaction groups cannot be changed. The "
+            f"context must be recreated from the updated system instead."
+        )
+
+    def update_global_parameters(
+        self,
+        system: openmm.System,
+        context: Optional[openmm.Context] = None,
+        **values: unit.Quantity,
+    ):
+        """Change global parameters of this collection, such as ``gamma`` or ``alpha``
+        and ``beta``, and push them alongside the terms derived from them into a system
+        previously created from this collection and optionally a live context.
+
+        Parameters
+        ----------
+        system
+            The system to update.
+        context
+            The optional context to update.
+        values
+            The new values of the global parameters to change.
+        """
+        for name, value in values.items():
+            if name not in self.global_parameters():
+                raise ValueError(f"{name} is not a global parameter of {self.type}.")
+
+            setattr(self, name, value)
+
+        self.update_openmm_forces(system, context)
+
+    def _update_dependent_forces(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ) -> List[openmm.Force]:
+        """Refresh any forces whose parameters are derived from the per-particle
+        parameters of the custom nonbonded force of this collection, returning those
+        which need to be pushed into a context."""
+        particle_parameters = [
+            list(force.getParticleParameters(i)) for i in range(force.getNumParticles())
+        ]
+
+        parameter_names = list(self.potential_parameters())
+        updated_forces: List[openmm.Force] = []
+
+        for pair_force in self._pair_forces(system):
+            for i in range(pair_force.getNumBonds()):
+                particle_1, particle_2, _ = pair_force.getBondParameters(i)
+                pair_force.setBondParameters(
+                    i,
+                    particle_1,
+                    particle_2,
+                    [
+                        particle_parameters[particle][j]
+                        for j in range(len(parameter_names))
+                        for particle in (particle_1, particle_2)
+                    ],
+                )
+
+            updated_forces.append(pair_force)
+
+        for other_force in system.getForces():
+            if (
+                isinstance(other_force, openmm.CustomVolumeForce)
+                and other_force.getName() == f"{self.type} long-range correction"
+            ):
+                other_force.setGlobalParameterDefaultValue(
+                    0, self.long_range_coefficient(particle_parameters)
+                )
+                updated_forces.append(other_force)
+
+        return updated_forces
+
+    def _add_global_parameters(self, force: openmm.CustomNonbondedForce):
+        """Add the global parameters and pre-computed terms of this collection to a force
+        in the same way Interchange does."""
+        for name, value in self.global_parameter_values().items():
+            force.addGlobalParameter(name, value)
+
+    def modify_openmm_forces(
+        self,
+        interchange,
+        system: openmm.System,
+        add_constrained_forces: bool,
+        constrained_pairs,
+        particle_map,
+    ):
+        """Apply any optional modifications requested through the parameter handler to
+        the custom nonbonded force that Interchange created for this collection."""
+        force_index = self._find_openmm_force(system)
+
+        if force_index is None:
+            return
+
+        force_index = self._modify_openmm_force(system, force_index)
+
+        if self.splitting == "repulsion" or self.repulsion_cutoff is not None:
+            self._split_openmm_force(system, force_index)
+
+    def _modify_openmm_force(self, system: openmm.System, force_index: int) -> int:
+        """Modify, or replace, the custom nonbonded force of this collection and return
+        the index of the force in the system afterwards."""
+
+        if self.method in _NONPERIODIC_METHODS:
+            self._use_nonperiodic_method(system, system.getForce(force_index))
+
+        if self.derived_terms == "expression":
+            self._use_derived_term_expressions(system, system.getForce(force_index))
+
+        self._skip_non_interacting_particles(system.getForce(force_index))
+
+        if self.long_range_correction == "analytic":
+            self._add_long_range_correction(system, system.getForce(force_index))
+
+        if self.combination == "pair-table":
+            force_index = self._tabulate_pair_parameters(system, force_index)
+
+        return force_index
+
+    def _split_openmm_force(self, system: openmm.System, force_index: int) -> int:
+        """Replace a force with one that evaluates only the repulsion and one that
+        evaluates only the attraction, returning the index of the repulsion force.
+
+        When ``splitting`` is ``"repulsion"`` the attraction is moved to the slow force
+        group, alongside the forces derived from this collection which only contribute
+        to it, e.g. the analytic long-range correction. When ``repulsion_cutoff`` is set
+        the repulsion is truncated at it, and its tail beyond it is neglected. If it
+        differs from the cutoff, the repulsion is moved to its own force group.
+        """
+        force = system.getForce(force_index)
+
+        if self.repulsion_cutoff is not None and (
+            force.getNonbondedMethod() == openmm.CustomNonbondedForce.NoCutoff
+        ):
+            raise UnsupportedExportError(
+                "A repulsion cutoff can only be used alongside a cutoff."
+            )
+
+        _, definitions = split_expression(force.getEnergyFunction())
+
+        split_forces = []
+
+        for energy in self.split_energy():
+            split_force = openmm.CustomNonbondedForce(
+                join_expression(energy, definitions)
+            )
+            _copy_nonbonded_force_settings(force, split_force)
+
+            for i in range(force.getNumPerParticleParameters()):
+                split_force.addPerParticleParameter(
+                    force.getPerParticleParameterName(i)
+                )
+            for i in range(force.getNumParticles()):
+                split_force.addParticle(force.getParticleParameters(i))
+
+            split_forces.append(split_force)
+
+        repulsion_force, attraction_force = split_forces
+
+        attraction_force.setName(f"{self.type} attraction")
+
+        if self.repulsion_cutoff is not None:
+            repulsion_cutoff = self.repulsion_cutoff.m_as(unit.nanometer)
+
+            if self.repulsion_cutoff > self.cutoff:
+                raise UnsupportedExportError(
+                    "The repulsion cutoff cannot be longer than the cutoff."
+                )
+
+            repulsion_force.setCutoffDistance(repulsion_cutoff)
+
+            if force.getUseSwitchingFunction():
+                switch_width = self.switch_width.m_as(unit.nanometer)
+
+                if switch_width >= repulsion_cutoff:
+                    raise UnsupportedExportError(
+                        "The switch width must be shorter than the repulsion cutoff."
+                    )
+
+                repulsion_force.setSwitchingDistance(repulsion_cutoff - switch_width)
+
+            if repulsion_cutoff != self.cutoff.m_as(unit.nanometer):
+                repulsion_force.setForceGroup(REPULSION_FORCE_GROUP)
+
+        if self.splitting == "repulsion":
+            attraction_force.setForceGroup(SLOW_FORCE_GROUP)
+
+            for other_force in system.getForces():
+                if other_force.getName() in {
+                    f"{self.type} long-range correction",
+                    f"{self.type} dispersion PME",
+                }:
+                    other_force.setForceGroup(SLOW_FORCE_GROUP)
+
+        system.removeForce(force_index)
+
+        force_index = system.addForce(repulsion_force)
+        system.addForce(attraction_force)
+
+        return force_index
+
+    def _pair_forces(self, system: openmm.System) -> List[openmm.CustomBondForce]:
+        """Find the custom bond forces that Interchange created to evaluate the scaled
+        1-4 interactions of this collection."""
+        pair_parameter_names = [
+            f"{name}{i}" for name in self.potential_parameters() for i in (1, 2)
+        ]
+
+        return [
+            force
+            for force in system.getForces()
+            if isinstance(force, openmm.CustomBondForce)
+            and [
+                force.getPerBondParameterName(i)
+                for i in range(force.getNumPerBondParameters())
+            ]
+            == pair_parameter_names
+        ]
+
+    def _use_nonperiodic_method(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ):
+        """Evaluate a force and the electrostatics without periodic images.
+
+        OpenMM requires every nonbonded force to agree on whether a cutoff is applied,
+        and so the electrostatics use the matching method: plain Coulomb with
+        ``"no-cutoff"``, or with ``"cutoff-nonperiodic"`` Coulomb shifted to vanish at,
+        and truncated at, the electrostatics cutoff. The latter is OpenMM's reaction
+        field with its dielectric set to one, so that it does not screen the charges.
+        """
+        custom_method, electrostatics_method = _NONPERIODIC_METHODS[self.method]
+
+        force.setNonbondedMethod(custom_method)
+        force.setUseLongRangeCorrection(False)
+
+        if self.method == "no-cutoff":
+            force.setUseSwitchingFunction(False)
+        else:
+            cutoff = self.cutoff.m_as(unit.nanometer)
+            switch_width = self.switch_width.m_as(unit.nanometer)
+
+            force.setCutoffDistance(cutoff)
+            force.setUseSwitchingFunction(switch_width > 0.0)
+
+            if switch_width > 0.0:
+                force.setSwitchingDistance(cutoff - switch_width)
+
+        for other_force in system.getForces():
+            if isinstance(other_force, openmm.NonbondedForce):
+                other_force.setNonbondedMethod(electrostatics_method)
+                other_force.setReactionFieldDielectric(1.0)
+
+    def _use_derived_term_expressions(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ):
+        """Evaluate the pre-computed terms from the global parameters within the energy
+        expressions of a force and its scaled 1-4 interactions.
+
+        The definitions take precedence over the global parameters of the same name,
+        which are left in place but no longer referenced.
+        """
+        derived_terms = self.derived_term_expressions()
+
+        for other_force in [force, *self._pair_forces(system)]:
+            energy, definitions = split_expression(other_force.getEnergyFunction())
+            other_force.setEnergyFunction(
+                join_expression(energy, {**definitions, **derived_terms})
+            )
+
+    def _skip_non_interacting_particles(self, force: openmm.CustomNonbondedForce):
+        """Restrict the pairs evaluated by a force to those between particles which
+        actually interact, e.g. skipping every pair involving a zero-parameter hydrogen
+        or virtual site."""
+        if force.getNumInteractionGroups() > 0:
+            return
+
+        parameter_names = list(self.potential_parameters())
+
+        interacting = [
+            i
+            for i in range(force.getNumParticles())
+            if not self.is_non_interacting(
+                dict(zip(parameter_names, force.getParticleParameters(i)))
+            )
+        ]
+
+        if len(interacting) == force.getNumParticles():
+            return
+
+        force.addInteractionGroup(interacting, interacting)
+
+    def _add_long_range_correction(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ):
+        """Replace the long-range correction that OpenMM integrates numerically for a
+        force with a volume-dependent force whose coefficient is computed once."""
+        if force.getNonbondedMethod() != openmm.CustomNonbondedForce.CutoffPeriodic:
+            return
+
+        force.setUseLongRangeCorrection(False)
+
+        coefficient = self.long_range_coefficient(
+            force.getParticleParameters(i) for i in range(force.getNumParticles())
+        )
+
+        correction = openmm.CustomVolumeForce(f"{self._long_range_parameter()}/v")
+        correction.addGlobalParameter(self._long_range_parameter(), coefficient)
+        correction.setName(f"{self.type} long-range correction")
+        correction.setForceGroup(force.getForceGroup())
+
+        system.addForce(correction)
+
+    def _tabulate_pair_parameters(self, system: openmm.System, force_index: int) -> int:
+        """Replace a force which combines per-particle parameters for every pair with one
+        that assigns each particle an integer type and looks up pre-mixed pair
+        parameters from discrete tables."""
+        force = system.getForce(force_index)
+
+        parameter_names = list(self.potential_parameters())
+
+        particle_parameters = [
+            tuple(force.getParticleParameters(i))
+            for i in range(force.getNumParticles())
+        ]
+        # Every unique set of per-particle parameters, including the default values of
+        # particles without parameters such as virtual sites, defines a type.
+        particle_types = {
+            parameters: type_index
+            for type_index, parameters in enumerate(dict.fromkeys(particle_parameters))
+        }
+        n_types = len(particle_types)
+
+        pair_parameters = {
+            (type_1, type_2): self.mix_parameters(
+                dict(zip(parameter_names, parameters_1)),
+                dict(zip(parameter_names, parameters_2)),
+            )
+            for parameters_1, type_1 in particle_types.items()
+            for parameters_2, type_2 in particle_types.items()
+        }
+        pair_parameter_names = list(pair_parameters[0, 0])
+
+        pair_force = openmm.CustomNonbondedForce(
+            replace_definitions(
+                force.getEnergyFunction(),
+                {name: f"{name}Table(type1,type2)" for name in pair_parameter_names},
+            )
+        )
+        _copy_nonbonded_force_settings(force, pair_force)
+
+        for name in pair_parameter_names:
+            pair_force.addTabulatedFunction(
+                f"{name}Table",
+                openmm.Discrete2DFunction(
+                    n_types,
+                    n_types,
+                    [
+                        pair_parameters[type_1, type_2][name]
+                        for type_2 in range(n_types)
+                        for type_1 in range(n_types)
+                    ],
+                ),
+            )
+
+        pair_force.addPerParticleParameter("type")
+
+        for parameters in particle_parameters:
+            pair_force.addParticle([particle_types[parameters]])
+
+        system.removeForce(force_index)
+        return system.addForce(pair_force)
+
 
 class SMIRNOFFDampedBuckingham68Collection(_NonbondedPlugin):
     """Collection storing damped Buckingham potentials."""
@@ -104,8 +1411,32 @@ class SMIRNOFFDampedBuckingham68Collection(_NonbondedPlugin):
         "mdr=-gamma*r;"
     )
 
+    # The same expression with the damping polynomials in Horner form, reusing the
+    # C6 polynomial within the C8 one and fewer powers of 1/r.
+    horner_expression: ClassVar[str] = (
+        "buckinghamRepulsion-c6E*c6-c8E*c8;"
+        "c6=c61*c62;"
+        "c8=c81*c82;"
+        "c6E=invR6-expTerm*damping6;"
+        "c8E=invR8-expTerm*(d8+invR*(d7+invR*damping6));"
+        "damping6=d6+invR*(d5+invR*(d4+invR*(d3+invR*(d2+invR*(gamma+invR)))));"
+        "buckinghamRepulsion=combinedA*exp(-combinedB*r);"
+        "combinedA=a1*a2;"
+        "combinedB=b1*b2;"
+        "invR8=invR6*invR2;"
+        "invR6=invR2*invR2*invR2;"
+        "invR2=invR*invR;"
+        "invR=1.0/r;"
+        "expTerm=exp(-gamma*r);"
+    )
+
     gamma: FloatQuantity["nanometer ** -1"]  # noqa
 
+    tabulation: Optional[Literal["spline"]] = None
+    tabulation_spacing: FloatQuantity["nanometer"] = unit.Quantity(  # noqa
+        0.0005, unit.nanometer
+    )
+
     @classmethod
     def allowed_parameter_handlers(cls) -> Iterable[Type[ParameterHandler]]:
         """Return an interable of allowed types of ParameterHandler classes."""
@@ -131,6 +1462,12 @@ class SMIRNOFFDampedBuckingham68Collection(_NonbondedPlugin):
         """Return an iterable of global parameters, i.e. not per-potential parameters."""
         return ("gamma",)
 
+    @classmethod
+    def handler_options(cls) -> Iterable[str]:
+        """Return an iterable of handler attributes which control how the OpenMM force is
+        built, but which are not passed to the force as parameters."""
+        return (*super().handler_options(), "tabulation", "tabulation_spacing")
+
     def pre_computed_terms(self) -> Dict[str, unit.Quantity]:
         """Return a dictionary of pre-computed terms for use in the expression."""
         d2 = self.gamma.m**2 * 0.5
@@ -143,22 +1480,448 @@ class SMIRNOFFDampedBuckingham68Collection(_NonbondedPlugin):
 
         return {"d2": d2, "d3": d3, "d4": d4, "d5": d5, "d6": d6, "d7": d7, "d8": d8}
 
-    def modify_parameters(
-        self,
-        original_parameters: Dict[str, unit.Quantity],
-    ) -> Dict[str, float]:
-        """Optionally modify parameters prior to their being stored in a force."""
-        _units = {
+    def derived_term_expressions(self) -> Dict[str, str]:
+        """Return the OpenMM expressions which evaluate each of the pre-computed terms
+        from the global parameters."""
+        return {
+            "d8": "d7*gamma*0.125",
+            "d7": "d6*gamma*0.1428571429",
+            "d6": "d5*gamma*0.1666666667",
+            "d5": "d4*gamma*0.2",
+            "d4": "d3*gamma*0.25",
+            "d3": "d2*gamma*0.3333333333",
+            "d2": "gamma^2*0.5",
+        }
+
+    def split_energy(self) -> Tuple[str, str]:
+        return "buckinghamRepulsion", "-c6E*c6-c8E*c8"
+
+    def expression_variants(self) -> Dict[str, str]:
+        return {**super().expression_variants(), "horner": self.horner_expression}
+
+    @classmethod
+    def _parameter_units(cls) -> Dict[str, unit.Unit]:
+        """The units that the potential parameters are converted to before being
+        modified."""
+        return {
             "a": unit.kilojoule_per_mole,
             "b": unit.nanometer**-1,
             "c6": unit.kilojoule_per_mole * unit.nanometer**6,
             "c8": unit.kilojoule_per_mole * unit.nanometer**8,
         }
+
+    def modify_parameters(
+        self,
+        original_parameters: Dict[str, unit.Quantity],
+    ) -> Dict[str, float]:
+        """Optionally modify parameters prior to their being stored in a force."""
+        _units = self._parameter_units()
         return {
             name: math.sqrt(original_parameters[name].m_as(_units[name]))
             for name in self.potential_parameters()
         }
 
+    def modify_parameter_derivatives(
+        self,
+        original_parameters: Dict[str, unit.Quantity],
+    ) -> Dict[str, float]:
+        """Return the derivatives of each parameter returned by ``modify_parameters``
+        with respect to the corresponding original parameter, in the unit that the
+        original parameter is stored in."""
+        _units = self._parameter_units()
+        derivatives = {}
+
+        for name in self.potential_parameters():
+            value = original_parameters[name]
+            conversion = unit.Quantity(1.0, value.units).m_as(_units[name])
+
+            modified = math.sqrt(value.m_as(_units[name]))
+            derivatives[name] = (
+                math.inf if modified == 0.0 else 0.5 * conversion / modified
+            )
+
+        return derivatives
+
+    def mix_parameters(
+        self, parameters_1: Dict[str, float], parameters_2: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Combine the modified per-particle parameters of two particles into the pair
+        parameters that are referenced by the energy expression."""
+        return {
+            "combinedA": parameters_1["a"] * parameters_2["a"],
+            "combinedB": parameters_1["b"] * parameters_2["b"],
+            "c6": parameters_1["c6"] * parameters_2["c6"],
+            "c8": parameters_1["c8"] * parameters_2["c8"],
+        }
+
+    def is_non_interacting(self, parameters: Dict[str, float]) -> bool:
+        """Return whether a particle with the given modified per-particle parameters has
+        a vanishing interaction with every other particle."""
+        return (
+            parameters["a"] == 0.0
+            and parameters["c6"] == 0.0
+            and parameters["c8"] == 0.0
+        )
+
+    def _damping_remainders(self, r: numpy.ndarray) -> Dict[int, numpy.ndarray]:
+        """Return the fraction of the C6 and C8 dispersion at distances ``r`` [nm] that
+        is removed by the Tang-Toennies damping, i.e. exp(-gamma r) sum_k (gamma r)^k / k!
+        """
+        x = self.gamma.m_as(unit.nanometer**-1) * r
+
+        terms = numpy.ones_like(x)
+        total = numpy.ones_like(x)
+
+        remainders = {}
+
+        for k in range(1, 9):
+            terms = terms * x / k
+            total = total + terms
+
+            if k in (6, 8):
+                remainders[k] = numpy.exp(-x) * total
+
+        return remainders
+
+    def pair_energy(
+        self, r: numpy.ndarray, pair_parameters: Dict[str, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """Evaluate the pair energy [kJ/mol] at distances ``r`` [nm] for the pair
+        parameters returned by ``mix_parameters``, broadcasting over both."""
+        remainders = self._damping_remainders(r)
+
+        return (
+            pair_parameters["combinedA"] * numpy.exp(-pair_parameters["combinedB"] * r)
+            - pair_parameters["c6"] * (1.0 - remainders[6]) / r**6
+            - pair_parameters["c8"] * (1.0 - remainders[8]) / r**8
+        )
+
+    def _damping_tables(self, n_points: int, cutoff: float) -> Dict[int, List[float]]:
+        """Tabulate the fraction of the C6 and C8 dispersion that is removed by the
+        Tang-Toennies damping on a uniform grid between zero and the cutoff (in nm).
+
+        Tabulating the removed fraction rather than the damped function itself means
+        the undamped tail is still evaluated analytically beyond the cutoff, e.g. when
+        computing the long-range correction.
+        """
+        return {
+            k: remainder.tolist()
+            for k, remainder in self._damping_remainders(
+                numpy.linspace(0.0, cutoff, n_points)
+            ).items()
+        }
+
+    def _tabulate_openmm_force(self, force: openmm.CustomNonbondedForce):
+        """Replace the analytic damping and repulsion terms of a force with spline tables."""
+        cutoff = self.cutoff.m_as(unit.nanometer)
+        spacing = self.tabulation_spacing.m_as(unit.nanometer)
+
+        n_points = max(int(math.ceil(cutoff / spacing)) + 1, 2)
+
+        # The repulsion is tabulated as a function of combinedB * r so that a single
+        # table covers every pair of particles. The pairs are mixed from the potentials
+        # rather than read from the force, whose particles only store a type index when
+        # pair tables are used.
+        parameters = [
+            self.modify_parameters(potential.parameters)
+            for potential in self.potentials.values()
+        ]
+
+        maximum_b = max(
+            [
+                self.mix_parameters(parameters_1, parameters_2)["combinedB"]
+                for parameters_1 in parameters
+                for parameters_2 in parameters
+            ],
+            default=0.0,
+        )
+        maximum_x = max(maximum_b * cutoff, spacing)
+
+        damping_tables = self._damping_tables(n_points, cutoff)
+
+        force.addTabulatedFunction(
+            "tabulatedDamping6",
+            openmm.Continuous1DFunction(damping_tables[6], 0.0, cutoff),
+        )
+        force.addTabulatedFunction(
+            "tabulatedDamping8",
+            openmm.Continuous1DFunction(damping_tables[8], 0.0, cutoff),
+        )
+        force.addTabulatedFunction(
+            "tabulatedRepulsion",
+            openmm.Continuous1DFunction(
+                numpy.exp(-numpy.linspace(0.0, maximum_x, n_points)).tolist(),
+                0.0,
+                maximum_x,
+            ),
+        )
+
+        # The undamped C6 dispersion is evaluated by the lattice sum when using PME.
+        c6_expression = (
+            "-invR6*tabulatedDamping6(r)"
+            if self.method == "pme"
+            else "invR6*(1-tabulatedDamping6(r))"
+        )
+
+        force.setEnergyFunction(
+            replace_definitions(
+                force.getEnergyFunction(),
+                {
+                    "c6E": c6_expression,
+                    "c8E": "invR8*(1-tabulatedDamping8(r))",
+                    "buckinghamRepulsion": "combinedA*tabulatedRepulsion(combinedB*r)",
+                },
+            )
+        )
+
+    def update_global_parameters(
+        self,
+        system: openmm.System,
+        context: Optional[openmm.Context] = None,
+        **values: unit.Quantity,
+    ):
+        if self.tabulation == "spline" and "gamma" in values:
+            raise ValueError(
+                "The damping of tabulated DampedBuckingham68 potentials is stored in "
+                "spline tables that were computed from gamma when the system was "
+                "created, and so gamma cannot be changed in place. The system must be "
+                "rebuilt instead."
+            )
+
+        super().update_global_parameters(system, context, **values)
+
+    def _long_range_pair_energy(
+        self, r: numpy.ndarray, pair_parameters: Dict[str, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """The part of the pair energy which is truncated at the cutoff, and so needs
+        to be included in the long-range correction."""
+        energy = self.pair_energy(r, pair_parameters)
+
+        if self.method == "pme":
+            energy = energy + pair_parameters["c6"] / r**6
+
+        return energy
+
+    def _remove_undamped_dispersion(self, force: openmm.CustomNonbondedForce):
+        """Remove the undamped C6 dispersion from a force, leaving only the short-range
+        damping correction to it."""
+        _, definitions = split_expression(force.getEnergyFunction())
+
+        # Every form of the expression defines the damped dispersion as the undamped
+        # term minus its damping.
+        assert definitions["c6E"].startswith("invR6-")
+
+        force.setEnergyFunction(
+            replace_definitions(
+                force.getEnergyFunction(),
+                {"c6E": f"-({definitions['c6E'][len('invR6-'):]})"},
+            )
+        )
+
+    @staticmethod
+    def _dispersion_pme_parameters(c6: float) -> Tuple[float, float, float]:
+        """Return the charge, sigma and epsilon of a particle in the LJPME force whose
+        modified C6 parameter is ``c6``."""
+        return 0.0, _DISPERSION_PME_SIGMA, c6**2 / (4.0 * _DISPERSION_PME_SIGMA**6)
+
+    def _update_dependent_forces(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ) -> List[openmm.Force]:
+        """Refresh any forces whose parameters are derived from the per-particle
+        parameters of the custom nonbonded force of this collection, returning those
+        which need to be pushed into a context."""
+        updated_forces = super()._update_dependent_forces(system, force)
+
+        c6_index = list(self.potential_parameters()).index("c6")
+
+        for other_force in system.getForces():
+            if (
+                not isinstance(other_force, openmm.NonbondedForce)
+                or other_force.getName() != f"{self.type} dispersion PME"
+            ):
+                continue
+
+            for i in range(force.getNumParticles()):
+                other_force.setParticleParameters(
+                    i,
+                    *self._dispersion_pme_parameters(
+                        force.getParticleParameters(i)[c6_index]
+                    ),
+                )
+
+            updated_forces.append(other_force)
+
+        return updated_forces
+
+    def _add_dispersion_pme_force(
+        self, system: openmm.System, force: openmm.CustomNonbondedForce
+    ):
+        """Add an LJPME force which evaluates the undamped C6 dispersion of every pair
+        that is not excluded from the custom nonbonded force.
+
+        This is used when ``method`` is ``"pme"``, so that only the short-range
+        remainder of the damped dispersion is truncated at the cutoff.
+        """
+        c6_index = list(self.potential_parameters()).index("c6")
+
+        dispersion_force = openmm.NonbondedForce()
+        dispersion_force.setName(f"{self.type} dispersion PME")
+        dispersion_force.setForceGroup(force.getForceGroup())
+        dispersion_force.setNonbondedMethod(openmm.NonbondedForce.LJPME)
+        dispersion_force.setCutoffDistance(force.getCutoffDistance())
+        dispersion_force.setEwaldErrorTolerance(_DISPERSION_PME_TOLERANCE)
+
+        for i in range(force.getNumParticles()):
+            c6 = force.getParticleParameters(i)[c6_index]
+            dispersion_force.addParticle(*self._dispersion_pme_parameters(c6))
+
+        for i in range(force.getNumExclusions()):
+            dispersion_force.addException(
+                *force.getExclusionParticles(i), 0.0, _DISPERSION_PME_SIGMA, 0.0
+            )
+
+        system.addForce(dispersion_force)
+
+    def _modify_openmm_force(self, system: openmm.System, force_index: int) -> int:
+        """Modify, or replace, the custom nonbonded force of this collection and return
+        the index of the force in the system afterwards."""
+        force = system.getForce(force_index)
+
+        if self.tabulation == "spline" and self.derived_terms == "expression":
+            raise UnsupportedExportError(
+                "The damping of tabulated DampedBuckingham68 potentials depends on "
+                "gamma, which therefore cannot be changed within a context."
+            )
+
+        if (
+            self.method == "pme"
+            and force.getNonbondedMethod() == openmm.CustomNonbondedForce.CutoffPeriodic
+        ):
+            self._add_dispersion_pme_force(system, force)
+            self._remove_undamped_dispersion(force)
+
+        force_index = super()._modify_openmm_force(system, force_index)
+        force = system.getForce(force_index)
+
+        if self.tabulation == "spline":
+            if force.getNonbondedMethod() == openmm.CustomNonbondedForce.NoCutoff:
+                raise UnsupportedExportError(
+                    "Tabulated DampedBuckingham68 potentials require a cutoff."
+                )
+
+            self._tabulate_openmm_force(force)
+
+        return force_index
+
+    def verify_tabulation(
+        self,
+        minimum_distance: unit.Quantity = unit.Quantity(0.1, unit.nanometer),
+        n_samples: int = 1000,
+    ) -> Dict[str, float]:
+        """Compare the tabulated form of the potential against the analytic expression
+        for every pair of parameters stored in this collection.
+
+        Parameters
+        ----------
+        minimum_distance
+            The smallest pair distance to compare at.
+        n_samples
+            The number of evenly spaced distances between ``minimum_distance`` and the
+            cutoff to compare at.
+
+        Returns
+        -------
+            The maximum absolute deviation of the energy [kJ/mol] and of the force
+            [kJ/mol/nm], stored under the ``"energy"`` and ``"force"`` keys respectively.
+        """
+        contexts: List[Tuple[openmm.Context, openmm.CustomNonbondedForce]] = []
+
+        for tabulate in (False, True):
+            force = openmm.CustomNonbondedForce(self.expression)
+            force.setNonbondedMethod(openmm.CustomNonbondedForce.NoCutoff)
+
+            self._add_global_parameters(force)
+
+            for parameter in self.potential_parameters():
+                force.addPerParticleParameter(parameter)
+
+            force.addParticle(list(self.default_parameter_values()))
+            force.addParticle(list(self.default_parameter_values()))
+
+            if self.method == "pme":
+                self._remove_undamped_dispersion(force)
+
+            if tabulate:
+                self._tabulate_openmm_force(force)
+
+            system = openmm.System()
+            system.addParticle(1.0)
+            system.addParticle(1.0)
+            system.addForce(force)
+
+            context = openmm.Context(
+                system,
+                openmm.VerletIntegrator(1.0),
+                openmm.Platform.getPlatformByName("Reference"),
+            )
+            contexts.append((context, force))
+
+        parameters = [
+            list(self.modify_parameters(potential.parameters).values())
+            for potential in self.potentials.values()
+        ]
+        distances = numpy.linspace(
+            minimum_distance.m_as(unit.nanometer),
+            self.cutoff.m_as(unit.nanometer),
+            n_samples,
+        )
+
+        deviations = {"energy": 0.0, "force": 0.0}
+
+        for i, parameters_i in enumerate(parameters):
+            for parameters_j in parameters[i:]:
+                energies, forces = [], []
+
+                for context, force in contexts:
+                    force.setParticleParameters(0, parameters_i)
+                    force.setParticleParameters(1, parameters_j)
+                    force.updateParametersInContext(context)
+
+                    context_energies, context_forces = [], []
+
+                    for distance in distances:
+                        context.setPositions([[0.0, 0.0, 0.0], [distance, 0.0, 0.0]])
+                        state = context.getState(getEnergy=True, getForces=True)
+
+                        context_energies.append(
+                            state.getPotentialEnergy().value_in_unit(
+                                openmm.unit.kilojoule_per_mole
+                            )
+                        )
+                        context_forces.append(
+                            state.getForces(asNumpy=True)[1, 0].value_in_unit(
+                                openmm.unit.kilojoule_per_mole / openmm.unit.nanometer
+                            )
+                        )
+
+                    energies.append(numpy.array(context_energies))
+                    forces.append(numpy.array(context_forces))
+
+                deviations["energy"] = max(
+                    deviations["energy"], numpy.abs(energies[0] - energies[1]).max()
+                )
+                deviations["force"] = max(
+                    deviations["force"], numpy.abs(forces[0] - forces[1]).max()
+                )
+
+        logger.info(
+            f"The maximum deviation of the tabulated DampedBuckingham68 potential from "
+            f"the analytic form is {deviations['energy']:.3e} kJ/mol for the energy and "
+            f"{deviations['force']:.3e} kJ/mol/nm for the force."
+        )
+
+        return deviations
+
 
 class SMIRNOFFDoubleExponentialCollection(_NonbondedPlugin):
     """Handler storing vdW potentials as produced by a SMIRNOFF force field."""
@@ -202,6 +1965,12 @@ class SMIRNOFFDoubleExponentialCollection(_NonbondedPlugin):
         """Return an iterable of global parameters, i.e. not per-potential parameters."""
         return "alpha", "beta"
 
+    @classmethod
+    def _parameter_units(cls) -> Dict[str, unit.Unit]:
+        """The units that the potential parameters are converted to before being
+        modified."""
+        return {"r_min": unit.nanometer, "epsilon": unit.kilojoule_per_mole}
+
     def pre_computed_terms(self) -> Dict[str, float]:
         """Return a dictionary of pre-computed terms for use in the expression."""
         alpha_min_beta = self.alpha - self.beta
@@ -212,6 +1981,49 @@ class SMIRNOFFDoubleExponentialCollection(_NonbondedPlugin):
             "AttractionFactor": self.alpha * math.exp(self.beta) / alpha_min_beta,
         }
 
+    def derived_term_expressions(self) -> Dict[str, str]:
+        """Return the OpenMM expressions which evaluate each of the pre-computed terms
+        from the global parameters."""
+        return {
+            "RepulsionFactor": "beta*exp(alpha)/AlphaMinBeta",
+            "AttractionFactor": "alpha*exp(beta)/AlphaMinBeta",
+            "AlphaMinBeta": "alpha-beta",
+        }
+
+    def split_energy(self) -> Tuple[str, str]:
+        return (
+            "CombinedEpsilon*RepulsionFactor*RepulsionExp",
+            "-CombinedEpsilon*AttractionFactor*AttractionExp",
+        )
+
+    def mix_parameters(
+        self, parameters_1: Dict[str, float], parameters_2: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Combine the modified per-particle parameters of two particles into the pair
+        parameters that are referenced by the energy expression."""
+        return {
+            "CombinedEpsilon": parameters_1["epsilon"] * parameters_2["epsilon"],
+            "CombinedR": parameters_1["r_min"] + parameters_2["r_min"],
+        }
+
+    def is_non_interacting(self, parameters: Dict[str, float]) -> bool:
+        """Return whether a particle with the given modified per-particle parameters has
+        a vanishing interaction with every other particle."""
+        return parameters["epsilon"] == 0.0
+
+    def pair_energy(
+        self, r: numpy.ndarray, pair_parameters: Dict[str, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """Evaluate the pair energy [kJ/mol] at distances ``r`` [nm] for the pair
+        parameters returned by ``mix_parameters``, broadcasting over both."""
+        terms = self.pre_computed_terms()
+        distance = r / pair_parameters["CombinedR"]
+
+        return pair_parameters["CombinedEpsilon"] * (
+            float(terms["RepulsionFactor"]) * numpy.exp(-float(self.alpha) * distance)
+            - float(terms["AttractionFactor"]) * numpy.exp(-float(self.beta) * distance)
+        )
+
     def modify_parameters(
         self,
         original_parameters: Dict[str, unit.Quantity],
@@ -219,10 +2031,32 @@ class SMIRNOFFDoubleExponentialCollection(_NonbondedPlugin):
         """Optionally modify parameters prior to their being stored in a force."""
         # It's important that these keys are in the order of self.potential_parameters(),
         # consider adding a check somewhere that this is the case.
-        _units = {"r_min": unit.nanometer, "epsilon": unit.kilojoule_per_mole}
+        _units = self._parameter_units()
         return {
             "r_min": original_parameters["r_min"].m_as(_units["r_min"]) * 0.5,
             "epsilon": math.sqrt(
                 original_parameters["epsilon"].m_as(_units["epsilon"]),
             ),
         }
+
+    def modify_parameter_derivatives(
+        self,
+        original_parameters: Dict[str, unit.Quantity],
+    ) -> Dict[str, float]:
+        """Return the derivatives of each parameter returned by ``modify_parameters``
+        with respect to the corresponding original parameter, in the unit that the
+        original parameter is stored in."""
+        _units = self._parameter_units()
+        conversions = {
+            name: unit.Quantity(1.0, original_parameters[name].units).m_as(_units[name])
+            for name in self.potential_parameters()
+        }
+
+        epsilon = math.sqrt(original_parameters["epsilon"].m_as(_units["epsilon"]))
+
+        return {
+            "r_min": 0.5 * conversions["r_min"],
+            "epsilon": (
+                math.inf if epsilon == 0.0 else 0.5 * conversions["epsilon"] / epsilon
+            ),
+        }
@@ -19,11 +19,40 @@ class _CustomNonbondedHandler(ParameterHandler, abc.ABC):
     scale15 = ParameterAttribute(default=1.0, converter=float)
 
     cutoff = ParameterAttribute(default=9.0 * unit.angstroms, unit=unit.angstrom)
+    # The "no-cutoff" and "cutoff-nonperiodic" methods evaluate the system without
+    # periodic images, e.g. for gas-phase conformers and dimers.
     method = ParameterAttribute(
-        default="cutoff", converter=_allow_only(["cutoff", "PME"])
+        default="cutoff",
+        converter=_allow_only(["cutoff", "PME", "no-cutoff", "cutoff-nonperiodic"]),
     )
     switch_width = ParameterAttribute(default=1.0 * unit.angstroms, unit=unit.angstrom)
 
+    # Whether per-particle parameters are combined for every pair when the energy is
+    # evaluated, or pre-mixed once per pair of particle types into lookup tables.
+    combination = ParameterAttribute(
+        default="per-particle", converter=_allow_only(["per-particle", "pair-table"])
+    )
+    # Optionally replace the long-range correction that OpenMM integrates numerically
+    # with one whose coefficient is computed once when the system is created.
+    long_range_correction = ParameterAttribute(
+        default=None, converter=_allow_only([None, "analytic"])
+    )
+    # Whether the terms derived from the global parameters, e.g. from ``gamma``, are
+    # stored as constants or evaluated within the energy expression, in which case the
+    # global parameters can be changed on a live context.
+    derived_terms = ParameterAttribute(
+        default="constant", converter=_allow_only(["constant", "expression"])
+    )
+    # Optionally evaluate the steep short-range repulsion and the smoother attraction
+    # in separate forces, so that a multiple time step integrator can evaluate the
+    # attraction less often.
+    splitting = ParameterAttribute(
+        default=None, converter=_allow_only([None, "repulsion"])
+    )
+    # Optionally evaluate the repulsion in a separate force with a shorter cutoff than
+    # the attraction, as it decays far more quickly.
+    repulsion_cutoff = ParameterAttribute(default=None, unit=unit.angstrom)
+
     def check_handler_compatibility(self, other_handler: ParameterHandler):
         """Checks whether this ParameterHandler encodes compatible physics as another
         ParameterHandler. This is called if a second handler is attempted to be
@@ -44,7 +73,13 @@ class _CustomNonbondedHandler(ParameterHandler, abc.ABC):
             )
 
         float_attrs_to_compare = ["scale12", "scale13", "scale14", "scale15"]
-        string_attrs_to_compare = ["method"]
+        string_attrs_to_compare = [
+            "method",
+            "combination",
+            "long_range_correction",
+            "derived_terms",
+            "splitting",
+        ]
         unit_attrs_to_compare = ["cutoff"]
 
         self._check_attributes_are_equal(
@@ -54,6 +89,20 @@ class _CustomNonbondedHandler(ParameterHandler, abc.ABC):
             tolerance=self._SCALETOL,
         )
 
+        if (self.repulsion_cutoff is None) != (other_handler.repulsion_cutoff is None):
+            return IncompatibleParameterError(
+                f"repulsion_cutoff is inconsistent: {self.repulsion_cutoff} and "
+                f"{other_handler.repulsion_cutoff}."
+            )
+
+        if self.repulsion_cutoff is not None:
+            self._check_attributes_are_equal(
+                other_handler,
+                identical_attrs=[],
+                tolerance_attrs=["repulsion_cutoff"],
+                tolerance=self._SCALETOL,
+            )
+
 
 class DampedBuckingham68Handler(_CustomNonbondedHandler):
     """A custom SMIRNOFF handler for damped Buckingham interactions."""
@@ -78,6 +127,32 @@ class DampedBuckingham68Handler(_CustomNonbondedHandler):
 
     gamma = ParameterAttribute(default=35.8967, unit=unit.nanometer**-1)
 
+    # Optionally replace the analytic damping and repulsion terms with cubic spline
+    # tables spaced by ``tabulation_spacing``. This is only intended to speed up the
+    # GPU platforms, where table lookups are cheap. It does not speed up the OpenMM CPU
+    # or Reference platforms, which evaluate the tables more slowly than the analytic
+    # form, and so its gain should be measured with ``benchmarks/benchmark.py`` on the
+    # target platform before it is enabled.
+    tabulation = ParameterAttribute(
+        default=None, converter=_allow_only([None, "spline"])
+    )
+    tabulation_spacing = ParameterAttribute(
+        default=0.0005 * unit.nanometer, unit=unit.nanometer
+    )
+
+    def check_handler_compatibility(self, other_handler: ParameterHandler):
+        incompatible = super().check_handler_compatibility(other_handler)
+
+        if incompatible is not None:
+            return incompatible
+
+        self._check_attributes_are_equal(
+            other_handler,
+            identical_attrs=["tabulation"],
+            tolerance_attrs=["gamma", "tabulation_spacing"],
+            tolerance=self._SCALETOL,
+        )
+
 
 class DoubleExponentialHandler(_CustomNonbondedHandler):
     """A custom SMIRNOFF handler for double exponential interactions."""
@@ -1,14 +1,27 @@
+import copy
+import math
+
+import numpy
 import openmm
 import openmm.unit
 import pytest
 from openff.interchange import Interchange
-from openff.toolkit.topology import Molecule
+from openff.toolkit.topology import Molecule, Topology
 from openff.toolkit.typing.engines.smirnoff import ForceField
+from openff.toolkit.utils.exceptions import IncompatibleParameterError
 from openff.units import unit
 
+from smirnoff_plugins.collections.nonbonded import (
+    REPULSION_FORCE_GROUP,
+    SLOW_FORCE_GROUP,
+    SMIRNOFFDampedBuckingham68Collection,
+    SMIRNOFFDoubleExponentialCollection,
+)
 from smirnoff_plugins.utilities.openmm import (
+    evaluate_energies,
     evaluate_energy,
     evaluate_water_energy_at_distances,
+    water_box,
 )
 
 
@@ -203,9 +216,8 @@ def test_scaled_de_energy():
     ethane.generate_conformers(n_conformers=1)
     off_top = ethane.to_topology()
 
-    # A comically large box is needed to avoid image interactions; a better solution would involve
-    # exactly how gas phase calculations are done with vdW method "cutoff"
-    off_top.box_vectors = [20, 20, 20] * unit.nanometer
+    # Evaluate the molecule in the gas phase, without any periodic images.
+    double_exp.method = "no-cutoff"
 
     omm_top = off_top.to_openmm()
     system_no_scale = Interchange.from_smirnoff(ff, off_top).to_openmm(
@@ -231,3 +243,1068 @@ def test_scaled_de_energy():
         energy_scaled,
         abs=1e-4,
     )
+
+
+def _add_b68_water_parameters(buckingham_handler):
+    """Add the damped Buckingham parameters of the reference O-O interaction."""
+    buckingham_handler.gamma = 35.8967 * unit.nanometer**-1
+    buckingham_handler.add_parameter(
+        {
+            "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+            "a": 0.0 * unit.kilojoule_per_mole,
+            "b": 0.0 / unit.nanometer,
+            "c6": 0.0 * unit.kilojoule_per_mole * unit.nanometer**6,
+            "c8": 0.0 * unit.kilojoule_per_mole * unit.nanometer**8,
+        }
+    )
+    buckingham_handler.add_parameter(
+        {
+            "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+            "a": 1600000.0 * unit.kilojoule_per_mole,
+            "b": 42 / unit.nanometer,
+            "c6": 0.003 * unit.kilojoule_per_mole * unit.nanometer**6,
+            "c8": 0.00003 * unit.kilojoule_per_mole * unit.nanometer**8,
+        }
+    )
+
+
+def test_b68_tabulated_energies(ideal_water_force_field):
+    """Make sure that the spline tabulated form of the b68 potential reproduces the
+    reference values calculated by hand for the analytic form."""
+
+    buckingham_handler = ideal_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.tabulation = "spline"
+    _add_b68_water_parameters(buckingham_handler)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3, 4]
+    )
+    ref_values = [329.30542, 1.303183, -0.686559]
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i], abs=1e-4)
+
+
+def test_b68_verify_tabulation(buckingham_water_force_field, water):
+    """Make sure the deviation of the tabulated b68 potential from the analytic form is
+    reported and small."""
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.tabulation = "spline"
+
+    collection = Interchange.from_smirnoff(
+        buckingham_water_force_field, water.to_topology()
+    ).collections["DampedBuckingham68"]
+
+    deviations = collection.verify_tabulation()
+
+    assert deviations["energy"] < 1.0e-3
+    assert deviations["force"] < 1.0
+
+
+def test_b68_pair_table_energies(ideal_water_force_field):
+    """Make sure that looking up pre-mixed pair parameters by particle type reproduces
+    the reference b68 energies."""
+
+    buckingham_handler = ideal_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.combination = "pair-table"
+    _add_b68_water_parameters(buckingham_handler)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3, 4]
+    )
+    ref_values = [329.30542, 1.303183, -0.686559]
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i], abs=1e-5)
+
+
+def test_b68_tabulated_pair_table_energies(ideal_water_force_field):
+    """Make sure the spline tabulated form of the b68 potential can be combined with
+    pair tables, and still reproduces the reference energies."""
+
+    buckingham_handler = ideal_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.combination = "pair-table"
+    buckingham_handler.tabulation = "spline"
+    _add_b68_water_parameters(buckingham_handler)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3, 4]
+    )
+    ref_values = [329.30542, 1.303183, -0.686559]
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i], abs=1e-4)
+
+
+def test_double_exp_pair_table(ideal_water_force_field, water_box_topology):
+    """Make sure each particle only stores a type index when pair tables are used."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.combination = "pair-table"
+    double_exp.add_parameter(
+        {
+            "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+            "r_min": 3.5366 * unit.angstrom,
+            "epsilon": 0.152 * unit.kilocalorie_per_mole,
+        }
+    )
+    double_exp.add_parameter(
+        {
+            "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+            "r_min": 1 * unit.angstrom,
+            "epsilon": 0 * unit.kilocalorie_per_mole,
+        }
+    )
+
+    system = ideal_water_force_field.create_interchange(water_box_topology).to_openmm(
+        combine_nonbonded_forces=False
+    )
+    custom_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ][0]
+
+    assert custom_force.getNumPerParticleParameters() == 1
+    assert custom_force.getPerParticleParameterName(0) == "type"
+    assert custom_force.getNumTabulatedFunctions() == 2
+    assert {
+        custom_force.getParticleParameters(i)[0]
+        for i in range(custom_force.getNumParticles())
+    } == {0.0, 1.0}
+
+
+class _PairOverrideCollection(SMIRNOFFDoubleExponentialCollection):
+    """Double the well depth of every pair of particles with different parameters, as
+    an NBFIX-style override of the combining rule."""
+
+    def mix_parameters(self, parameters_1, parameters_2):
+        pair_parameters = super().mix_parameters(parameters_1, parameters_2)
+
+        if parameters_1 != parameters_2:
+            pair_parameters["CombinedEpsilon"] *= 2.0
+
+        return pair_parameters
+
+
+def test_double_exp_pair_table_override(ideal_water_force_field, water):
+    """Make sure overriding how one pair of particle types is mixed only changes the
+    energy of the pairs of those types when pair tables are used."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.combination = "pair-table"
+    double_exp.method = "no-cutoff"
+    _add_de_water_parameters(double_exp)
+    double_exp.parameters["[#1:1]-[#8X2H2+0]-[#1]"].epsilon = (
+        0.01 * unit.kilocalorie_per_mole
+    )
+
+    water.generate_conformers(n_conformers=1)
+    conformers = _water_dimer_conformers(water, [3.0, 4.0])
+
+    interchange = Interchange.from_smirnoff(
+        ideal_water_force_field, Topology.from_molecules([water, water])
+    )
+    collection = interchange.collections["DoubleExponential"]
+
+    energies, _ = evaluate_energies(
+        interchange.to_openmm(combine_nonbonded_forces=False), conformers
+    )
+
+    interchange.collections["DoubleExponential"] = _PairOverrideCollection(
+        **dict(collection)
+    )
+
+    override_energies, _ = evaluate_energies(
+        interchange.to_openmm(combine_nonbonded_forces=False), conformers
+    )
+
+    parameters = {
+        potential_key.id: collection.modify_parameters(potential.parameters)
+        for potential_key, potential in collection.potentials.items()
+    }
+
+    # Doubling the well depth of the intermolecular O-H pairs adds their energy once
+    # more, while the O-O and H-H pairs are left unchanged.
+    pairs = numpy.array([[0, 4], [0, 5], [3, 1], [3, 2]])
+
+    coordinates = conformers.value_in_unit(openmm.unit.nanometer)
+    distances = numpy.linalg.norm(
+        coordinates[:, pairs[:, 0]] - coordinates[:, pairs[:, 1]], axis=-1
+    )
+
+    expected_difference = collection.pair_energy(
+        distances,
+        collection.mix_parameters(
+            parameters["[#1]-[#8X2H2+0:1]-[#1]"], parameters["[#1:1]-[#8X2H2+0]-[#1]"]
+        ),
+    ).sum(axis=1)
+
+    assert not numpy.allclose(expected_difference, 0.0)
+    assert numpy.allclose(override_energies - energies, expected_difference)
+
+
+def test_skip_non_interacting_particles(buckingham_water_force_field):
+    """Make sure the zero-parameter hydrogens and virtual sites are left out of the
+    pairs evaluated by the custom nonbonded force, without changing the energy."""
+
+    topology, positions = water_box(216, random_seed=0)
+
+    system = buckingham_water_force_field.create_interchange(topology).to_openmm(
+        combine_nonbonded_forces=False
+    )
+    custom_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ][0]
+
+    assert custom_force.getNumInteractionGroups() == 1
+
+    set_1, set_2 = custom_force.getInteractionGroupParameters(0)
+    assert set(set_1) == set(set_2)
+    assert len(set_1) == topology.n_molecules
+    assert all(
+        system.getParticleMass(index).value_in_unit(openmm.unit.dalton) > 15.0
+        for index in set_1
+    )
+
+    # Evaluating every pair is equivalent to not having an interaction group.
+    all_particles_system = copy.deepcopy(system)
+    all_particles = list(range(system.getNumParticles()))
+
+    for force in all_particles_system.getForces():
+        if isinstance(force, openmm.CustomNonbondedForce):
+            force.setInteractionGroupParameters(0, all_particles, all_particles)
+
+    conformers = positions.m_as(unit.nanometer)[None] * openmm.unit.nanometer
+    box_vectors = topology.box_vectors.to_openmm()
+
+    energies, _ = evaluate_energies(system, conformers, box_vectors)
+    expected_energies, _ = evaluate_energies(
+        all_particles_system, conformers, box_vectors
+    )
+
+    assert numpy.allclose(energies, expected_energies, rtol=1.0e-10)
+
+
+def test_b68_analytic_long_range_correction(
+    buckingham_water_force_field, water_box_topology
+):
+    """Make sure the long-range correction is added as a volume-dependent force whose
+    coefficient matches the undamped C6 and C8 dispersion tail."""
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.long_range_correction = "analytic"
+    buckingham_handler.switch_width = 0.0 * unit.angstrom
+
+    system = buckingham_water_force_field.create_interchange(
+        water_box_topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    custom_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ][0]
+    assert custom_force.getUseLongRangeCorrection() is False
+
+    volume_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomVolumeForce)
+    ][0]
+
+    n_oxygen = water_box_topology.n_molecules
+    cutoff = buckingham_handler.cutoff.m_as(unit.nanometer)
+    # The damping and the repulsion are negligible beyond the cutoff.
+    expected = (
+        2.0
+        * math.pi
+        * n_oxygen**2
+        * (-0.003 / (3.0 * cutoff**3) - 0.00003 / (5.0 * cutoff**5))
+    )
+
+    assert volume_force.getGlobalParameterDefaultValue(0) == pytest.approx(
+        expected, rel=1.0e-4
+    )
+
+
+def test_b68_dispersion_pme(buckingham_water_force_field, water_box_topology):
+    """Make sure the undamped C6 dispersion is moved into an LJPME force when the
+    PME method is requested."""
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.method = "PME"
+    buckingham_handler.cutoff = 6.0 * unit.angstrom
+
+    system = buckingham_water_force_field.create_interchange(
+        water_box_topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    custom_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ][0]
+    dispersion_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.NonbondedForce)
+        and force.getNonbondedMethod() == openmm.NonbondedForce.LJPME
+    ][0]
+
+    assert "invR6-expTerm" not in custom_force.getEnergyFunction()
+    assert dispersion_force.getCutoffDistance() == custom_force.getCutoffDistance()
+    assert dispersion_force.getNumExceptions() == custom_force.getNumExclusions()
+
+    charges, sigmas, epsilons = zip(
+        *(
+            dispersion_force.getParticleParameters(i)
+            for i in range(dispersion_force.getNumParticles())
+        )
+    )
+    c6 = [
+        4.0
+        * epsilon.value_in_unit(openmm.unit.kilojoule_per_mole)
+        * sigma.value_in_unit(openmm.unit.nanometer) ** 6
+        for sigma, epsilon in zip(sigmas, epsilons)
+    ]
+    assert max(c6) == pytest.approx(0.003)
+    assert min(c6) == pytest.approx(0.0)
+
+
+def test_b68_evaluate_conformers(ideal_water_force_field, water):
+    """Make sure that the NumPy evaluator compiled from the expression reproduces the
+    reference b68 energies for a batch of conformers."""
+
+    buckingham_handler = ideal_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    _add_b68_water_parameters(buckingham_handler)
+
+    water.generate_conformers(n_conformers=1)
+    topology = Topology.from_molecules([water, water])
+
+    collection = Interchange.from_smirnoff(
+        ideal_water_force_field, topology
+    ).collections["DampedBuckingham68"]
+
+    conformer = water.conformers[0].m_as(unit.angstrom)
+    conformers = unit.Quantity(
+        numpy.stack(
+            [
+                numpy.vstack([conformer, conformer + numpy.array([[distance, 0, 0]])])
+                for distance in [2, 3, 4]
+            ]
+        ),
+        unit.angstrom,
+    )
+
+    energies, forces = collection.evaluate_conformers(
+        topology, conformers, chunk_size=2
+    )
+
+    ref_values = [329.30542, 1.303183, -0.686559]
+    assert energies == pytest.approx(ref_values, abs=1e-5)
+
+    assert forces.shape == (3, 6, 3)
+    assert numpy.allclose(forces.sum(axis=1), 0.0)
+    # Only the oxygen atoms interact, and the repulsion dominates at 2 angstroms.
+    assert numpy.allclose(forces[:, [1, 2, 4, 5]], 0.0)
+    assert forces[0, 3, 0] > 0.0
+
+
+def test_b68_optimize_expression(ideal_water_force_field, water):
+    """Make sure the expression is only replaced by a verified variant, which gives
+    the same energies as the original."""
+
+    buckingham_handler = ideal_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    _add_b68_water_parameters(buckingham_handler)
+
+    water.generate_conformers(n_conformers=1)
+    topology = Topology.from_molecules([water, water])
+
+    collection = Interchange.from_smirnoff(
+        ideal_water_force_field, topology
+    ).collections["DampedBuckingham68"]
+
+    conformer = water.conformers[0].m_as(unit.angstrom)
+    conformers = unit.Quantity(
+        numpy.stack(
+            [
+                numpy.vstack([conformer, conformer + numpy.array([[distance, 0, 0]])])
+                for distance in [2, 3, 4]
+            ]
+        ),
+        unit.angstrom,
+    )
+
+    expected_energies, _ = collection.evaluate_conformers(topology, conformers)
+
+    timings = collection.optimize_expression(
+        platform="Reference", n_particles=100, n_repeats=1
+    )
+
+    assert {*timings} == {"default", "horner"}
+    assert collection.expression in collection.expression_variants().values()
+
+    energies, _ = collection.evaluate_conformers(topology, conformers)
+    assert numpy.allclose(energies, expected_energies)
+
+
+def test_b68_update_openmm_forces(buckingham_water_force_field, water_box_topology):
+    """Make sure that pushing modified parameters into an existing system matches
+    rebuilding it from scratch."""
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.long_range_correction = "analytic"
+
+    interchange = buckingham_water_force_field.create_interchange(water_box_topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    buckingham_handler.parameters["[#1]-[#8X2H2+0:1]-[#1]"].c6 = (
+        0.002 * unit.kilojoule_per_mole * unit.nanometer**6
+    )
+    collection = interchange.collections["DampedBuckingham68"]
+    collection.update_potentials(buckingham_handler)
+    collection.update_openmm_forces(system)
+
+    expected_system = buckingham_water_force_field.create_interchange(
+        water_box_topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    for force, expected_force in zip(system.getForces(), expected_system.getForces()):
+        assert type(force) is type(expected_force)
+
+        if isinstance(force, openmm.CustomNonbondedForce):
+            for i in range(force.getNumParticles()):
+                assert force.getParticleParameters(
+                    i
+                ) == expected_force.getParticleParameters(i)
+
+        if isinstance(force, openmm.CustomVolumeForce):
+            assert force.getGlobalParameterDefaultValue(0) == pytest.approx(
+                expected_force.getGlobalParameterDefaultValue(0)
+            )
+
+    vector = collection.parameter_vector()
+    collection.set_parameter_vector(vector * 2.0)
+    assert numpy.allclose(collection.parameter_vector(), vector * 2.0)
+
+
+def test_b68_update_openmm_forces_interaction_group(buckingham_water_force_field):
+    """Make sure that a hydrogen whose parameters become nonzero is added to the
+    interaction group of the system, but that a context which skips it is rejected."""
+
+    topology, positions = water_box(216, random_seed=0)
+
+    interchange = buckingham_water_force_field.create_interchange(topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    context = openmm.Context(
+        system,
+        openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds),
+        openmm.Platform.getPlatformByName("Reference"),
+    )
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    hydrogen = buckingham_handler.parameters["[#1:1]-[#8X2H2+0]-[#1]"]
+    hydrogen.a = 1000.0 * unit.kilojoule_per_mole
+    hydrogen.b = 40.0 / unit.nanometer
+    hydrogen.c6 = 0.0001 * unit.kilojoule_per_mole * unit.nanometer**6
+
+    collection = interchange.collections["DampedBuckingham68"]
+    collection.update_potentials(buckingham_handler)
+
+    with pytest.raises(ValueError, match="context must be recreated"):
+        collection.update_openmm_forces(system, context)
+
+    collection.update_openmm_forces(system)
+
+    expected_system = buckingham_water_force_field.create_interchange(
+        topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    custom_force, expected_custom_force = (
+        [
+            force
+            for force in openmm_system.getForces()
+            if isinstance(force, openmm.CustomNonbondedForce)
+        ][0]
+        for openmm_system in (system, expected_system)
+    )
+
+    assert len(custom_force.getInteractionGroupParameters(0)[0]) == 3 * 216
+    assert custom_force.getInteractionGroupParameters(
+        0
+    ) == expected_custom_force.getInteractionGroupParameters(0)
+
+    conformers = positions.m_as(unit.nanometer)[None] * openmm.unit.nanometer
+    box_vectors = topology.box_vectors.to_openmm()
+
+    energies, _ = evaluate_energies(system, conformers, box_vectors)
+    expected_energies, _ = evaluate_energies(expected_system, conformers, box_vectors)
+
+    assert numpy.allclose(energies, expected_energies, rtol=1.0e-10)
+
+
+def test_b68_update_openmm_forces_pair_table(
+    buckingham_water_force_field, water_box_topology
+):
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.combination = "pair-table"
+
+    interchange = buckingham_water_force_field.create_interchange(water_box_topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    with pytest.raises(ValueError, match="Pair parameter tables cannot be updated"):
+        interchange.collections["DampedBuckingham68"].update_openmm_forces(system)
+
+
+def _add_de_water_parameters(double_exp):
+    """Add the double exponential parameters of the reference O-O interaction."""
+    double_exp.add_parameter(
+        {
+            "smirks": "[#1]-[#8X2H2+0:1]-[#1]",
+            "r_min": 3.5366 * unit.angstrom,
+            "epsilon": 0.152 * unit.kilocalorie_per_mole,
+        }
+    )
+    double_exp.add_parameter(
+        {
+            "smirks": "[#1:1]-[#8X2H2+0]-[#1]",
+            "r_min": 1 * unit.angstrom,
+            "epsilon": 0 * unit.kilocalorie_per_mole,
+        }
+    )
+
+
+def test_double_exp_derived_term_expressions(ideal_water_force_field):
+    """Make sure evaluating the pre-computed terms within the expression reproduces the
+    reference energies."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.cutoff = 20 * unit.angstrom
+    double_exp.switch_width = 0 * unit.angstrom
+    double_exp.derived_terms = "expression"
+    _add_de_water_parameters(double_exp)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3.5366, 4]
+    )
+    ref_values = [457.0334854, -0.635968, -0.4893932627]
+
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i])
+
+
+def test_double_exp_splitting_energies(ideal_water_force_field):
+    """Make sure splitting the repulsion into a separate force reproduces the reference
+    energies."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.cutoff = 20 * unit.angstrom
+    double_exp.switch_width = 0 * unit.angstrom
+    double_exp.splitting = "repulsion"
+    _add_de_water_parameters(double_exp)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3.5366, 4]
+    )
+    ref_values = [457.0334854, -0.635968, -0.4893932627]
+
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i])
+
+
+def test_double_exp_repulsion_cutoff(ideal_water_force_field, water_box_topology):
+    """Make sure the repulsion is evaluated with its own cutoff, which leaves the
+    energies well within it unchanged."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.cutoff = 20 * unit.angstrom
+    double_exp.switch_width = 0 * unit.angstrom
+    double_exp.repulsion_cutoff = 10 * unit.angstrom
+    _add_de_water_parameters(double_exp)
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=ideal_water_force_field, distances=[2, 3.5366, 4]
+    )
+    ref_values = [457.0334854, -0.635968, -0.4893932627]
+
+    for i, energy in enumerate(energies):
+        assert energy == pytest.approx(ref_values[i])
+
+    double_exp.cutoff = 9 * unit.angstrom
+    double_exp.switch_width = 1 * unit.angstrom
+    double_exp.repulsion_cutoff = 5 * unit.angstrom
+
+    system = ideal_water_force_field.create_interchange(water_box_topology).to_openmm(
+        combine_nonbonded_forces=False
+    )
+
+    repulsion_force, attraction_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ]
+
+    assert repulsion_force.getCutoffDistance().value_in_unit(
+        openmm.unit.nanometer
+    ) == pytest.approx(0.5)
+    assert repulsion_force.getSwitchingDistance().value_in_unit(
+        openmm.unit.nanometer
+    ) == pytest.approx(0.4)
+    assert attraction_force.getCutoffDistance().value_in_unit(
+        openmm.unit.nanometer
+    ) == pytest.approx(0.9)
+    # The repulsion must be in its own force group as its cutoff differs.
+    assert attraction_force.getForceGroup() == 0
+    assert repulsion_force.getForceGroup() == REPULSION_FORCE_GROUP
+
+    double_exp.repulsion_cutoff = 9 * unit.angstrom
+
+    system = ideal_water_force_field.create_interchange(water_box_topology).to_openmm(
+        combine_nonbonded_forces=False
+    )
+
+    assert all(force.getForceGroup() == 0 for force in system.getForces())
+
+
+def test_repulsion_cutoff_compatibility():
+    """Make sure repulsion cutoffs are compared as quantities rather than exactly."""
+
+    handler, other_handler = [
+        ForceField(load_plugins=True).get_parameter_handler("DoubleExponential")
+        for _ in range(2)
+    ]
+
+    handler.repulsion_cutoff = 5 * unit.angstrom
+    other_handler.repulsion_cutoff = 0.5 * unit.nanometer
+
+    assert handler.check_handler_compatibility(other_handler) is None
+
+    # As with the handler class, a missing repulsion cutoff is returned as an error,
+    # while a differing value is raised by ``_check_attributes_are_equal``.
+    other_handler.repulsion_cutoff = None
+
+    incompatible = handler.check_handler_compatibility(other_handler)
+
+    assert isinstance(incompatible, IncompatibleParameterError)
+    assert "repulsion_cutoff" in str(incompatible)
+
+    other_handler.repulsion_cutoff = 6 * unit.angstrom
+
+    with pytest.raises(IncompatibleParameterError, match="repulsion_cutoff"):
+        handler.check_handler_compatibility(other_handler)
+
+
+@pytest.mark.parametrize(
+    "method, expected_custom_method, expected_electrostatics_method",
+    [
+        (
+            "no-cutoff",
+            openmm.CustomNonbondedForce.NoCutoff,
+            openmm.NonbondedForce.NoCutoff,
+        ),
+        (
+            "cutoff-nonperiodic",
+            openmm.CustomNonbondedForce.CutoffNonPeriodic,
+            openmm.NonbondedForce.CutoffNonPeriodic,
+        ),
+    ],
+)
+def test_double_exp_nonperiodic_methods(
+    ideal_water_force_field,
+    water,
+    method,
+    expected_custom_method,
+    expected_electrostatics_method,
+):
+    """Make sure the gas-phase methods are mapped onto the matching OpenMM methods for
+    both the custom force and the electrostatics."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.method = method
+    _add_de_water_parameters(double_exp)
+
+    system = Interchange.from_smirnoff(
+        ideal_water_force_field, Topology.from_molecules([water, water])
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    custom_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ][0]
+    electrostatics_force = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.NonbondedForce)
+    ][0]
+
+    assert custom_force.getNonbondedMethod() == expected_custom_method
+    assert custom_force.getUseLongRangeCorrection() is False
+    assert electrostatics_force.getNonbondedMethod() == expected_electrostatics_method
+
+
+def _charge_water(force_field):
+    """Replace the zero library charges of the ideal water force field with those of
+    TIP3P."""
+    library_charges = force_field.get_parameter_handler("LibraryCharges")
+    library_charges.parameters["[#1]-[#8X2H2+0:1]-[#1]"].charge = [
+        -0.834 * unit.elementary_charge
+    ]
+    library_charges.parameters["[#1:1]-[#8X2H2+0]-[#1]"].charge = [
+        0.417 * unit.elementary_charge
+    ]
+
+
+def _water_dimer_conformers(water, distances):
+    """Place a copy of a water molecule at each distance along x from the original."""
+    coordinates = water.conformers[0].m_as(unit.angstrom)
+
+    return (
+        numpy.stack(
+            [
+                numpy.vstack([coordinates, coordinates + numpy.array([distance, 0, 0])])
+                for distance in distances
+            ]
+        )
+        * openmm.unit.angstrom
+    )
+
+
+def test_double_exp_cutoff_nonperiodic_energies(ideal_water_force_field, water):
+    """Make sure the electrostatics are not screened by a reaction field dielectric with
+    the cutoff-nonperiodic method, which leaves the energies of neutral molecules well
+    within the cutoff unchanged."""
+
+    _charge_water(ideal_water_force_field)
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.switch_width = 0 * unit.angstrom
+    _add_de_water_parameters(double_exp)
+
+    water.generate_conformers(n_conformers=1)
+    conformers = _water_dimer_conformers(water, [2.5, 3.0, 4.0])
+
+    energies = {}
+
+    for method in ("no-cutoff", "cutoff-nonperiodic"):
+        double_exp.method = method
+
+        system = Interchange.from_smirnoff(
+            ideal_water_force_field, Topology.from_molecules([water, water])
+        ).to_openmm(combine_nonbonded_forces=False)
+
+        energies[method], _ = evaluate_energies(system, conformers)
+
+    assert numpy.allclose(
+        energies["cutoff-nonperiodic"], energies["no-cutoff"], rtol=0.0, atol=1.0e-6
+    )
+
+
+def _periodic_water_energies(force_field, water, distances):
+    """Evaluate a water dimer the way ``evaluate_water_energy_at_distances`` previously
+    did, by building it in a large periodic box and then removing the cutoffs."""
+    topology = Topology.from_molecules([water, water])
+    topology.box_vectors = unit.Quantity(numpy.eye(3) * 20, unit.nanometer)
+
+    system = Interchange.from_smirnoff(force_field, topology).to_openmm(
+        combine_nonbonded_forces=False
+    )
+
+    for force in system.getForces():
+        if isinstance(force, openmm.CustomNonbondedForce):
+            force.setNonbondedMethod(openmm.CustomNonbondedForce.NoCutoff)
+            force.setUseSwitchingFunction(False)
+            force.setUseLongRangeCorrection(False)
+        elif isinstance(force, openmm.NonbondedForce):
+            force.setNonbondedMethod(openmm.NonbondedForce.NoCutoff)
+
+    energies, _ = evaluate_energies(system, _water_dimer_conformers(water, distances))
+    return energies
+
+
+@pytest.mark.parametrize(
+    "handler_name, tabulation",
+    [
+        ("DampedBuckingham68", None),
+        ("DampedBuckingham68", "spline"),
+        ("DoubleExponential", None),
+    ],
+)
+def test_evaluate_water_energy_at_distances_charged(request, handler_name, tabulation):
+    """Make sure the gas-phase energies of a charged water dimer match those of the
+    large periodic box that it was previously evaluated in."""
+
+    if handler_name == "DampedBuckingham68":
+        force_field = request.getfixturevalue("buckingham_water_force_field")
+    else:
+        force_field = request.getfixturevalue("ideal_water_force_field")
+
+        _charge_water(force_field)
+        _add_de_water_parameters(force_field.get_parameter_handler(handler_name))
+
+    # The same conformer as is generated by ``evaluate_water_energy_at_distances``.
+    water = Molecule.from_smiles("O")
+    water.generate_conformers(n_conformers=1)
+
+    distances = [2.5, 3.0, 4.0, 6.0]
+
+    ref_values = _periodic_water_energies(force_field, water, distances)
+
+    if tabulation is not None:
+        force_field.get_parameter_handler(handler_name).tabulation = tabulation
+
+    energies = evaluate_water_energy_at_distances(
+        force_field=force_field, distances=distances
+    )
+
+    # The dimer is evaluated on the mixed precision CPU platform.
+    assert numpy.allclose(energies, ref_values, rtol=1.0e-5, atol=1.0e-3)
+
+
+def test_b68_splitting_force_groups(buckingham_water_force_field, water_box_topology):
+    """Make sure only the repulsion is left in the fast force group when the repulsion
+    is split from the attraction."""
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.method = "PME"
+    buckingham_handler.long_range_correction = "analytic"
+    buckingham_handler.splitting = "repulsion"
+
+    system = buckingham_water_force_field.create_interchange(
+        water_box_topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    groups = {force.getName(): force.getForceGroup() for force in system.getForces()}
+
+    assert groups["DampedBuckingham68 attraction"] == SLOW_FORCE_GROUP
+    assert groups["DampedBuckingham68 dispersion PME"] == SLOW_FORCE_GROUP
+    assert groups["DampedBuckingham68 long-range correction"] == SLOW_FORCE_GROUP
+
+    custom_forces = [
+        force
+        for force in system.getForces()
+        if isinstance(force, openmm.CustomNonbondedForce)
+    ]
+    assert len(custom_forces) == 2
+    assert custom_forces[0].getForceGroup() == 0
+    assert "buckinghamRepulsion" not in custom_forces[1].getEnergyFunction()
+
+
+@pytest.mark.parametrize("derived_terms", ["constant", "expression"])
+def test_double_exp_update_global_parameters(
+    ideal_water_force_field, water_box_topology, derived_terms
+):
+    """Make sure changing alpha and beta in place matches rebuilding the system."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.derived_terms = derived_terms
+    double_exp.long_range_correction = "analytic"
+    _add_de_water_parameters(double_exp)
+
+    interchange = ideal_water_force_field.create_interchange(water_box_topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    interchange.collections["DoubleExponential"].update_global_parameters(
+        system, alpha=16.0, beta=4.0
+    )
+
+    double_exp.alpha = 16.0
+    double_exp.beta = 4.0
+
+    expected_system = ideal_water_force_field.create_interchange(
+        water_box_topology
+    ).to_openmm(combine_nonbonded_forces=False)
+
+    for force, expected_force in zip(system.getForces(), expected_system.getForces()):
+        assert type(force) is type(expected_force)
+
+        if isinstance(force, (openmm.CustomNonbondedForce, openmm.CustomVolumeForce)):
+            assert force.getEnergyFunction() == expected_force.getEnergyFunction()
+
+            for i in range(force.getNumGlobalParameters()):
+                assert force.getGlobalParameterDefaultValue(i) == pytest.approx(
+                    expected_force.getGlobalParameterDefaultValue(i)
+                )
+
+
+def test_double_exp_update_global_parameters_context_pool(
+    ideal_water_force_field, water
+):
+    """Make sure energies evaluated after updating a system in place do not reuse the
+    pooled context that was created for its previous parameters."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    double_exp.method = "no-cutoff"
+    _add_de_water_parameters(double_exp)
+
+    water.generate_conformers(n_conformers=1)
+    conformers = _water_dimer_conformers(water, [3.0, 4.0])
+
+    interchange = Interchange.from_smirnoff(
+        ideal_water_force_field, Topology.from_molecules([water, water])
+    )
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    energies, _ = evaluate_energies(system, conformers)
+
+    interchange.collections["DoubleExponential"].update_global_parameters(
+        system, alpha=16.0
+    )
+
+    updated_energies, _ = evaluate_energies(system, conformers)
+    expected_energies, _ = evaluate_energies(
+        interchange.to_openmm(combine_nonbonded_forces=False), conformers
+    )
+
+    assert not numpy.allclose(updated_energies, energies)
+    assert numpy.allclose(updated_energies, expected_energies)
+
+
+def test_b68_tabulated_update_gamma(buckingham_water_force_field, water_box_topology):
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    buckingham_handler.tabulation = "spline"
+
+    interchange = buckingham_water_force_field.create_interchange(water_box_topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+
+    with pytest.raises(ValueError, match="gamma cannot be changed in place"):
+        interchange.collections["DampedBuckingham68"].update_global_parameters(
+            system, gamma=30.0 / unit.nanometer
+        )
+
+
+def test_double_exp_parameter_gradients(ideal_water_force_field, water):
+    """Make sure the analytic parameter gradients match finite differences."""
+
+    double_exp = ideal_water_force_field.get_parameter_handler("DoubleExponential")
+    _add_de_water_parameters(double_exp)
+
+    water.generate_conformers(n_conformers=1)
+    topology = Topology.from_molecules([water, water])
+
+    collection = Interchange.from_smirnoff(
+        ideal_water_force_field, topology
+    ).collections["DoubleExponential"]
+
+    conformer = water.conformers[0].m_as(unit.angstrom)
+    conformers = unit.Quantity(
+        numpy.stack(
+            [
+                numpy.vstack([conformer, conformer + numpy.array([[distance, 0, 0]])])
+                for distance in [2, 3, 4]
+            ]
+        ),
+        unit.angstrom,
+    )
+
+    energies, jacobian = collection.evaluate_parameter_gradients(topology, conformers)
+
+    assert energies == pytest.approx(
+        collection.evaluate_conformers(topology, conformers)[0]
+    )
+
+    labels = collection.parameter_labels()
+    assert jacobian.shape == (3, len(labels))
+
+    parameter_vector = collection.parameter_vector()
+
+    for i in range(len(parameter_vector)):
+        if parameter_vector[i] == 0.0:
+            continue
+
+        step = 1.0e-6 * abs(parameter_vector[i])
+        shifted_energies = []
+
+        for sign in (1.0, -1.0):
+            shifted = parameter_vector.copy()
+            shifted[i] += sign * step
+
+            collection.set_parameter_vector(shifted)
+            shifted_energies.append(
+                collection.evaluate_conformers(topology, conformers)[0]
+            )
+
+        collection.set_parameter_vector(parameter_vector)
+
+        assert jacobian[:, i] == pytest.approx(
+            (shifted_energies[0] - shifted_energies[1]) / (2.0 * step), rel=1.0e-5
+        )
+
+    for i, name in enumerate(collection.global_parameters()):
+        value = getattr(collection, name)
+        shifted_energies = []
+
+        for sign in (1.0, -1.0):
+            setattr(collection, name, value * (1.0 + sign * 1.0e-6))
+            shifted_energies.append(
+                collection.evaluate_conformers(topology, conformers)[0]
+            )
+
+        setattr(collection, name, value)
+
+        assert jacobian[:, len(parameter_vector) + i] == pytest.approx(
+            (shifted_energies[0] - shifted_energies[1]) / (2.0e-6 * value.m),
+            rel=1.0e-5,
+        )
+
+
+def test_store_matches_identical_molecules(buckingham_water_force_field):
+    """Make sure matching each unique molecule once and replicating the keys gives the
+    same key map as matching the whole topology, including for copies of a molecule
+    with a different atom ordering."""
+
+    topology = Topology.from_molecules(
+        [
+            Molecule.from_mapped_smiles("[H:2][O:1][H:3]"),
+            Molecule.from_mapped_smiles("[H:1][O:2][H:3]"),
+            Molecule.from_mapped_smiles("[H:2][O:1][H:3]"),
+            Molecule.from_mapped_smiles("[H:1][O:3][H:2]"),
+        ]
+    )
+
+    buckingham_handler = buckingham_water_force_field.get_parameter_handler(
+        "DampedBuckingham68"
+    )
+    collection = SMIRNOFFDampedBuckingham68Collection.create(
+        buckingham_handler, topology
+    )
+
+    expected_key_map = {
+        atom_indices: match.parameter_type.smirks
+        for atom_indices, match in buckingham_handler.find_matches(topology).items()
+    }
+    key_map = {
+        topology_key.atom_indices: potential_key.id
+        for topology_key, potential_key in collection.key_map.items()
+    }
+
+    assert key_map == expected_key_map
+    assert list(key_map) == sorted(expected_key_map)
@@ -0,0 +1,75 @@
+import os
+
+import numpy
+import openmm
+
+from smirnoff_plugins.utilities.batch import parameterize_topologies
+
+
+def test_parameterize_topologies(buckingham_water_force_field, water):
+    """Make sure topologies are parameterized in parallel and that a failure does not
+    stop the remaining topologies."""
+
+    inputs = [water, water.to_topology(), "not a topology"]
+
+    results = {
+        index: (result, error)
+        for index, result, error in parameterize_topologies(
+            buckingham_water_force_field, inputs, n_processes=2
+        )
+    }
+    assert sorted(results) == [0, 1, 2]
+
+    for index in (0, 1):
+        system, error = results[index]
+
+        assert error is None
+        assert openmm.XmlSerializer.deserialize(system).getNumParticles() == 4
+
+    assert results[2][0] is None
+    assert results[2][1] is not None
+
+
+def test_parameterize_topologies_parameters(buckingham_water_force_field, water):
+
+    ((index, parameters, error),) = parameterize_topologies(
+        buckingham_water_force_field, [water], output="parameters", n_processes=1
+    )
+
+    assert index == 0
+    assert error is None
+
+    assert list(parameters) == ["DampedBuckingham68"]
+    assert parameters["DampedBuckingham68"].shape == (3, 4)
+    assert numpy.allclose(parameters["DampedBuckingham68"][1:], 0.0)
+
+
+class _CrashWorker:
+    """An input that terminates the worker process which unpickles it."""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_parameterize_topologies_broken_pool(buckingham_water_force_field, water):
+    """Make sure that only the topology which terminates a worker process is reported
+    as failed, and that the pool is recreated for the remaining topologies."""
+
+    inputs = [water, _CrashWorker(), *([water] * 4)]
+
+    results = {
+        index: (result, error)
+        for index, result, error in parameterize_topologies(
+            buckingham_water_force_field, inputs, n_processes=2
+        )
+    }
+    assert sorted(results) == list(range(len(inputs)))
+
+    assert results[1][0] is None
+    assert "BrokenProcessPool" in results[1][1]
+
+    for index in [0, *range(2, len(inputs))]:
+        system, error = results[index]
+
+        assert error is None
+        assert openmm.XmlSerializer.deserialize(system).getNumParticles() == 4
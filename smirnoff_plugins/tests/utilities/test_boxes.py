@@ -0,0 +1,114 @@
+import numpy
+import pytest
+
+from smirnoff_plugins.utilities.boxes import (
+    box_length,
+    lattice_positions,
+    mole_fraction_counts,
+    packed_positions,
+    random_rotations,
+)
+
+WATER = numpy.array([[0.0, 0.0, 0.0], [0.9572, 0.0, 0.0], [-0.24, 0.927, 0.0]])
+
+
+def test_random_rotations():
+    """Make sure the rotation matrices are orthonormal and proper."""
+
+    rotations = random_rotations(100, numpy.random.default_rng(0))
+
+    assert rotations.shape == (100, 3, 3)
+    assert numpy.allclose(
+        numpy.einsum("nij,nkj->nik", rotations, rotations), numpy.eye(3)
+    )
+    assert numpy.allclose(numpy.linalg.det(rotations), 1.0)
+
+
+def test_box_length():
+    """Make sure 1000 water molecules at 0.997 g/mL fill a box of roughly 31 Å."""
+
+    assert box_length(18.015 * 1000, 0.997) == pytest.approx(31.07, abs=0.01)
+
+
+def test_lattice_positions():
+    """Make sure each molecule keeps its shape and is centered within the box."""
+
+    methane = numpy.array(
+        [[0.0, 0.0, 0.0], [0.63, 0.63, 0.63], [-0.63, -0.63, 0.63]]
+        + [[-0.63, 0.63, -0.63], [0.63, -0.63, -0.63]]
+    )
+
+    species = numpy.array([0, 1, 0, 0, 1, 1, 0, 0, 0, 1])
+    length = 20.0
+
+    positions = lattice_positions(
+        [WATER, methane], species, length, numpy.random.default_rng(0)
+    )
+
+    assert positions.shape == (6 * 3 + 4 * 5, 3)
+
+    offset = 0
+
+    for index in species:
+        template = [WATER, methane][index]
+        coordinates = positions[offset : offset + len(template)]
+
+        offset += len(template)
+
+        assert numpy.allclose(
+            numpy.linalg.norm(coordinates[:, None] - coordinates[None], axis=-1),
+            numpy.linalg.norm(template[:, None] - template[None], axis=-1),
+        )
+        assert numpy.all(coordinates.mean(axis=0) > 0.0)
+        assert numpy.all(coordinates.mean(axis=0) < length)
+
+
+@pytest.mark.parametrize(
+    "mole_fractions, n_molecules, expected_counts",
+    [
+        ([0.5, 0.5], 10, [5, 5]),
+        ([1.0 / 3.0] * 3, 10, [4, 3, 3]),
+        ([0.26, 0.74], 10, [3, 7]),
+        ([0.0, 1.0], 7, [0, 7]),
+    ],
+)
+def test_mole_fraction_counts(mole_fractions, n_molecules, expected_counts):
+    assert mole_fraction_counts(mole_fractions, n_molecules).tolist() == expected_counts
+
+
+def test_packed_positions():
+    """Make sure no two atoms of different molecules are placed within the tolerance,
+    including across the periodic boundary."""
+
+    n_molecules, length, tolerance = 500, box_length(18.015 * 500, 0.997), 1.5
+
+    positions = packed_positions(
+        [WATER],
+        numpy.zeros(n_molecules, dtype=int),
+        length,
+        numpy.random.default_rng(0),
+        tolerance,
+    )
+
+    assert positions.shape == (n_molecules * 3, 3)
+
+    deltas = positions[:, None, :] - positions[None, :, :]
+    deltas -= length * numpy.round(deltas / length)
+
+    distances = numpy.linalg.norm(deltas, axis=-1)
+
+    molecules = numpy.arange(n_molecules * 3) // 3
+    distances[molecules[:, None] == molecules[None, :]] = numpy.inf
+
+    assert distances.min() >= tolerance
+
+
+def test_packed_positions_too_dense():
+    with pytest.raises(ValueError, match="could not be placed"):
+        packed_positions(
+            [WATER],
+            numpy.zeros(100, dtype=int),
+            5.0,
+            numpy.random.default_rng(0),
+            n_trials=10,
+        )
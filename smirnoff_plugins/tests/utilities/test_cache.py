@@ -0,0 +1,127 @@
+import gzip
+import os
+
+import openff.interchange
+import openff.toolkit
+import openmm
+import openmm.app
+import pytest
+from openff.units import unit
+
+from smirnoff_plugins.utilities.cache import SystemCache
+
+
+def _system(n_particles: int) -> openmm.System:
+    system = openmm.System()
+
+    for _ in range(n_particles):
+        system.addParticle(1.0)
+
+    return system
+
+
+def _topology(n_atoms: int) -> openmm.app.Topology:
+    topology = openmm.app.Topology()
+    residue = topology.addResidue("UNK", topology.addChain())
+
+    for _ in range(n_atoms):
+        topology.addAtom("C", openmm.app.element.carbon, residue)
+
+    return topology
+
+
+def test_system_cache_round_trip(tmp_path):
+    """Make sure a cached system and topology load back, and can be invalidated."""
+
+    cache = SystemCache(str(tmp_path))
+    assert cache.get("a") is None
+
+    cache.put("a", _system(3), _topology(3))
+    cache.put("b", _system(2), _topology(2))
+
+    system, topology = cache.get("a")
+
+    assert system.getNumParticles() == 3
+    assert topology.getNumAtoms() == 3
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.keys() == ["b"]
+
+    cache.invalidate()
+    assert cache.keys() == []
+
+
+def test_system_cache_eviction(tmp_path):
+    """Make sure the least recently used entries are removed to fit the size."""
+
+    cache = SystemCache(str(tmp_path))
+
+    cache.put("a", _system(100), _topology(100))
+    max_size = cache.size * 2.5
+
+    cache = SystemCache(str(tmp_path), max_size=max_size)
+    cache.put("b", _system(100), _topology(100))
+
+    # Make the first entry the most recently used one.
+    os.utime(os.path.join(str(tmp_path), "b.pkl.gz"), (0, 0))
+    cache.get("a")
+
+    cache.put("c", _system(100), _topology(100))
+
+    assert sorted(cache.keys()) == ["a", "c"]
+    assert cache.size <= max_size
+
+
+def test_system_cache_key(buckingham_water_force_field, water):
+    """Make sure the key depends on the handler parameters but not on conformers."""
+
+    topology = water.to_topology()
+    key = SystemCache.key(buckingham_water_force_field, topology)
+
+    water.generate_conformers(n_conformers=1)
+    assert SystemCache.key(buckingham_water_force_field, water.to_topology()) == key
+
+    buckingham_water_force_field.get_parameter_handler("DampedBuckingham68").gamma = (
+        30.0 / unit.nanometer
+    )
+    assert SystemCache.key(buckingham_water_force_field, topology) != key
+
+
+@pytest.mark.parametrize("package", [openff.toolkit, openff.interchange, openmm])
+def test_system_cache_key_versions(
+    monkeypatch, buckingham_water_force_field, water, package
+):
+    """Make sure the key changes when a package which affects the system is updated."""
+
+    topology = water.to_topology()
+    key = SystemCache.key(buckingham_water_force_field, topology)
+
+    monkeypatch.setattr(package, "__version__", f"{package.__version__}.post1")
+    assert SystemCache.key(buckingham_water_force_field, topology) != key
+
+
+def test_system_cache_unreadable(tmp_path):
+    """Make sure an entry which cannot be loaded is treated as a miss and removed."""
+
+    cache = SystemCache(str(tmp_path))
+    cache.put("a", _system(3), _topology(3))
+
+    # Replace the entry with one that references a class which no longer exists.
+    with gzip.open(os.path.join(str(tmp_path), "a.pkl.gz"), "wb") as file:
+        file.write(b"cmissing_module\nMissingClass\n.")
+
+    assert cache.get("a") is None
+    assert cache.keys() == []
+
+
+def test_system_cache_put_leaves_no_temporary_files(tmp_path):
+    """Make sure that neither a successful nor a failed write leaves files behind."""
+
+    cache = SystemCache(str(tmp_path))
+    cache.put("a", _system(3), _topology(3))
+
+    with pytest.raises(Exception):
+        cache.put("b", _system(3), lambda: None)
+
+    assert os.listdir(str(tmp_path)) == ["a.pkl.gz"]
@@ -0,0 +1,165 @@
+import threading
+
+import openmm
+import openmm.unit
+import pytest
+
+from smirnoff_plugins.utilities.contexts import ContextPool
+
+
+def _harmonic_system(k: float) -> openmm.System:
+    system = openmm.System()
+    system.addParticle(1.0)
+    system.addParticle(1.0)
+
+    force = openmm.HarmonicBondForce()
+    force.addBond(0, 1, 0.1, k)
+    system.addForce(force)
+
+    return system
+
+
+def test_context_pool_reuse():
+    """Make sure systems with the same content share a context."""
+
+    pool = ContextPool(max_size=2)
+
+    with pool.context(_harmonic_system(100.0)) as context_1:
+        context_1.setPositions([[0.0, 0.0, 0.0], [0.2, 0.0, 0.0]])
+
+    with pool.context(_harmonic_system(100.0)) as context_2:
+        energy = context_2.getState(getEnergy=True).getPotentialEnergy()
+
+    assert context_1 is context_2
+    assert energy.value_in_unit(openmm.unit.kilojoule_per_mole) == pytest.approx(0.5)
+
+    with pool.context(_harmonic_system(100.0), properties={"x": "y"}):
+        pass
+
+    assert (pool.hits, pool.misses) == (1, 2)
+
+    pool.clear()
+    assert len(pool) == 0 and (pool.hits, pool.misses) == (0, 0)
+
+
+def test_context_pool_eviction():
+    """Make sure the least recently used contexts are evicted first."""
+
+    pool = ContextPool(max_size=2)
+
+    for k in [1.0, 2.0, 1.0, 3.0]:
+        with pool.context(_harmonic_system(k)):
+            pass
+
+    assert len(pool) == 2
+
+    with pool.context(_harmonic_system(1.0)):
+        pass
+    with pool.context(_harmonic_system(2.0)):
+        pass
+
+    assert (pool.hits, pool.misses) == (2, 4)
+
+    particle_pool = ContextPool(max_size=8, max_particles=4)
+
+    for k in [1.0, 2.0, 3.0]:
+        with particle_pool.context(_harmonic_system(k)):
+            pass
+
+    assert len(particle_pool) == 2
+    assert particle_pool.n_particles == 4
+
+    particle_pool = ContextPool(max_size=8, max_particles=1)
+
+    for k in [1.0, 2.0, 3.0]:
+        with particle_pool.context(_harmonic_system(k)):
+            pass
+
+    # The most recently used context is always kept.
+    assert len(particle_pool) == 1
+
+
+def test_context_pool_resets_box_vectors():
+    system = _harmonic_system(1.0)
+    system.setDefaultPeriodicBoxVectors([2.0, 0, 0], [0, 2.0, 0], [0, 0, 2.0])
+
+    pool = ContextPool()
+
+    with pool.context(system) as context:
+        context.setPeriodicBoxVectors([3.0, 0, 0], [0, 3.0, 0], [0, 0, 3.0])
+
+    with pool.context(system) as context:
+        box_vectors = context.getState().getPeriodicBoxVectors()
+
+    assert box_vectors[0][0].value_in_unit(openmm.unit.nanometer) == 2.0
+
+
+def test_context_pool_hashes_system_once(monkeypatch):
+    """Make sure a system is only serialized the first time it is seen."""
+
+    pool = ContextPool()
+    system = _harmonic_system(1.0)
+
+    n_serialized = []
+    serialize = openmm.XmlSerializer.serialize
+
+    def counted_serialize(value):
+        n_serialized.append(value)
+        return serialize(value)
+
+    monkeypatch.setattr(openmm.XmlSerializer, "serialize", counted_serialize)
+
+    for _ in range(3):
+        with pool.context(system):
+            pass
+
+    assert len(n_serialized) == 1
+    assert (pool.hits, pool.misses) == (2, 1)
+
+
+def test_context_pool_invalidate():
+    """Make sure a system modified in place is only given a new context once it has
+    been invalidated."""
+
+    pool = ContextPool()
+    system = _harmonic_system(100.0)
+
+    positions = [[0.0, 0.0, 0.0], [0.2, 0.0, 0.0]]
+
+    def energy():
+        with pool.context(system) as context:
+            context.setPositions(positions)
+            return context.getState(getEnergy=True).getPotentialEnergy()
+
+    assert energy().value_in_unit(openmm.unit.kilojoule_per_mole) == pytest.approx(0.5)
+
+    system.getForce(0).setBondParameters(0, 0, 1, 0.1, 200.0)
+    pool.invalidate(system)
+
+    assert energy().value_in_unit(openmm.unit.kilojoule_per_mole) == pytest.approx(1.0)
+    assert (pool.hits, pool.misses) == (0, 2)
+
+
+def test_context_pool_threads():
+    """Make sure concurrent lookups of the same system end up sharing one context."""
+
+    pool = ContextPool()
+    system = _harmonic_system(1.0)
+
+    contexts = []
+
+    def retrieve():
+        with pool.context(system) as context:
+            contexts.append(context)
+
+    threads = [threading.Thread(target=retrieve) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pool) == 1
+
+    with pool.context(system) as context:
+        assert any(context is other for other in contexts)
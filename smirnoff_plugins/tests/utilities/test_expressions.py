@@ -0,0 +1,151 @@
+import numpy
+import openmm
+import pytest
+
+from smirnoff_plugins.utilities.expressions import (
+    compile_pair_expression,
+    expressions_agree,
+    replace_definitions,
+)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "epsilon*((sigma/r)^12-2*(sigma/r)^6);epsilon=sqrt(epsilon1*epsilon2);"
+        "sigma=sigma1+sigma2",
+        "select(step(r-sigma1),exp(-epsilon1*r)/r,min(r,sigma2)^2)+"
+        "log(cosh(r))*max(epsilon2,r)-erfc(sigma1*r)",
+        "scale*tanh(epsilon1*r)^r;scale=2*sigma1*sigma2",
+    ],
+)
+def test_compile_pair_expression(expression):
+    """Make sure the compiled energies and their derivatives match OpenMM."""
+
+    kernel = compile_pair_expression(expression, ["sigma", "epsilon"], {})
+
+    parameters = [(0.3, 0.5), (0.2, 1.5)]
+    r = numpy.linspace(0.21, 1.49, 27)
+
+    energies, derivatives, _ = kernel(
+        r,
+        dict(zip(["sigma", "epsilon"], parameters[0])),
+        dict(zip(["sigma", "epsilon"], parameters[1])),
+    )
+
+    force = openmm.CustomNonbondedForce(expression)
+    force.addPerParticleParameter("sigma")
+    force.addPerParticleParameter("epsilon")
+    force.addParticle(parameters[0])
+    force.addParticle(parameters[1])
+
+    system = openmm.System()
+    system.addParticle(1.0)
+    system.addParticle(1.0)
+    system.addForce(force)
+
+    context = openmm.Context(
+        system,
+        openmm.VerletIntegrator(1.0),
+        openmm.Platform.getPlatformByName("Reference"),
+    )
+
+    for distance, energy, derivative in zip(r, energies, derivatives):
+        context.setPositions([[0.0, 0.0, 0.0], [distance, 0.0, 0.0]])
+        state = context.getState(getEnergy=True, getForces=True)
+
+        assert energy == pytest.approx(
+            state.getPotentialEnergy().value_in_unit(openmm.unit.kilojoule_per_mole),
+            rel=1.0e-6,
+        )
+        assert -derivative == pytest.approx(
+            state.getForces(asNumpy=True)[1, 0].value_in_unit(
+                openmm.unit.kilojoule_per_mole / openmm.unit.nanometer
+            ),
+            rel=1.0e-6,
+            abs=1.0e-8,
+        )
+
+
+def test_compile_pair_expression_parameter_derivatives():
+    """Make sure the parameter derivatives match finite differences."""
+
+    expression = (
+        "scale*exp(-epsilon*r)/r^6;scale=2*sigma1*sigma2*gamma;epsilon=epsilon1"
+    )
+
+    parameters_1 = {"sigma": 0.3, "epsilon": 0.5}
+    parameters_2 = {"sigma": 0.2, "epsilon": 1.5}
+    global_parameters = {"gamma": 1.7}
+
+    r = numpy.linspace(0.21, 1.49, 27)
+
+    kernel = compile_pair_expression(
+        expression,
+        ["sigma", "epsilon"],
+        global_parameters,
+        ["sigma1", "epsilon1", "epsilon2", "gamma"],
+    )
+    _, _, derivatives = kernel(r, parameters_1, parameters_2)
+
+    assert numpy.allclose(derivatives["epsilon2"], 0.0)
+
+    step = 1.0e-6
+
+    for name, parameters in [("sigma", parameters_1), ("epsilon", parameters_1)]:
+        energies = []
+
+        for sign in (1.0, -1.0):
+            shifted = {**parameters, name: parameters[name] + sign * step}
+            energies.append(
+                compile_pair_expression(
+                    expression, ["sigma", "epsilon"], global_parameters
+                )(r, shifted, parameters_2)[0]
+            )
+
+        assert numpy.allclose(
+            derivatives[f"{name}1"], (energies[0] - energies[1]) / (2.0 * step)
+        )
+
+    energies = [
+        compile_pair_expression(
+            expression, ["sigma", "epsilon"], {"gamma": 1.7 + sign * step}
+        )(r, parameters_1, parameters_2)[0]
+        for sign in (1.0, -1.0)
+    ]
+    assert numpy.allclose(
+        derivatives["gamma"], (energies[0] - energies[1]) / (2.0 * step)
+    )
+
+
+def test_compile_pair_expression_undefined():
+    with pytest.raises(ValueError, match="undefined variables: \\['gamma'\\]"):
+        compile_pair_expression("gamma*r*a1*a2", ["a"], {})
+
+
+@pytest.mark.parametrize("expression", ["r%2*a1*a2", "(r<1)*a1*a2"])
+def test_compile_pair_expression_unsupported(expression):
+    unsupported = expression.split("*")[0].strip("()")
+
+    with pytest.raises(NotImplementedError, match=f"{unsupported} is not supported"):
+        compile_pair_expression(expression, ["a"], {})
+
+
+def test_replace_definitions():
+    assert (
+        replace_definitions("a*b;a=c*r;b=2*r;c=3", {"a": "4*r"}) == "a*b;a=4*r;b=2*r;"
+    )
+
+
+def test_expressions_agree():
+    r = numpy.linspace(0.1, 1.0, 50)
+    parameters = {"a": numpy.full(50, 2.0)}
+
+    expression = "a1*a2*(3*r^3+2*r^2+r+4)"
+
+    assert expressions_agree(
+        expression, "a1*a2*(4+r*(1+r*(2+r*3)))", ["a"], {}, r, parameters, parameters
+    )
+    assert not expressions_agree(
+        expression, "a1*a2*(4+r*(1+r*(2+r*3.1)))", ["a"], {}, r, parameters, parameters
+    )
@@ -0,0 +1,148 @@
+import json
+
+import numpy
+import openmm.app
+import openmm.unit
+import pytest
+from openff.interchange import Interchange
+from openff.toolkit.topology import Molecule, Topology
+from openff.units import unit
+
+from smirnoff_plugins.utilities.openmm import (
+    evaluate_energies,
+    evaluate_energy,
+    mixture_box,
+    simulate,
+    water_box,
+)
+
+
+def test_evaluate_energies(buckingham_water_force_field, water):
+    """Make sure the batched energies match those evaluated one conformer at a time,
+    and that the virtual site coordinates are padded automatically."""
+
+    water.generate_conformers(n_conformers=1)
+    topology = Topology.from_molecules([water, water])
+
+    interchange = Interchange.from_smirnoff(buckingham_water_force_field, topology)
+    system = interchange.to_openmm(combine_nonbonded_forces=False)
+    openmm_topology = interchange.to_openmm_topology()
+
+    conformer = water.conformers[0].m_as(unit.nanometer)
+    conformers = numpy.stack(
+        [
+            numpy.vstack([conformer, conformer + numpy.array([[distance, 0, 0]])])
+            for distance in [0.25, 0.3, 0.4]
+        ]
+    )
+
+    energies, forces = evaluate_energies(
+        system, conformers * openmm.unit.nanometer, compute_forces=True
+    )
+
+    assert energies.shape == (3,)
+    assert forces.shape == (3, 6, 3)
+
+    for conformer, energy in zip(conformers, energies):
+        padded = numpy.vstack([conformer, numpy.zeros((2, 3))])
+        assert energy == pytest.approx(
+            evaluate_energy(system, openmm_topology, padded * openmm.unit.nanometer)
+        )
+
+
+def test_simulate_resume(buckingham_water_force_field, water, tmp_path, monkeypatch):
+    """Make sure a preempted simulation resumes from its last checkpoint and appends
+    to its outputs without repeating or missing any reports."""
+
+    water.generate_conformers(n_conformers=1)
+    topology = Topology.from_molecules([water, water])
+
+    conformer = water.conformers[0].m_as(unit.nanometer)
+    positions = (
+        numpy.vstack([conformer, conformer + numpy.array([[0.3, 0.0, 0.0]])])
+        * openmm.unit.nanometer
+    )
+
+    monkeypatch.chdir(tmp_path)
+
+    step = openmm.app.Simulation.step
+
+    def preempted_step(simulation, n_steps):
+        step(simulation, n_steps)
+
+        if simulation.currentStep >= 60:
+            raise RuntimeError("preempted")
+
+    settings = dict(
+        force_field=buckingham_water_force_field,
+        topology=topology,
+        positions=positions,
+        box_vectors=numpy.eye(3) * 2.0 * openmm.unit.nanometer,
+        n_steps=100,
+        temperature=300.0,
+        pressure=None,
+        output_directory=str(tmp_path),
+        checkpoint_interval=20,
+    )
+
+    monkeypatch.setattr(openmm.app.Simulation, "step", preempted_step)
+
+    with pytest.raises(RuntimeError, match="preempted"):
+        simulate(**settings)
+
+    monkeypatch.setattr(openmm.app.Simulation, "step", step)
+    simulate(**settings, resume=True)
+
+    with open(tmp_path / "data.csv") as file:
+        steps = [int(line.split(",")[0]) for line in file.read().splitlines()[1:]]
+
+    assert steps == list(range(5, 101, 5))
+
+    with open(tmp_path / "timings.json") as file:
+        timings = json.load(file)
+
+    assert timings["n_steps"] == 60
+    assert {"interchange", "to_openmm", "context", "md"} <= set(timings["phases"])
+
+
+def test_water_box():
+    """Make sure the box is sized for the target density and holds every atom."""
+
+    topology, positions = water_box(64, random_seed=0)
+
+    assert topology.n_molecules == 64
+    assert positions.shape == (64 * 3, 3)
+
+    length = topology.box_vectors[0, 0].m_as(unit.angstrom)
+    # 64 * 18.015 g/mol at 0.997 g/mL fills a box of roughly 12.4 Å.
+    assert numpy.isclose(length, 12.43, atol=0.01)
+
+    oxygens = positions[::3].m_as(unit.angstrom)
+    assert numpy.all((oxygens > -1.0) & (oxygens < length + 1.0))
+
+
+@pytest.mark.parametrize("placement", ["lattice", "packed"])
+def test_mixture_box(placement):
+    """Make sure the mole fractions are respected, the molecules are grouped by species
+    and the input molecules are left untouched."""
+
+    water, methanol = Molecule.from_smiles("O"), Molecule.from_smiles("CO")
+
+    topology, positions = mixture_box(
+        [water, methanol],
+        unit.Quantity(0.9, unit.gram / unit.milliliter),
+        mole_fractions=[0.75, 0.25],
+        n_molecules=40,
+        placement=placement,
+        random_seed=0,
+    )
+
+    assert [molecule.to_smiles() for molecule in topology.molecules] == [
+        water.to_smiles()
+    ] * 30 + [methanol.to_smiles()] * 10
+    assert positions.shape == (topology.n_atoms, 3)
+    assert numpy.allclose(
+        topology.get_positions().m_as(unit.angstrom), positions.m_as(unit.angstrom)
+    )
+
+    assert water.n_conformers == 0
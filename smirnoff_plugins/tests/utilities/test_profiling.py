@@ -0,0 +1,110 @@
+import openmm
+import openmm.unit
+
+from smirnoff_plugins.utilities.profiling import (
+    benchmark_expression,
+    format_force_profile,
+    profile_forces,
+)
+
+
+def test_profile_forces():
+    """Make sure every force, the constraints and the virtual sites are profiled."""
+
+    system = openmm.System()
+
+    for _ in range(3):
+        system.addParticle(1.0)
+
+    system.addParticle(0.0)
+    system.setVirtualSite(3, openmm.TwoParticleAverageSite(0, 1, 0.5, 0.5))
+    system.addConstraint(0, 1, 0.1)
+
+    bond_force = openmm.HarmonicBondForce()
+    bond_force.addBond(1, 2, 0.1, 1000.0)
+    system.addForce(bond_force)
+
+    nonbonded_force = openmm.CustomNonbondedForce("r^-6")
+    nonbonded_force.setName("Dispersion")
+
+    for _ in range(4):
+        nonbonded_force.addParticle([])
+
+    system.addForce(nonbonded_force)
+
+    positions = [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [0.2, 0.1, 0.0], [0.05, 0.0, 0.0]]
+
+    rows = profile_forces(system, positions * openmm.unit.nanometer, n_repeats=2)
+
+    assert [row["name"] for row in rows] == [
+        "HarmonicBondForce",
+        "Dispersion",
+        "Constraints",
+        "VirtualSites",
+        "Overhead",
+    ]
+    assert [row["group"] for row in rows] == [0, 1, -1, -1, -1]
+    assert abs(sum(row["fraction"] for row in rows) - 1.0) < 1.0e-8
+
+    # The force groups of the original system should not be modified.
+    assert system.getForce(1).getForceGroup() == 0
+
+    table = format_force_profile(rows)
+    assert len(table.splitlines()) == len(rows) + 1
+
+
+def test_benchmark_expression():
+    timing = benchmark_expression(
+        "4*epsilon*((sigma/r)^12-(sigma/r)^6);"
+        "epsilon=sqrt(epsilon1*epsilon2);sigma=0.5*(sigma1+sigma2)",
+        ["sigma", "epsilon"],
+        {},
+        [[0.3, 0.5], [0.25, 0.1]],
+        cutoff=0.6,
+        n_particles=100,
+        platform="Reference",
+        n_repeats=2,
+    )
+
+    assert timing > 0.0
+
+
+def test_profile_forces_reciprocal_space_group(monkeypatch):
+    """Make sure the reciprocal space part of PME is profiled with its force."""
+
+    system = openmm.System()
+    system.setDefaultPeriodicBoxVectors(
+        openmm.Vec3(2.0, 0.0, 0.0),
+        openmm.Vec3(0.0, 2.0, 0.0),
+        openmm.Vec3(0.0, 0.0, 2.0),
+    )
+
+    system.addForce(openmm.HarmonicBondForce())
+
+    nonbonded_force = openmm.NonbondedForce()
+    nonbonded_force.setNonbondedMethod(openmm.NonbondedForce.PME)
+    nonbonded_force.setReciprocalSpaceForceGroup(0)
+
+    for charge in (1.0, -1.0):
+        system.addParticle(1.0)
+        nonbonded_force.addParticle(charge, 0.3, 0.5)
+
+    system.addForce(nonbonded_force)
+
+    profiled_systems = []
+    create_context = openmm.Context
+
+    def mock_context(profiled_system, *args):
+        profiled_systems.append(profiled_system)
+        return create_context(profiled_system, *args)
+
+    monkeypatch.setattr(openmm, "Context", mock_context)
+
+    rows = profile_forces(
+        system, [[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]] * openmm.unit.nanometer, n_repeats=1
+    )
+
+    assert all(row["time"] >= 0.0 for row in rows)
+
+    (profiled_system,) = profiled_systems
+    assert profiled_system.getForce(1).getReciprocalSpaceForceGroup() == 1
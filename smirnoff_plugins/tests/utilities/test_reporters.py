@@ -0,0 +1,80 @@
+import io
+
+import openmm
+import openmm.app
+import openmm.unit
+import pytest
+
+from smirnoff_plugins.utilities.reporters import AsyncReporter
+
+
+def _simulation() -> openmm.app.Simulation:
+    system = openmm.System()
+    topology = openmm.app.Topology()
+    residue = topology.addResidue("UNK", topology.addChain())
+
+    for _ in range(2):
+        system.addParticle(1.0)
+        topology.addAtom("C", openmm.app.element.carbon, residue)
+
+    force = openmm.HarmonicBondForce()
+    force.addBond(0, 1, 0.1, 1000.0)
+    system.addForce(force)
+
+    simulation = openmm.app.Simulation(
+        topology,
+        system,
+        openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds),
+        openmm.Platform.getPlatformByName("Reference"),
+    )
+    simulation.context.setPositions([[0.0, 0.0, 0.0], [0.12, 0.0, 0.0]])
+
+    return simulation
+
+
+def test_async_reporter():
+    """Make sure the reported states match those written synchronously, including
+    the step that each was reported at."""
+
+    outputs = []
+
+    for buffer_size in [None, 2]:
+        output = io.StringIO()
+        reporter = openmm.app.StateDataReporter(
+            output, 5, step=True, potentialEnergy=True
+        )
+
+        simulation = _simulation()
+
+        if buffer_size is None:
+            simulation.reporters.append(reporter)
+            simulation.step(50)
+        else:
+            with AsyncReporter(reporter, buffer_size) as async_reporter:
+                simulation.reporters.append(async_reporter)
+                simulation.step(50)
+
+        outputs.append(output.getvalue())
+
+    assert len(outputs[0].splitlines()) == 11
+    assert outputs[0] == outputs[1]
+
+
+def test_async_reporter_error():
+    """Make sure errors raised while writing are raised when the reporter is closed."""
+
+    class FailingReporter:
+        def describeNextReport(self, simulation):
+            return 5, False, False, False, True
+
+        def report(self, simulation, state):
+            raise ValueError("failed to write")
+
+    simulation = _simulation()
+    reporter = AsyncReporter(FailingReporter())
+    simulation.reporters.append(reporter)
+
+    simulation.step(5)
+
+    with pytest.raises(ValueError, match="failed to write"):
+        reporter.close()
@@ -0,0 +1,26 @@
+import json
+
+from smirnoff_plugins.utilities.timing import PhaseTimer
+
+
+def test_phase_timer(tmp_path):
+    """Make sure repeated phases accumulate and are written alongside the metrics."""
+
+    timer = PhaseTimer()
+
+    for _ in range(2):
+        with timer.phase("md"):
+            pass
+
+    with timer.phase("io"):
+        pass
+
+    timer.metrics["n_steps"] = 10
+    timer.write(str(tmp_path / "timings.json"))
+
+    with open(tmp_path / "timings.json") as file:
+        timings = json.load(file)
+
+    assert sorted(timings["phases"]) == ["io", "md"]
+    assert timings["total"] == sum(timings["phases"].values())
+    assert timings["n_steps"] == 10
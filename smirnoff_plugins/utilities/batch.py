@@ -0,0 +1,204 @@
+"""Utilities for parameterizing many topologies in parallel across a pool of worker
+processes."""
+import concurrent.futures
+import itertools
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+import numpy
+import openmm
+from openff.toolkit import ForceField, Molecule, Topology
+
+logger = logging.getLogger(__name__)
+
+ParameterizationOutput = Literal["system", "parameters"]
+
+# The force field of each worker process, which is deserialized once by the pool
+# initializer rather than being sent along with every topology.
+_WORKER_FORCE_FIELD: Optional[ForceField] = None
+
+
+def _initialize_worker(force_field: str):
+    """Load the force field that every task in a worker process will apply."""
+    global _WORKER_FORCE_FIELD
+    _WORKER_FORCE_FIELD = ForceField(force_field, load_plugins=True)
+
+
+def _parameterize(
+    topology: Union[Topology, Molecule], output: ParameterizationOutput
+) -> Tuple[Optional[Union[str, Dict[str, numpy.ndarray]]], Optional[str]]:
+    """Apply the force field of the worker process to a single topology.
+
+    Any failure is caught and returned as a message so that it can be reported without
+    stopping the remaining tasks, or requiring the exception itself to be picklable.
+    """
+    assert _WORKER_FORCE_FIELD is not None, "the worker has not been initialized."
+
+    try:
+        if isinstance(topology, Molecule):
+            topology = topology.to_topology()
+
+        interchange = _WORKER_FORCE_FIELD.create_interchange(topology)
+
+        if output == "system":
+            system = interchange.to_openmm(combine_nonbonded_forces=False)
+            return openmm.XmlSerializer.serialize(system), None
+
+        return {
+            name: collection.particle_parameters(topology)
+            for name, collection in interchange.collections.items()
+            if getattr(collection, "is_plugin", False)
+        }, None
+
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _create_executor(
+    force_field: str, n_processes: int
+) -> concurrent.futures.ProcessPoolExecutor:
+    """Create a pool of worker processes which have each loaded the force field."""
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=n_processes,
+        initializer=_initialize_worker,
+        initargs=(force_field,),
+    )
+
+
+def parameterize_topologies(
+    force_field: ForceField,
+    topologies: Iterable[Union[Topology, Molecule]],
+    output: ParameterizationOutput = "system",
+    n_processes: Optional[int] = None,
+) -> Iterator[
+    Tuple[int, Optional[Union[str, Dict[str, numpy.ndarray]]], Optional[str]]
+]:
+    """Parameterize many topologies with a force field across a pool of processes,
+    yielding the results in the order that they complete.
+
+    The force field is serialized once and loaded once by each worker process, after
+    which only the topologies and results are exchanged with the workers. At most
+    twice as many topologies as there are processes are submitted at any one time.
+
+    If a worker process terminates abruptly, e.g. after running out of memory, the pool
+    is recreated. The topologies that were being parameterized at the time are then
+    retried one at a time, so that only a topology which terminates a worker on its own
+    is reported as failed.
+
+    Parameters
+    ----------
+    force_field
+        The force field to apply, which may contain plugin handlers.
+    topologies
+        The topologies or molecules to parameterize.
+    output
+        Whether to return each parameterized system serialized as OpenMM XML
+        (``"system"``), or a dictionary of the modified per-atom parameter arrays of
+        every plugin collection (``"parameters"``).
+    n_processes
+        The number of worker processes, by default the number of CPUs.
+
+    Returns
+    -------
+        An iterator over the index of each topology in the input, its result and an
+        error message. The result is ``None`` when parameterizing the topology failed,
+        in which case the message describes the failure, otherwise the message is
+        ``None``.
+    """
+    n_processes = n_processes if n_processes is not None else os.cpu_count() or 1
+
+    # Only a bounded window of topologies is submitted at any one time, so that a
+    # large or lazily generated input is not held in memory all at once.
+    window_size = 2 * n_processes
+
+    serialized_force_field = force_field.to_string()
+
+    remaining = enumerate(topologies)
+
+    # The topologies that were in flight when a worker terminated, any of which may
+    # have caused it, and which are retried in isolation.
+    suspects: List[Tuple[int, Union[Topology, Molecule]]] = []
+
+    # The index and topology of each submitted task, and whether it is being retried
+    # in isolation.
+    pending: Dict[
+        concurrent.futures.Future, Tuple[int, Union[Topology, Molecule], bool]
+    ] = {}
+
+    executor = _create_executor(serialized_force_field, n_processes)
+
+    try:
+        while True:
+            if len(suspects) > 0:
+                submissions = [(*suspects.pop(0), True)] if len(pending) == 0 else []
+            else:
+                submissions = [
+                    (index, topology, False)
+                    for index, topology in itertools.islice(
+                        remaining, window_size - len(pending)
+                    )
+                ]
+
+            broken = False
+
+            for index, topology, isolated in submissions:
+                try:
+                    future = executor.submit(_parameterize, topology, output)
+                except BrokenProcessPool:
+                    broken = True
+                    suspects.append((index, topology))
+                    continue
+
+                pending[future] = (index, topology, isolated)
+
+            if len(pending) == 0 and not broken:
+                break
+
+            done = set()
+
+            if len(pending) > 0:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+            for future in done:
+                index, topology, isolated = pending.pop(future)
+
+                try:
+                    result, error = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+
+                    if not isolated:
+                        suspects.append((index, topology))
+                        continue
+
+                    result, error = None, f"{type(e).__name__}: {e}"
+
+                if error is not None:
+                    logger.warning(f"Failed to parameterize topology {index}: {error}")
+
+                yield index, result, error
+
+            if not broken:
+                continue
+
+            # Every task still in flight fails along with the pool, and so is retried.
+            suspects.extend(
+                (index, topology) for index, topology, _ in pending.values()
+            )
+            pending.clear()
+
+            logger.warning(
+                "A worker process terminated abruptly, and so the pool is recreated "
+                "and the topologies that were being parameterized are retried one at a "
+                "time."
+            )
+
+            executor.shutdown(wait=True)
+            executor = _create_executor(serialized_force_field, n_processes)
+
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,364 @@
+"""Utilities for placing the coordinates of many molecules in a periodic box, entirely
+in NumPy."""
+import logging
+from typing import Optional, Sequence
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+_AVOGADRO = 6.02214076e23
+
+
+def random_rotations(n: int, random: numpy.random.Generator) -> numpy.ndarray:
+    """Return ``n`` rotation matrices drawn uniformly from all rotations, with
+    shape=(n, 3, 3).
+
+    The matrices are built from unit quaternions, which are uniformly distributed when
+    drawn from a normalized four dimensional Gaussian.
+    """
+    quaternions = random.normal(size=(n, 4))
+    quaternions /= numpy.linalg.norm(quaternions, axis=1, keepdims=True)
+
+    w, x, y, z = quaternions.T
+
+    return numpy.stack(
+        [
+            1.0 - 2.0 * (y * y + z * z),
+            2.0 * (x * y - z * w),
+            2.0 * (x * z + y * w),
+            2.0 * (x * y + z * w),
+            1.0 - 2.0 * (x * x + z * z),
+            2.0 * (y * z - x * w),
+            2.0 * (x * z - y * w),
+            2.0 * (y * z + x * w),
+            1.0 - 2.0 * (x * x + y * y),
+        ],
+        axis=-1,
+    ).reshape(n, 3, 3)
+
+
+def box_length(mass: float, density: float) -> float:
+    """Return the length [Å] of the cubic box which holds a given mass [g/mol] of
+    molecules at a given density [g/mL]."""
+    return (mass / (_AVOGADRO * density) * 1.0e24) ** (1.0 / 3.0)
+
+
+def mole_fraction_counts(
+    mole_fractions: Sequence[float], n_molecules: int
+) -> numpy.ndarray:
+    """Return the number of molecules of each species in a mixture of ``n_molecules``
+    molecules whose composition best matches the given mole fractions.
+
+    The counts are rounded down, and the molecules which remain are given to the
+    species with the largest remainders.
+    """
+    mole_fractions = numpy.asarray(mole_fractions, dtype=float)
+
+    assert numpy.all(mole_fractions >= 0.0) and numpy.isclose(
+        mole_fractions.sum(), 1.0
+    ), "the mole fractions must be non-negative and sum to one."
+
+    exact_counts = mole_fractions * n_molecules
+    counts = numpy.floor(exact_counts).astype(int)
+
+    remainders = numpy.argsort(counts - exact_counts, kind="stable")
+    counts[remainders[: n_molecules - counts.sum()]] += 1
+
+    return counts
+
+
+def place_molecules(
+    templates: Sequence[numpy.ndarray],
+    species: numpy.ndarray,
+    centers: numpy.ndarray,
+    random: Optional[numpy.random.Generator] = None,
+) -> numpy.ndarray:
+    """Place a randomly rotated copy of the template coordinates of each molecule at
+    its center.
+
+    Parameters
+    ----------
+    templates
+        The coordinates of each species with shape=(n_atoms, 3), which are rotated about
+        their centroid.
+    species
+        The index of the template of each molecule, in the order that the molecules
+        appear in the topology.
+    centers
+        The center of each molecule with shape=(n_molecules, 3).
+    random
+        The random number generator to draw the rotations from, or ``None`` to keep
+        the orientation of the templates.
+
+    Returns
+    -------
+        The coordinates of every atom with shape=(n_atoms, 3), in topology order.
+    """
+    species = numpy.asarray(species, dtype=int)
+
+    templates = [
+        numpy.asarray(template, dtype=float).reshape(-1, 3) for template in templates
+    ]
+    templates = [template - template.mean(axis=0) for template in templates]
+
+    n_atoms = numpy.array([len(template) for template in templates])[species]
+    offsets = numpy.concatenate([[0], numpy.cumsum(n_atoms)])
+
+    positions = numpy.empty((offsets[-1], 3))
+
+    for index, template in enumerate(templates):
+        molecules = numpy.flatnonzero(species == index)
+
+        if len(molecules) == 0:
+            continue
+
+        coordinates = numpy.broadcast_to(template, (len(molecules), *template.shape))
+
+        if random is not None:
+            coordinates = numpy.einsum(
+                "nij,aj->nai", random_rotations(len(molecules), random), template
+            )
+
+        atom_indices = offsets[molecules, None] + numpy.arange(len(template))
+        positions[atom_indices] = coordinates + centers[molecules, None, :]
+
+    return positions
+
+
+def _lattice_size(n_molecules: int) -> int:
+    """Return the number of cells along each side of the smallest cubic lattice with
+    at least ``n_molecules`` cells."""
+    n_per_side = max(1, round(n_molecules ** (1.0 / 3.0)))
+
+    # Guard against the cube root being rounded either way.
+    while n_per_side**3 < n_molecules:
+        n_per_side += 1
+
+    return n_per_side
+
+
+def lattice_positions(
+    templates: Sequence[numpy.ndarray],
+    species: numpy.ndarray,
+    length: float,
+    random: Optional[numpy.random.Generator] = None,
+) -> numpy.ndarray:
+    """Place a randomly rotated copy of the template of each molecule at the center of
+    a randomly chosen cell of a cubic lattice which fills a cubic box.
+
+    Parameters
+    ----------
+    templates
+        The coordinates [Å] of each species with shape=(n_atoms, 3).
+    species
+        The index of the template of each molecule, in topology order.
+    length
+        The length [Å] of the box.
+    random
+        The random number generator to draw the cells and rotations from, or ``None``
+        to occupy the cells in order without rotating the templates.
+
+    Returns
+    -------
+        The coordinates [Å] of every atom with shape=(n_atoms, 3), in topology order.
+    """
+    n_molecules = len(species)
+    n_per_side = _lattice_size(n_molecules)
+
+    spacing = length / n_per_side
+    diameter = max(
+        2.0 * numpy.linalg.norm(template - template.mean(axis=0), axis=-1).max()
+        for template in (
+            numpy.asarray(template, dtype=float).reshape(-1, 3)
+            for template in templates
+        )
+    )
+
+    if diameter > spacing:
+        logger.warning(
+            f"The largest molecule ({diameter:.2f} Å across) does not fit within a "
+            f"lattice cell ({spacing:.2f} Å), and so some molecules may overlap."
+        )
+
+    cells = (
+        numpy.arange(n_molecules)
+        if random is None
+        else random.choice(n_per_side**3, n_molecules, replace=False)
+    )
+    centers = (
+        numpy.stack(numpy.unravel_index(cells, (n_per_side,) * 3), axis=-1) + 0.5
+    ) * spacing
+
+    return place_molecules(templates, species, centers, random)
+
+
+class _CellList:
+    """The coordinates of every atom placed so far, binned into the cells of a cubic
+    grid which are at least as wide as the overlap tolerance, so that only the atoms of
+    neighbouring cells need to be compared with those of a new molecule.
+
+    Each cell stores a fixed number of coordinates, padded with NaN, which is doubled
+    whenever a cell fills up.
+    """
+
+    _NEIGHBOURS = numpy.stack(
+        numpy.meshgrid(*[numpy.arange(-1, 2)] * 3, indexing="ij"), axis=-1
+    ).reshape(-1, 3)
+
+    def __init__(self, length: float, tolerance: float, capacity: int = 1):
+        self.length = length
+        self.tolerance = tolerance
+
+        self.n_per_side = max(1, int(length // tolerance))
+
+        self.coordinates = numpy.full((self.n_per_side**3, capacity, 3), numpy.nan)
+        self.counts = numpy.zeros(self.n_per_side**3, dtype=int)
+
+    def _cells(self, coordinates: numpy.ndarray) -> numpy.ndarray:
+        """Return the grid index of the cell which contains each set of coordinates,
+        with shape=(..., 3)."""
+        return (
+            numpy.floor(coordinates / self.length * self.n_per_side).astype(int)
+            % self.n_per_side
+        )
+
+    def _flatten(self, cells: numpy.ndarray) -> numpy.ndarray:
+        return (cells % self.n_per_side) @ numpy.array(
+            [self.n_per_side**2, self.n_per_side, 1]
+        )
+
+    def overlaps(self, coordinates: numpy.ndarray) -> numpy.ndarray:
+        """Return whether any atom of each trial placement with shape=(n_trials,
+        n_atoms, 3) is within the tolerance of an atom that has already been placed,
+        taking the periodic images into account."""
+        cells = self._flatten(self._cells(coordinates)[..., None, :] + self._NEIGHBOURS)
+
+        deltas = coordinates[:, :, None, None, :] - self.coordinates[cells]
+        deltas -= self.length * numpy.round(deltas / self.length)
+
+        # The NaN padding of the empty slots never compares as an overlap.
+        return numpy.any(
+            numpy.einsum("...i,...i->...", deltas, deltas) < self.tolerance**2,
+            axis=(1, 2, 3),
+        )
+
+    def add(self, coordinates: numpy.ndarray):
+        """Add the coordinates with shape=(n_atoms, 3) of a placed molecule."""
+        for cell, atom in zip(self._flatten(self._cells(coordinates)), coordinates):
+            if self.counts[cell] == self.coordinates.shape[1]:
+                self.coordinates = numpy.concatenate(
+                    [self.coordinates, numpy.full_like(self.coordinates, numpy.nan)],
+                    axis=1,
+                )
+
+            self.coordinates[cell, self.counts[cell]] = atom
+            self.counts[cell] += 1
+
+
+def packed_positions(
+    templates: Sequence[numpy.ndarray],
+    species: numpy.ndarray,
+    length: float,
+    random: numpy.random.Generator,
+    tolerance: float = 2.0,
+    n_trials: int = 1000,
+    max_batch_size: int = 64,
+) -> numpy.ndarray:
+    """Place a randomly rotated copy of the template of each molecule at a random point
+    in a cubic box, rejecting any placement in which an atom lies within a tolerance of
+    an atom of a molecule that has already been placed.
+
+    The molecules are placed from the largest to the smallest, while the box is still
+    empty enough to fit them. The trial placements of each molecule are drawn and
+    checked in batches, starting from a single placement and doubling in size after
+    every rejected batch.
+
+    Parameters
+    ----------
+    templates
+        The coordinates [Å] of each species with shape=(n_atoms, 3).
+    species
+        The index of the template of each molecule, in topology order.
+    length
+        The length [Å] of the box.
+    random
+        The random number generator to draw the placements from.
+    tolerance
+        The minimum distance [Å] between the atoms of different molecules, including
+        their periodic images.
+    n_trials
+        The maximum number of placements to try per molecule.
+    max_batch_size
+        The maximum number of placements to draw and check at once.
+
+    Raises
+    ------
+    ValueError
+        If a molecule could not be placed, e.g. because the box is too dense.
+
+    Returns
+    -------
+        The coordinates [Å] of every atom with shape=(n_atoms, 3), in topology order.
+    """
+    species = numpy.asarray(species, dtype=int)
+
+    templates = [
+        numpy.asarray(template, dtype=float).reshape(-1, 3) for template in templates
+    ]
+    templates = [template - template.mean(axis=0) for template in templates]
+
+    radii = numpy.array(
+        [numpy.linalg.norm(template, axis=-1).max() for template in templates]
+    )
+
+    n_atoms = numpy.array([len(template) for template in templates])[species]
+    offsets = numpy.concatenate([[0], numpy.cumsum(n_atoms)])
+
+    positions = numpy.empty((offsets[-1], 3))
+
+    cell_list = _CellList(length, tolerance)
+
+    # Draw the trial rotations and centers in bulk, as drawing them a few at a time
+    # would be dominated by the overhead of each call.
+    rotations = numpy.empty((0, 3, 3))
+    centers = numpy.empty((0, 3))
+
+    for molecule in numpy.argsort(-radii[species], kind="stable"):
+        template = templates[species[molecule]]
+
+        n_tried, batch_size = 0, 1
+
+        while n_tried < n_trials:
+            if len(rotations) < batch_size:
+                n_draws = max(len(species), max_batch_size)
+
+                rotations = random_rotations(n_draws, random)
+                centers = random.uniform(0.0, length, (n_draws, 3))
+
+            coordinates = (
+                numpy.einsum("nij,aj->nai", rotations[:batch_size], template)
+                + centers[:batch_size, None, :]
+            )
+            rotations, centers = rotations[batch_size:], centers[batch_size:]
+
+            overlaps = cell_list.overlaps(coordinates)
+
+            if not overlaps.all():
+                break
+
+            n_tried += batch_size
+            batch_size = min(2 * batch_size, max_batch_size)
+
+        else:
+            raise ValueError(
+                f"Molecule {molecule} could not be placed without overlapping after "
+                f"{n_trials} trials. Try a lower density or tolerance."
+            )
+
+        coordinates = coordinates[numpy.argmin(overlaps)]
+        cell_list.add(coordinates)
+
+        positions[offsets[molecule] : offsets[molecule + 1]] = coordinates
+
+    return positions
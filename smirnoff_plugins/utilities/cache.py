@@ -0,0 +1,194 @@
+"""An opt-in, content-addressed on-disk cache of OpenMM systems built from OpenFF force
+fields, so that repeated runs with an unchanged force field and topology can skip
+re-parameterizing them."""
+import gzip
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy
+import openff.interchange
+import openff.toolkit
+import openmm
+import openmm.app
+from openff.toolkit import ForceField, Topology
+from openff.units import unit
+
+import smirnoff_plugins
+
+logger = logging.getLogger(__name__)
+
+
+class SystemCache:
+    """A directory of compressed OpenMM systems and topologies keyed by a stable hash
+    of the force field, the topology and the versions of this package, the OpenFF
+    toolkit, Interchange and OpenMM.
+
+    Parameters
+    ----------
+    directory
+        The directory to store the cached systems in, which will be created if it
+        does not exist.
+    max_size
+        The optional maximum total size in bytes of the cached files. The least
+        recently used entries are removed whenever this is exceeded.
+    """
+
+    _extension = ".pkl.gz"
+
+    def __init__(self, directory: str, max_size: Optional[int] = None):
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(force_field: ForceField, topology: Topology) -> str:
+        """Return a stable hash of every input which affects the system built by
+        applying a force field to a topology.
+
+        The force field is hashed through its serialized form, which includes every
+        attribute of the plugin handlers such as their global parameters, cutoffs and
+        scale factors. The topology is hashed through its chemical graph and box
+        vectors, so that the conformers of its molecules do not affect the key.
+        """
+        content = hashlib.sha256()
+
+        content.update(smirnoff_plugins.__version__.encode())
+        # The toolkit and Interchange decide the parameters and the exported system.
+        content.update(openff.toolkit.__version__.encode())
+        content.update(openff.interchange.__version__.encode())
+        # The topologies are pickled, and so may not load with a different OpenMM.
+        content.update(openmm.__version__.encode())
+        content.update(force_field.to_string().encode())
+
+        for molecule in topology.molecules:
+            content.update(
+                repr(
+                    (
+                        [
+                            (
+                                atom.atomic_number,
+                                atom.formal_charge.m_as(unit.elementary_charge),
+                                atom.stereochemistry,
+                            )
+                            for atom in molecule.atoms
+                        ],
+                        [
+                            (
+                                bond.atom1_index,
+                                bond.atom2_index,
+                                bond.bond_order,
+                                bond.stereochemistry,
+                            )
+                            for bond in molecule.bonds
+                        ],
+                    )
+                ).encode()
+            )
+
+        if topology.box_vectors is not None:
+            content.update(
+                numpy.asarray(topology.box_vectors.m_as(unit.nanometer)).tobytes()
+            )
+
+        return content.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self._extension}")
+
+    def get(self, key: str) -> Optional[Tuple[openmm.System, openmm.app.Topology]]:
+        """Load the system and OpenMM topology stored for a key, if any."""
+        path = self._path(key)
+
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            with gzip.open(path, "rb") as file:
+                contents = pickle.load(file)
+
+            system = openmm.XmlSerializer.deserialize(contents["system"])
+            topology = contents["topology"]
+
+        except Exception as e:
+            # Any entry that cannot be loaded, whether it is corrupt or was written by
+            # incompatible versions of its dependencies, is treated as a cache miss.
+            logger.warning(f"Removing the unreadable cached system {path}: {e}")
+            self.invalidate(key)
+            return None
+
+        # Mark the entry as recently used for the purposes of eviction.
+        os.utime(path)
+
+        return system, topology
+
+    def put(self, key: str, system: openmm.System, topology: openmm.app.Topology):
+        """Store a system and its OpenMM topology for a key."""
+        path = self._path(key)
+
+        # Write to a uniquely named temporary file first so that a partially written
+        # entry is never read back, even when several processes store the same key.
+        temporary_file = tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        )
+
+        try:
+            with temporary_file, gzip.GzipFile(
+                fileobj=temporary_file, mode="wb"
+            ) as file:
+                pickle.dump(
+                    {
+                        "system": openmm.XmlSerializer.serialize(system),
+                        "topology": topology,
+                    },
+                    file,
+                )
+
+            os.replace(temporary_file.name, path)
+
+        except BaseException:
+            os.remove(temporary_file.name)
+            raise
+
+        self._evict()
+
+    def invalidate(self, key: Optional[str] = None):
+        """Remove the entry stored for a key, or every entry if no key is given."""
+        keys = [key] if key is not None else self.keys()
+
+        for cached_key in keys:
+            if os.path.isfile(self._path(cached_key)):
+                os.remove(self._path(cached_key))
+
+    def keys(self) -> List[str]:
+        """Return the keys of every cached entry."""
+        return [
+            name[: -len(self._extension)]
+            for name in os.listdir(self.directory)
+            if name.endswith(self._extension)
+        ]
+
+    @property
+    def size(self) -> int:
+        """The total size in bytes of the cached files."""
+        return sum(os.path.getsize(self._path(key)) for key in self.keys())
+
+    def _evict(self):
+        """Remove the least recently used entries until the cache fits its size."""
+        if self.max_size is None:
+            return
+
+        paths = sorted((self._path(key) for key in self.keys()), key=os.path.getmtime)
+        size = sum(os.path.getsize(path) for path in paths)
+
+        # Always keep the most recently used entry, even if it exceeds the size alone.
+        for path in paths[:-1]:
+            if size <= self.max_size:
+                break
+
+            size -= os.path.getsize(path)
+            os.remove(path)
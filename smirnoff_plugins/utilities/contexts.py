@@ -0,0 +1,204 @@
+"""A process wide pool of warm OpenMM contexts which can be reused between repeated
+energy evaluations of the same system."""
+import contextlib
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+import openmm
+import openmm.unit
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledContext:
+    """A context stored in the pool, alongside the lock that guards its use."""
+
+    def __init__(self, context: openmm.Context, n_particles: int):
+        self.context = context
+        self.n_particles = n_particles
+        self.lock = threading.Lock()
+
+
+class ContextPool:
+    """A least recently used pool of OpenMM contexts keyed by the content of the system
+    they were created for, the platform and the platform properties.
+
+    Creating a context, which includes compiling any custom expressions, is typically
+    far more expensive than evaluating an energy. Reusing a context only requires its
+    positions to be set, while the box vectors are reset to the defaults of the system
+    each time the context is retrieved.
+
+    The content of a system is only serialized and hashed the first time that the
+    system object is seen, and so a system which is modified in place after it has been
+    passed to the pool must be passed to ``invalidate`` before it is used again, which
+    the ``update_openmm_forces`` and ``update_global_parameters`` methods of the plugin
+    collections do automatically.
+
+    Parameters
+    ----------
+    max_size
+        The maximum number of contexts to keep in the pool.
+    max_particles
+        The optional maximum total number of particles in the systems of the pooled
+        contexts, which bounds the memory that they use.
+    """
+
+    def __init__(self, max_size: int = 8, max_particles: Optional[int] = None):
+        assert max_size > 0, "the pool must be able to store at least one context."
+
+        self.max_size = max_size
+        self.max_particles = max_particles
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, _PooledContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._system_hashes: "weakref.WeakKeyDictionary[openmm.System, str]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def n_particles(self) -> int:
+        """The total number of particles in the systems of the pooled contexts."""
+        return sum(entry.n_particles for entry in self._entries.values())
+
+    def _system_hash(self, system: openmm.System) -> str:
+        """Return a hash of the content of a system, which is cached for as long as the
+        system object is alive."""
+        system_hash = self._system_hashes.get(system)
+
+        if system_hash is None:
+            system_hash = hashlib.sha256(
+                openmm.XmlSerializer.serialize(system).encode()
+            ).hexdigest()
+            self._system_hashes[system] = system_hash
+
+        return system_hash
+
+    def invalidate(self, system: openmm.System):
+        """Forget the cached hash of a system that has been modified in place, so that
+        its content is hashed again the next time it is used.
+
+        The context created for its previous content is left in the pool, where it can
+        be reused by an unmodified copy of the system until it is evicted.
+        """
+        self._system_hashes.pop(system, None)
+
+    @staticmethod
+    def _key(system_hash: str, platform: str, properties: Dict[str, str]) -> str:
+        """Return a stable hash of the hash of a system, platform and its properties."""
+        content = "\n".join(
+            [system_hash, platform]
+            + [f"{name}={value}" for name, value in sorted(properties.items())]
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @staticmethod
+    def _create_context(
+        system: openmm.System, platform: str, properties: Dict[str, str]
+    ) -> openmm.Context:
+        integrator = openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds)
+
+        try:
+            return openmm.Context(
+                system,
+                integrator,
+                openmm.Platform.getPlatformByName(platform),
+                properties,
+            )
+        except openmm.OpenMMException:
+            logger.debug(
+                f"Failed to use platform {platform}, trying again and letting OpenMM select platform."
+            )
+            return openmm.Context(system, integrator)
+
+    def _evict(self):
+        """Remove the least recently used contexts until the pool fits its limits."""
+        while len(self._entries) > self.max_size or (
+            self.max_particles is not None
+            and len(self._entries) > 1
+            and self.n_particles > self.max_particles
+        ):
+            self._entries.popitem(last=False)
+
+    @contextlib.contextmanager
+    def context(
+        self,
+        system: openmm.System,
+        platform: str = "Reference",
+        properties: Optional[Dict[str, str]] = None,
+    ) -> Iterator[openmm.Context]:
+        """Retrieve a context for a system from the pool, creating one if needed.
+
+        The context is locked for the duration of the ``with`` block so that it is
+        never used by two threads at once. A missing context is created without holding
+        the lock of the pool, so that other threads can keep retrieving contexts in the
+        meantime.
+
+        Parameters
+        ----------
+        system
+            The system to retrieve a context for.
+        platform
+            The name of the platform the context should use.
+        properties
+            The optional platform properties.
+        """
+        properties = {} if properties is None else properties
+
+        key = self._key(self._system_hash(system), platform, properties)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+
+        if entry is None:
+            context = self._create_context(system, platform, properties)
+
+            with self._lock:
+                # Another thread may have created a context for the same key meanwhile,
+                # in which case that one is kept.
+                entry = self._entries.get(key)
+
+                if entry is None:
+                    entry = _PooledContext(context, system.getNumParticles())
+                    self._entries[key] = entry
+                    self._evict()
+                else:
+                    self._entries.move_to_end(key)
+
+        with entry.lock:
+            entry.context.setPeriodicBoxVectors(
+                *entry.context.getSystem().getDefaultPeriodicBoxVectors()
+            )
+            yield entry.context
+
+    def clear(self):
+        """Remove every context from the pool and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+
+            self.hits = 0
+            self.misses = 0
+
+
+_CONTEXT_POOL = ContextPool()
+
+
+def get_context_pool() -> ContextPool:
+    """Return the process wide context pool used by the energy evaluation utilities."""
+    return _CONTEXT_POOL
@@ -0,0 +1,422 @@
+"""Utilities for compiling OpenMM custom nonbonded energy expressions into NumPy
+functions."""
+import ast
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy
+
+PairKernel = Callable[
+    [numpy.ndarray, Dict[str, numpy.ndarray], Dict[str, numpy.ndarray]],
+    Tuple[numpy.ndarray, numpy.ndarray, Dict[str, numpy.ndarray]],
+]
+
+
+def split_expression(expression: str) -> Tuple[str, Dict[str, str]]:
+    """Split an OpenMM energy expression into its leading energy term and a dictionary
+    of the intermediate definitions which follow it."""
+    energy, *definitions = [
+        term.strip() for term in expression.split(";") if len(term.strip()) > 0
+    ]
+    return energy, dict(
+        (name.strip(), value.strip())
+        for name, value in (definition.split("=", 1) for definition in definitions)
+    )
+
+
+def join_expression(energy: str, definitions: Dict[str, str]) -> str:
+    """Join an energy term and its intermediate definitions back into an OpenMM energy
+    expression, dropping any definitions which are no longer referenced."""
+    referenced = set(re.findall(r"[A-Za-z_]\w*", energy))
+    pending = list(referenced)
+
+    while len(pending) > 0:
+        name = pending.pop()
+
+        if name not in definitions:
+            continue
+
+        for dependency in re.findall(r"[A-Za-z_]\w*", definitions[name]):
+            if dependency not in referenced:
+                referenced.add(dependency)
+                pending.append(dependency)
+
+    return "".join(
+        [f"{energy};"]
+        + [
+            f"{name}={value};"
+            for name, value in definitions.items()
+            if name in referenced
+        ]
+    )
+
+
+def replace_definitions(expression: str, replacements: Dict[str, str]) -> str:
+    """Replace the intermediate definitions of an OpenMM energy expression, dropping
+    any of the original definitions that the replacements no longer need."""
+    energy, definitions = split_expression(expression)
+    return join_expression(energy, {**definitions, **replacements})
+
+
+def _sort_definitions(energy: str, definitions: Dict[str, str]) -> List[str]:
+    """Return the names of the definitions referenced by an energy term, ordered such
+    that every definition comes after those it depends on."""
+    ordered: List[str] = []
+    visiting = set()
+
+    def visit(name: str):
+        if name in ordered or name not in definitions:
+            return
+        if name in visiting:
+            raise ValueError(f"The definition of {name} is circular.")
+
+        visiting.add(name)
+
+        for dependency in re.findall(r"[A-Za-z_]\w*", definitions[name]):
+            visit(dependency)
+
+        visiting.remove(name)
+        ordered.append(name)
+
+    for name in re.findall(r"[A-Za-z_]\w*", energy):
+        visit(name)
+
+    return ordered
+
+
+def _referenced_variables(value: str) -> Set[str]:
+    """Return the names of the variables, but not the functions, referenced by an
+    expression."""
+    nodes = list(ast.walk(ast.parse(value.replace("^", "**"), mode="eval")))
+    functions = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+
+    return {
+        node.id
+        for node in nodes
+        if isinstance(node, ast.Name) and id(node) not in functions
+    }
+
+
+class _ExpressionCompiler:
+    """Translate OpenMM expressions into NumPy source code for both their value and
+    their derivative with respect to a single variable, e.g. the pair distance ``r``."""
+
+    def __init__(self, variable: str, prefix: str, dependent: Set[str]):
+        self._variable = variable
+        # The definitions which (may) depend on the variable, and so have a derivative
+        # named by prepending the prefix to their name.
+        self._prefix = prefix
+        self._dependent = dependent
+
+        self._source = ""
+
+    def compile(self, value: str) -> Tuple[str, Optional[str]]:
+        """Return the source of the value and of the derivative of an expression, where
+        a derivative of ``None`` means that it is identically zero."""
+        self._source = value.replace("^", "**")
+
+        tree = ast.parse(self._source, mode="eval")
+        return self._visit(tree.body)
+
+    def _unsupported(self, node: ast.AST) -> NotImplementedError:
+        # ``ast.unparse`` is only available from Python 3.9.
+        return NotImplementedError(
+            f"{ast.get_source_segment(self._source, node)} is not supported by the "
+            f"NumPy expression compiler."
+        )
+
+    def _visit(self, node: ast.AST) -> Tuple[str, Optional[str]]:
+        if isinstance(node, ast.Constant):
+            return repr(float(node.value)), None
+
+        if isinstance(node, ast.Name):
+            if node.id == self._variable:
+                return node.id, "1.0"
+
+            return node.id, (
+                f"{self._prefix}{node.id}" if node.id in self._dependent else None
+            )
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            sign = "-" if isinstance(node.op, ast.USub) else ""
+            u, du = self._visit(node.operand)
+            return f"({sign}{u})", (None if du is None else f"({sign}{du})")
+
+        if isinstance(node, ast.BinOp):
+            return self._visit_binary(node)
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            return self._visit_call(node.func.id, [self._visit(a) for a in node.args])
+
+        raise self._unsupported(node)
+
+    def _visit_binary(self, node: ast.BinOp) -> Tuple[str, Optional[str]]:
+        (u, du), (v, dv) = self._visit(node.left), self._visit(node.right)
+
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            op = "+" if isinstance(node.op, ast.Add) else "-"
+
+            if du is None and dv is None:
+                derivative = None
+            elif dv is None:
+                derivative = du
+            elif du is None:
+                derivative = f"({op}{dv})"
+            else:
+                derivative = f"({du}{op}{dv})"
+
+            return f"({u}{op}{v})", derivative
+
+        if isinstance(node.op, ast.Mult):
+            terms = [f"{du}*{v}"] if du is not None else []
+            terms += [f"{u}*{dv}"] if dv is not None else []
+
+            return f"({u}*{v})", (f"({'+'.join(terms)})" if len(terms) > 0 else None)
+
+        if isinstance(node.op, ast.Div):
+            if dv is None:
+                return f"({u}/{v})", (None if du is None else f"({du}/{v})")
+
+            derivative = f"(-{u}*{dv}/{v}**2)"
+
+            if du is not None:
+                derivative = f"(({du}*{v}-{u}*{dv})/{v}**2)"
+
+            return f"({u}/{v})", derivative
+
+        if isinstance(node.op, ast.Pow):
+            if dv is None:
+                return f"({u}**{v})", (
+                    None if du is None else f"({v}*{u}**({v}-1.0)*{du})"
+                )
+
+            derivative = f"({u}**{v}*({dv}*numpy.log({u})"
+            derivative += "))" if du is None else f"+{v}*{du}/{u}))"
+
+            return f"({u}**{v})", derivative
+
+        raise self._unsupported(node)
+
+    def _visit_call(
+        self, name: str, arguments: List[Tuple[str, Optional[str]]]
+    ) -> Tuple[str, Optional[str]]:
+        values = [value for value, _ in arguments]
+        derivatives = [derivative for _, derivative in arguments]
+
+        if name == "select":
+            x, y, z = values
+            _, dy, dz = derivatives
+
+            value = f"numpy.where({x}!=0,{y},{z})"
+
+            if dy is None and dz is None:
+                return value, None
+
+            return value, f"numpy.where({x}!=0,{dy or 0.0},{dz or 0.0})"
+
+        if name in ("step", "delta"):
+            (x,) = values
+            return f"numpy.where({x}{'>=' if name == 'step' else '=='}0,1.0,0.0)", None
+
+        if name in ("min", "max"):
+            x, y = values
+            dx, dy = derivatives
+
+            value = f"numpy.{name}imum({x},{y})"
+
+            if dx is None and dy is None:
+                return value, None
+
+            return value, (
+                f"numpy.where({x}{'<=' if name == 'min' else '>='}{y},"
+                f"{dx or 0.0},{dy or 0.0})"
+            )
+
+        if len(arguments) != 1:
+            raise NotImplementedError(
+                f"{name} is not supported by the NumPy expression compiler."
+            )
+
+        (u,), (du,) = values, derivatives
+
+        value, outer = {
+            "square": (f"({u}**2)", f"2.0*{u}"),
+            "cube": (f"({u}**3)", f"3.0*{u}**2"),
+            "recip": (f"(1.0/{u})", f"-1.0/{u}**2"),
+            "sqrt": (f"numpy.sqrt({u})", f"0.5/numpy.sqrt({u})"),
+            "exp": (f"numpy.exp({u})", f"numpy.exp({u})"),
+            "log": (f"numpy.log({u})", f"1.0/{u}"),
+            "sin": (f"numpy.sin({u})", f"numpy.cos({u})"),
+            "cos": (f"numpy.cos({u})", f"-numpy.sin({u})"),
+            "tan": (f"numpy.tan({u})", f"1.0/numpy.cos({u})**2"),
+            "sinh": (f"numpy.sinh({u})", f"numpy.cosh({u})"),
+            "cosh": (f"numpy.cosh({u})", f"numpy.sinh({u})"),
+            "tanh": (f"numpy.tanh({u})", f"1.0/numpy.cosh({u})**2"),
+            "abs": (f"numpy.abs({u})", f"numpy.sign({u})"),
+            "floor": (f"numpy.floor({u})", None),
+            "ceil": (f"numpy.ceil({u})", None),
+            "erf": (
+                f"_erf({u})",
+                f"{2.0 / math.sqrt(math.pi)!r}*numpy.exp(-{u}**2)",
+            ),
+            "erfc": (
+                f"(1.0-_erf({u}))",
+                f"{-2.0 / math.sqrt(math.pi)!r}*numpy.exp(-{u}**2)",
+            ),
+        }.get(name, (None, None))
+
+        if value is None:
+            raise NotImplementedError(
+                f"{name} is not supported by the NumPy expression compiler."
+            )
+
+        return value, (None if du is None or outer is None else f"({outer}*{du})")
+
+
+def compile_pair_expression(
+    expression: str,
+    per_particle_parameters: Iterable[str],
+    global_parameters: Dict[str, float],
+    parameter_derivatives: Iterable[str] = (),
+) -> PairKernel:
+    """Compile an OpenMM custom nonbonded energy expression into a NumPy function which
+    returns the energy of a set of pairs and its derivatives with respect to ``r`` and
+    optionally to any of the parameters.
+
+    The returned function has the signature ``kernel(r, parameters_1, parameters_2)``,
+    where ``parameters_1`` and ``parameters_2`` map the name of every per-particle
+    parameter to the values of the first and second particle of each pair. All arrays
+    are broadcast against each other. It returns the energies, their derivatives with
+    respect to ``r`` and a dictionary of their derivatives with respect to each of the
+    requested parameters.
+
+    Parameters
+    ----------
+    expression
+        The OpenMM energy expression, including its intermediate definitions.
+    per_particle_parameters
+        The names of the per-particle parameters, which the expression references with
+        a ``1`` or ``2`` suffix.
+    global_parameters
+        The values of every global parameter referenced by the expression.
+    parameter_derivatives
+        The names of the parameters to differentiate with respect to, i.e. either
+        global parameters or per-particle parameters including their suffix.
+
+    Returns
+    -------
+        The compiled kernel.
+    """
+    energy, definitions = split_expression(expression)
+    ordered = _sort_definitions(energy, definitions)
+
+    per_particle_parameters = list(per_particle_parameters)
+
+    known = {
+        "r",
+        *ordered,
+        *global_parameters,
+        *(f"{name}{i}" for name in per_particle_parameters for i in (1, 2)),
+    }
+    unknown = {
+        name
+        for value in (energy, *(definitions[name] for name in ordered))
+        for name in _referenced_variables(value)
+        if name not in known
+    }
+
+    if len(unknown) > 0:
+        raise ValueError(
+            f"The expression references undefined variables: {sorted(unknown)}."
+        )
+
+    variables = ["r", *parameter_derivatives]
+    compilers = {}
+
+    for i, variable in enumerate(variables):
+        # Only carry the derivative of definitions that actually depend on the variable.
+        dependent: Set[str] = set()
+
+        for name in ordered:
+            if any(
+                dependency == variable or dependency in dependent
+                for dependency in _referenced_variables(definitions[name])
+            ):
+                dependent.add(name)
+
+        compilers[variable] = _ExpressionCompiler(
+            variable, "d_" if i == 0 else f"d{i}_", dependent
+        )
+
+    lines = ["def kernel(r, parameters_1, parameters_2):"]
+    lines += [
+        f"    {name}{suffix} = {source}[{name!r}]"
+        for name in per_particle_parameters
+        for suffix, source in (("1", "parameters_1"), ("2", "parameters_2"))
+    ]
+
+    for name in ordered:
+        lines.append(f"    {name} = {compilers['r'].compile(definitions[name])[0]}")
+
+        for compiler in compilers.values():
+            if name in compiler._dependent:
+                derivative = compiler.compile(definitions[name])[1]
+                lines.append(f"    {compiler._prefix}{name} = {derivative or 0.0}")
+
+    value, derivative = compilers["r"].compile(energy)
+
+    parameter_sources = ", ".join(
+        f"{variable!r}: {compiler.compile(energy)[1] or 0.0} + 0.0 * r"
+        for variable, compiler in compilers.items()
+        if variable != "r"
+    )
+
+    # Adding zero broadcasts terms which do not depend on r to the shape of the pairs.
+    lines.append(
+        f"    return {value} + 0.0 * r, {derivative or 0.0} + 0.0 * r, "
+        f"{{{parameter_sources}}}"
+    )
+
+    namespace = {"numpy": numpy, "_erf": numpy.vectorize(math.erf, otypes=[float])}
+    namespace.update((name, float(value)) for name, value in global_parameters.items())
+
+    exec(compile("\n".join(lines), "<pair-expression>", "exec"), namespace)
+    return namespace["kernel"]
+
+
+def expressions_agree(
+    expression_1: str,
+    expression_2: str,
+    per_particle_parameters: Iterable[str],
+    global_parameters: Dict[str, float],
+    r: numpy.ndarray,
+    parameters_1: Dict[str, numpy.ndarray],
+    parameters_2: Dict[str, numpy.ndarray],
+    rtol: float = 1.0e-6,
+) -> bool:
+    """Return whether two energy expressions evaluate to the same pair energies and
+    derivatives with respect to ``r``, to within a tolerance relative to the largest
+    magnitude of each, for a sample of pair distances and parameters.
+
+    The distances and parameters are passed to the kernels returned by
+    ``compile_pair_expression``, whose documentation describes their format.
+    """
+    per_particle_parameters = list(per_particle_parameters)
+
+    energies_1, derivatives_1, _ = compile_pair_expression(
+        expression_1, per_particle_parameters, global_parameters
+    )(r, parameters_1, parameters_2)
+    energies_2, derivatives_2, _ = compile_pair_expression(
+        expression_2, per_particle_parameters, global_parameters
+    )(r, parameters_1, parameters_2)
+
+    return all(
+        numpy.allclose(
+            values_2, values_1, rtol=rtol, atol=rtol * numpy.max(numpy.abs(values_1))
+        )
+        for values_1, values_2 in (
+            (energies_1, energies_2),
+            (derivatives_1, derivatives_2),
+        )
+    )
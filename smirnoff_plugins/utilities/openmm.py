@@ -1,6 +1,8 @@
+import copy
 import logging
-import math
 import os
+import pickle
+import struct
 import time
 from typing import List, Literal, Optional, Tuple
 
@@ -15,8 +17,145 @@ from openff.units import unit
 from openff.units.openmm import ensure_quantity
 from openff.utilities import temporary_cd
 
+from smirnoff_plugins.collections.nonbonded import (
+    REPULSION_FORCE_GROUP,
+    SLOW_FORCE_GROUP,
+)
+from smirnoff_plugins.handlers.nonbonded import _CustomNonbondedHandler
+from smirnoff_plugins.utilities.boxes import (
+    box_length,
+    lattice_positions,
+    mole_fraction_counts,
+    packed_positions,
+)
+from smirnoff_plugins.utilities.cache import SystemCache
+from smirnoff_plugins.utilities.contexts import get_context_pool
+from smirnoff_plugins.utilities.reporters import AsyncReporter, flush_reporter
+from smirnoff_plugins.utilities.timing import PhaseTimer
+
 logger = logging.getLogger(__name__)
 
+_TRAJECTORY_FILE = "trajectory.dcd"
+_DATA_FILE = "data.csv"
+_CHECKPOINT_FILE = "checkpoint.pkl"
+_TIMINGS_FILE = "timings.json"
+
+_TIMESTEP = 0.5 * openmm.unit.femtoseconds
+
+
+def _save_checkpoint(simulation: openmm.app.Simulation, reporters: List):
+    """Save a checkpoint of a simulation alongside the size of its output files, so
+    that a resumed simulation can discard anything reported after the checkpoint."""
+    for reporter in reporters:
+        flush_reporter(reporter)
+
+    # The trajectory header is only written once the first frame is reported.
+    n_frames = 0
+
+    if os.path.getsize(_TRAJECTORY_FILE) > 0:
+        with open(_TRAJECTORY_FILE, "rb") as file:
+            file.seek(8)
+            (n_frames,) = struct.unpack("<i", file.read(4))
+
+    checkpoint = {
+        "checkpoint": simulation.context.createCheckpoint(),
+        "step": simulation.currentStep,
+        "trajectory_size": os.path.getsize(_TRAJECTORY_FILE),
+        "trajectory_frames": n_frames,
+        "data_size": os.path.getsize(_DATA_FILE),
+    }
+
+    # Write to a temporary file first so that a preemption while writing never leaves
+    # a corrupt checkpoint behind.
+    with open(f"{_CHECKPOINT_FILE}.tmp", "wb") as file:
+        pickle.dump(checkpoint, file)
+
+    os.replace(f"{_CHECKPOINT_FILE}.tmp", _CHECKPOINT_FILE)
+
+    logger.debug(f"Saved a checkpoint at step {checkpoint['step']}")
+
+
+def _load_checkpoint(simulation: openmm.app.Simulation) -> Tuple[bool, bool]:
+    """Restore a simulation from its last checkpoint, and truncate its output files
+    back to the size they were when the checkpoint was saved.
+
+    Returns
+    -------
+        Whether the trajectory and the state data should be appended to, i.e. whether
+        anything had been written to them when the checkpoint was saved.
+    """
+    with open(_CHECKPOINT_FILE, "rb") as file:
+        checkpoint = pickle.load(file)
+
+    simulation.context.loadCheckpoint(checkpoint["checkpoint"])
+
+    with open(_TRAJECTORY_FILE, "r+b") as file:
+        file.truncate(checkpoint["trajectory_size"])
+
+        if checkpoint["trajectory_size"] > 0:
+            # The DCD header stores the number of frames, which is read when appending.
+            file.seek(8)
+            file.write(struct.pack("<i", checkpoint["trajectory_frames"]))
+
+    with open(_DATA_FILE, "r+b") as file:
+        file.truncate(checkpoint["data_size"])
+
+    logger.debug(f"Resuming from the checkpoint at step {checkpoint['step']}")
+
+    return checkpoint["trajectory_size"] > 0, checkpoint["data_size"] > 0
+
+
+def _create_integrator(
+    system: openmm.System,
+    temperature: openmm.unit.Quantity,
+    mts_substeps: Optional[int],
+) -> openmm.Integrator:
+    """Create the Langevin integrator of a simulation.
+
+    When ``mts_substeps`` is set, a multiple time step integrator is created whose
+    outer step is that many times the usual timestep. The forces in group 0 and in the
+    group of repulsions with their own cutoff are evaluated at every inner step, and
+    those in any other group, such as the attraction of split plugin collections, once
+    per outer step. The reciprocal space part of any PME electrostatics in group 0 is
+    moved to the slow force group.
+    """
+    if mts_substeps is None:
+        return openmm.LangevinIntegrator(
+            temperature, 1.0 / openmm.unit.picosecond, _TIMESTEP
+        )
+
+    for force in system.getForces():
+        if (
+            isinstance(force, openmm.NonbondedForce)
+            and force.getNonbondedMethod() == openmm.NonbondedForce.PME
+            and force.getForceGroup() == 0
+            and force.getReciprocalSpaceForceGroup() < 0
+        ):
+            force.setReciprocalSpaceForceGroup(SLOW_FORCE_GROUP)
+
+    force_groups = {force.getForceGroup() for force in system.getForces()} | {
+        force.getReciprocalSpaceForceGroup()
+        for force in system.getForces()
+        if isinstance(force, openmm.NonbondedForce)
+        and force.getReciprocalSpaceForceGroup() >= 0
+    }
+
+    fast_force_groups = {0} | (force_groups & {REPULSION_FORCE_GROUP})
+
+    if force_groups <= fast_force_groups:
+        logger.warning(
+            "Every force is in a fast force group, and so the multiple time step "
+            "integrator will evaluate every force at each inner step."
+        )
+
+    return openmm.MTSLangevinIntegrator(
+        temperature,
+        1.0 / openmm.unit.picosecond,
+        _TIMESTEP * mts_substeps,
+        [(group, mts_substeps) for group in sorted(fast_force_groups)]
+        + [(group, 1) for group in sorted(force_groups - fast_force_groups)],
+    )
+
 
 def __simulate(
     positions: openmm.unit.Quantity,
@@ -27,6 +166,12 @@ def __simulate(
     temperature: openmm.unit.Quantity,
     pressure: Optional[openmm.unit.Quantity],
     platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "Reference",
+    report_buffer_size: Optional[int] = 32,
+    checkpoint_interval: Optional[int] = None,
+    checkpoint_time: Optional[float] = None,
+    resume: bool = False,
+    timer: Optional[PhaseTimer] = None,
+    mts_substeps: Optional[int] = None,
 ):
     """
 
@@ -48,78 +193,167 @@ def __simulate(
         The pressure to simulate at.
     platform
         The platform to simulate using.
+    report_buffer_size
+        The number of reported states which may be buffered while they are written
+        by a background thread, or ``None`` to write them during the simulation.
+    checkpoint_interval
+        The optional number of steps between checkpoints.
+    checkpoint_time
+        The optional wall-clock time in seconds between checkpoints, which are saved
+        at the first report after this time has elapsed.
+    resume
+        Whether to resume from the checkpoint in the current directory, if one
+        exists, appending to the existing outputs.
+    timer
+        The optional timer to record the wall-clock time of each phase with, which
+        may already contain the phases spent building the system. The timings are
+        written to ``timings.json`` once the simulation completes.
+    mts_substeps
+        The optional number of inner steps per step of a multiple time step
+        integrator, which evaluates only the forces in group 0 and in
+        ``REPULSION_FORCE_GROUP`` at each inner step.
     """
 
     """A helper function for simulating a system with OpenMM."""
 
-    with open("input.pdb", "w") as file:
-        openmm.app.PDBFile.writeFile(omm_topology, positions, file)
+    timer = PhaseTimer() if timer is None else timer
+
+    with timer.phase("io"):
+        with open("input.pdb", "w") as file:
+            openmm.app.PDBFile.writeFile(omm_topology, positions, file)
 
-    with open("system.xml", "w") as file:
-        file.write(openmm.XmlSerializer.serialize(omm_system))
+        with open("system.xml", "w") as file:
+            file.write(openmm.XmlSerializer.serialize(omm_system))
 
     if pressure is not None:
         omm_system.addForce(openmm.MonteCarloBarostat(pressure, temperature, 25))
 
-    integrator = openmm.LangevinIntegrator(
-        temperature,
-        1.0 / openmm.unit.picosecond,
-        0.5 * openmm.unit.femtoseconds,
-    )
-
-    try:
-        simulation = openmm.app.Simulation(
-            omm_topology,
-            omm_system,
-            integrator,
-            openmm.Platform.getPlatformByName(platform),
-        )
-    except openmm.OpenMMException:
-        logger.debug(
-            f"Failed to use platform {platform}, trying again and letting OpenMM select platform."
-        )
-        simulation = openmm.app.Simulation(
-            omm_topology,
-            omm_system,
-            integrator,
-        )
-
-    if box_vectors is not None:
-        box_vectors = ensure_quantity(box_vectors, "openmm")
-        simulation.context.setPeriodicBoxVectors(
-            box_vectors[0], box_vectors[1], box_vectors[2]
-        )
-
-    simulation.context.setPositions(positions)
-    simulation.context.computeVirtualSites()
-
-    simulation.minimizeEnergy()
-
-    # Randomize the velocities from a Boltzmann distribution at a given temperature.
-    simulation.context.setVelocitiesToTemperature(temperature * openmm.unit.kelvin)
+    with timer.phase("context"):
+        integrator = _create_integrator(omm_system, temperature, mts_substeps)
+
+        try:
+            simulation = openmm.app.Simulation(
+                omm_topology,
+                omm_system,
+                integrator,
+                openmm.Platform.getPlatformByName(platform),
+            )
+        except openmm.OpenMMException:
+            logger.debug(
+                f"Failed to use platform {platform}, trying again and letting OpenMM select platform."
+            )
+            simulation = openmm.app.Simulation(
+                omm_topology,
+                omm_system,
+                integrator,
+            )
+
+        if box_vectors is not None:
+            box_vectors = ensure_quantity(box_vectors, "openmm")
+            simulation.context.setPeriodicBoxVectors(
+                box_vectors[0], box_vectors[1], box_vectors[2]
+            )
+
+    append_trajectory, append_data = False, False
+
+    if resume and os.path.isfile(_CHECKPOINT_FILE):
+        with timer.phase("io"):
+            append_trajectory, append_data = _load_checkpoint(simulation)
+    else:
+        with timer.phase("minimization"):
+            simulation.context.setPositions(positions)
+            simulation.context.computeVirtualSites()
+
+            simulation.minimizeEnergy()
+
+            # Randomize the velocities from a Boltzmann distribution at a given
+            # temperature.
+            simulation.context.setVelocitiesToTemperature(
+                temperature * openmm.unit.kelvin
+            )
+
+    report_interval = int(0.05 * n_steps)
 
     # Configure the information in the output files.
-    pdb_reporter = openmm.app.DCDReporter("trajectory.dcd", int(0.05 * n_steps))
+    pdb_reporter = openmm.app.DCDReporter(
+        _TRAJECTORY_FILE, report_interval, append=append_trajectory
+    )
 
     state_data_reporter = openmm.app.StateDataReporter(
-        "data.csv",
-        int(0.05 * n_steps),
+        _DATA_FILE,
+        report_interval,
         step=True,
         potentialEnergy=True,
         temperature=True,
         density=True,
+        append=append_data,
     )
-    simulation.reporters.append(pdb_reporter)
-    simulation.reporters.append(state_data_reporter)
+    reporters = [pdb_reporter, state_data_reporter]
+
+    if report_buffer_size is not None:
+        reporters = [
+            AsyncReporter(reporter, report_buffer_size) for reporter in reporters
+        ]
+
+    simulation.reporters.extend(reporters)
 
     logger.debug("Starting simulation")
-    start = time.process_time()
+    first_step = simulation.currentStep
+
+    # Run the simulation in blocks between which checkpoints may be saved, making sure
+    # any buffered states are written even if it fails.
+    block_size = n_steps
+
+    if checkpoint_interval is not None:
+        block_size = checkpoint_interval
+    elif checkpoint_time is not None:
+        block_size = max(1, report_interval)
 
-    # Run the simulation
-    simulation.step(n_steps)
+    last_checkpoint = time.time()
 
-    end = time.process_time()
-    logger.debug("Elapsed time %.2f seconds" % (end - start))
+    try:
+        while simulation.currentStep < n_steps:
+            with timer.phase("md"):
+                simulation.step(min(block_size, n_steps - simulation.currentStep))
+
+            if checkpoint_interval is not None or (
+                checkpoint_time is not None
+                and time.time() - last_checkpoint >= checkpoint_time
+            ):
+                with timer.phase("io"):
+                    _save_checkpoint(simulation, reporters)
+
+                last_checkpoint = time.time()
+    finally:
+        with timer.phase("io"):
+            for reporter in reporters:
+                if isinstance(reporter, AsyncReporter):
+                    reporter.close()
+
+    n_simulated_steps = simulation.currentStep - first_step
+    md_time = timer.phases.get("md", 0.0)
+
+    timestep = integrator.getStepSize()
+    simulated_time = n_simulated_steps * timestep.value_in_unit(openmm.unit.nanoseconds)
+
+    timer.metrics.update(
+        {
+            "platform": simulation.context.getPlatform().getName(),
+            "n_particles": omm_system.getNumParticles(),
+            "n_steps": n_simulated_steps,
+            "timestep_fs": timestep.value_in_unit(openmm.unit.femtoseconds),
+            "mts_substeps": mts_substeps,
+            "ns_per_day": (
+                simulated_time / md_time * 86400.0 if md_time > 0.0 else None
+            ),
+        }
+    )
+    timer.write(_TIMINGS_FILE)
+
+    logger.debug(
+        f"Simulated {n_simulated_steps} steps in {md_time:.2f} seconds "
+        f"({timer.metrics['ns_per_day']} ns/day)"
+    )
     logger.debug("Done!")
 
 
@@ -133,6 +367,12 @@ def simulate(
     pressure: Optional[openmm.unit.Quantity],
     platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "Reference",
     output_directory: Optional[str] = None,
+    cache_directory: Optional[str] = None,
+    report_buffer_size: Optional[int] = 32,
+    checkpoint_interval: Optional[int] = None,
+    checkpoint_time: Optional[float] = None,
+    resume: bool = False,
+    mts_substeps: Optional[int] = None,
 ):
     """A helper function for simulating a system parameterised with a specific OpenFF
     force field using OpenMM.
@@ -156,7 +396,31 @@ def simulate(
     platform
         The platform to simulate using.
     output_directory
-        The optional directory to store the simulation outputs in.
+        The optional directory to store the simulation outputs in, alongside a
+        ``timings.json`` file with the wall-clock time of each phase and the
+        throughput in ns/day.
+    cache_directory
+        The optional directory of a ``SystemCache`` to load the parameterized system
+        from, or to store it in if the force field and topology have not been seen.
+    report_buffer_size
+        The number of reported states which may be buffered while they are written
+        by a background thread, or ``None`` to write them during the simulation.
+    checkpoint_interval
+        The optional number of steps between checkpoints, which are saved in the
+        output directory.
+    checkpoint_time
+        The optional wall-clock time in seconds between checkpoints.
+    resume
+        Whether to resume from the checkpoint in the output directory, if one exists,
+        appending to the existing trajectory and state data rather than starting over.
+    mts_substeps
+        The optional number of inner steps per step of a multiple time step
+        integrator. Each step then advances the simulation by that many times the
+        usual 0.5 fs timestep, while only the forces in group 0 and in
+        ``REPULSION_FORCE_GROUP``, which holds any repulsion with its own cutoff, are
+        evaluated at every inner step. Plugin collections whose ``splitting`` is
+        ``"repulsion"`` place their smooth attraction in another force group, and so
+        are evaluated less often without changing the energy.
     """
 
     assert pressure is None or (
@@ -165,23 +429,47 @@ def simulate(
 
     topology.box_vectors = ensure_quantity(box_vectors, "openff")
 
-    interchange = Interchange.from_smirnoff(
-        force_field=force_field,
-        topology=topology,
-        positions=ensure_quantity(positions, "openff"),
-    )
-
-    openmm_system: openmm.System = interchange.to_openmm(combine_nonbonded_forces=False)
-    with open("test.xml", "w") as file:
-        file.write(openmm.XmlSerializer.serialize(openmm_system))
-    openmm_topology: openmm.app.Topology = interchange.to_openmm_topology()
-    openmm_positions: openmm.unit.Quantity = ensure_quantity(
-        to_openmm_positions(
-            interchange,
-            include_virtual_sites=True,
-        ),
-        "openmm",
-    )
+    timer = PhaseTimer()
+
+    with timer.phase("cache"):
+        cache = None if cache_directory is None else SystemCache(cache_directory)
+        cache_key = None if cache is None else cache.key(force_field, topology)
+
+        cached = None if cache is None else cache.get(cache_key)
+
+    if cached is not None:
+        openmm_system, openmm_topology = cached
+
+        with timer.phase("to_openmm"):
+            openmm_positions = _add_virtual_site_positions(
+                openmm_system, ensure_quantity(positions, "openmm")
+            )
+    else:
+        with timer.phase("interchange"):
+            interchange = Interchange.from_smirnoff(
+                force_field=force_field,
+                topology=topology,
+                positions=ensure_quantity(positions, "openff"),
+            )
+
+        with timer.phase("to_openmm"):
+            openmm_system = interchange.to_openmm(combine_nonbonded_forces=False)
+            openmm_topology = interchange.to_openmm_topology()
+            openmm_positions = ensure_quantity(
+                to_openmm_positions(
+                    interchange,
+                    include_virtual_sites=True,
+                ),
+                "openmm",
+            )
+
+        with timer.phase("io"):
+            with open("test.xml", "w") as file:
+                file.write(openmm.XmlSerializer.serialize(openmm_system))
+
+        if cache is not None:
+            with timer.phase("cache"):
+                cache.put(cache_key, openmm_system, openmm_topology)
 
     if output_directory is not None:
         os.makedirs(output_directory, exist_ok=True)
@@ -196,58 +484,192 @@ def simulate(
             temperature=temperature,
             pressure=pressure,
             platform=platform,
+            report_buffer_size=report_buffer_size,
+            checkpoint_interval=checkpoint_interval,
+            checkpoint_time=checkpoint_time,
+            resume=resume,
+            timer=timer,
+            mts_substeps=mts_substeps,
         )
 
 
-def water_box(n_molecules: int) -> Tuple[Topology, openmm.unit.Quantity]:
+def _add_virtual_site_positions(
+    system: openmm.System, positions: openmm.unit.Quantity
+) -> openmm.unit.Quantity:
+    """Insert the positions of the virtual sites of a system into the positions of its
+    other particles."""
+    n_particles = system.getNumParticles()
+
+    particle_indices = [i for i in range(n_particles) if not system.isVirtualSite(i)]
+
+    padded_positions = numpy.zeros((n_particles, 3))
+    padded_positions[particle_indices] = numpy.asarray(
+        positions.value_in_unit(openmm.unit.nanometer)
+    ).reshape(-1, 3)
+
+    # The virtual sites only depend on the positions of their parent particles, so the
+    # forces can be removed to make creating the context cheap.
+    bare_system = copy.deepcopy(system)
+
+    while bare_system.getNumForces() > 0:
+        bare_system.removeForce(0)
+
+    context = openmm.Context(
+        bare_system,
+        openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds),
+        openmm.Platform.getPlatformByName("Reference"),
+    )
+    context.setPositions(padded_positions)
+    context.computeVirtualSites()
+
+    return context.getState(getPositions=True).getPositions(asNumpy=True)
+
+
+def mixture_box(
+    molecules: List[Molecule],
+    density: unit.Quantity,
+    counts: Optional[List[int]] = None,
+    mole_fractions: Optional[List[float]] = None,
+    n_molecules: Optional[int] = None,
+    placement: Literal["lattice", "packed"] = "lattice",
+    tolerance: unit.Quantity = unit.Quantity(1.5, unit.angstrom),
+    random_seed: Optional[int] = None,
+) -> Tuple[Topology, unit.Quantity]:
     """
-    Build a water box with the requested number of water molecules.
+    Build a box of randomly oriented molecules of one or more species at a target
+    density.
+
+    The molecules are either placed at randomly chosen cells of a cubic lattice which
+    fills the box, which is the fastest but may overlap molecules of very different
+    sizes, or at random points in the box such that no two atoms of different
+    molecules are closer than a tolerance. Only the positions of the atoms are
+    returned, as the positions of any virtual sites are computed from them once the
+    system is built, e.g. by ``simulate``. The molecules of the topology carry the
+    same positions as their only conformer.
 
     Parameters
     ----------
+    molecules
+        The molecule of each species. The first conformer of each molecule is used,
+        or one is generated if it has none.
+    density
+        The target density of the box.
+    counts
+        The number of molecules of each species.
+    mole_fractions
+        The mole fraction of each species, which must be provided along with
+        ``n_molecules`` instead of ``counts``.
     n_molecules
-        The number of water molecules that should be put into the water box
+        The total number of molecules when the mole fractions are provided.
+    placement
+        Whether to place the molecules at the cells of a ``"lattice"``, or to pack
+        them randomly while rejecting any overlaps (``"packed"``).
+    tolerance
+        The minimum distance between the atoms of different molecules when they are
+        packed.
+    random_seed
+        The optional seed of the random placement and orientations.
 
     Returns
     -------
-        The openff.toolkit Topology of the system and the position array wrapped with units.
+        The openff.toolkit Topology of the system, including its box vectors, and the
+        positions of its atoms.
     """
-    molecule = Molecule.from_smiles("O")
-    molecule.generate_conformers(n_conformers=1)
+    assert (counts is None) != (
+        mole_fractions is None
+    ), "either the counts or the mole fractions must be provided."
+    assert (mole_fractions is None) == (
+        n_molecules is None
+    ), "the number of molecules must be provided along with the mole fractions."
+    assert placement in ["lattice", "packed"], f"unknown placement: {placement}"
+
+    counts = (
+        numpy.asarray(counts, dtype=int)
+        if mole_fractions is None
+        else mole_fraction_counts(mole_fractions, n_molecules)
+    )
+    assert len(counts) == len(molecules), "a count is needed for each molecule."
+
+    templates = []
+    species_molecules = []
+
+    for molecule in molecules:
+        molecule = Molecule(molecule)
+
+        if molecule.n_conformers == 0:
+            molecule.generate_conformers(n_conformers=1)
 
-    topology = Topology.from_molecules([molecule] * n_molecules)
+        templates.append(molecule.conformers[0].m_as(unit.angstrom))
+        species_molecules.append(molecule)
 
-    topology.box_vectors = (
-        numpy.eye(3) * math.ceil(n_molecules ** (1 / 3) + 2) * 2.5 * unit.angstrom
+    species = numpy.repeat(numpy.arange(len(molecules)), counts)
+
+    topology = Topology.from_molecules([species_molecules[i] for i in species])
+
+    mass = sum(
+        sum(atom.mass.m_as(unit.dalton) for atom in molecule.atoms) * count
+        for molecule, count in zip(species_molecules, counts)
     )
+    length = box_length(mass, density.m_as(unit.gram / unit.milliliter))
+
+    topology.box_vectors = unit.Quantity(numpy.eye(3) * length, unit.angstrom)
+
+    random = numpy.random.default_rng(random_seed)
 
     positions = (
-        numpy.vstack(
-            [
-                (
-                    molecule.conformers[0].value_in_unit(openmm.unit.angstrom)
-                    + numpy.array([[x, y, z]]) * 2.5
-                )
-                for x in range(math.ceil(n_molecules ** (1 / 3)))
-                for y in range(math.ceil(n_molecules ** (1 / 3)))
-                for z in range(math.ceil(n_molecules ** (1 / 3)))
-            ]
-        )[: topology.n_topology_atoms, :]
-        * unit.angstrom
+        lattice_positions(templates, species, length, random)
+        if placement == "lattice"
+        else packed_positions(
+            templates, species, length, random, tolerance.m_as(unit.angstrom)
+        )
     )
 
-    with open("input.pdb", "w") as file:
-        openmm.app.PDBFile.writeFile(topology.to_openmm(), positions, file)
+    positions = unit.Quantity(positions, unit.angstrom)
+    topology.set_positions(positions)
 
     return topology, positions
 
 
+def water_box(
+    n_molecules: int,
+    density: unit.Quantity = unit.Quantity(0.997, unit.gram / unit.milliliter),
+    random_seed: Optional[int] = None,
+) -> Tuple[Topology, unit.Quantity]:
+    """
+    Build a box of randomly oriented water molecules at a target density, placed on a
+    lattice by ``mixture_box``.
+
+    Parameters
+    ----------
+    n_molecules
+        The number of water molecules that should be put into the water box
+    density
+        The target density of the box.
+    random_seed
+        The optional seed of the random placement and orientations.
+
+    Returns
+    -------
+        The openff.toolkit Topology of the system, including its box vectors, and the
+        positions of its atoms.
+    """
+    return mixture_box(
+        [Molecule.from_smiles("O")],
+        density,
+        counts=[n_molecules],
+        random_seed=random_seed,
+    )
+
+
 def evaluate_water_energy_at_distances(
     force_field: ForceField, distances: List[float]
 ) -> List[float]:
     """
     Evaluate the energy of a system of two water molecules at the requested distances using the provided force field.
 
+    The dimer is evaluated in the gas phase, with any plugin potentials using the
+    ``"no-cutoff"`` method, or ``"cutoff-nonperiodic"`` when they are tabulated.
+
     Parameters
     ----------
     force_field:
@@ -260,29 +682,29 @@ def evaluate_water_energy_at_distances(
         A list of energies evaluated at the given distances in kj/mol
     """
 
+    # Evaluate the dimer without periodic images, on a copy of the force field so that
+    # the handlers of the original are left untouched. Tabulated potentials are only
+    # defined within their cutoff, and so are truncated at it.
+    force_field = ForceField(force_field.to_string(), load_plugins=True)
+
+    for handler_name in force_field.registered_parameter_handlers:
+        handler = force_field.get_parameter_handler(handler_name)
+
+        if isinstance(handler, _CustomNonbondedHandler):
+            handler.method = (
+                "no-cutoff"
+                if getattr(handler, "tabulation", None) is None
+                else "cutoff-nonperiodic"
+            )
+
     # build the topology
     water = Molecule.from_smiles("O")
     water.generate_conformers(n_conformers=1)
     topology = Topology.from_molecules([water, water])
 
-    # Interchange doesn't think there's a way to combine PME electrostatics and cutoff vdw
-    # (NonbondedForce and CustomNonbondedForce, respectively) without modifying the vdw force
-    # to use NoCutoff, which as of today (2022-03-16) is still under discussion. For now, just
-    # use an arbitrarily large box to mimic gas phase, even though this is modified below.
-    topology.box_vectors = unit.Quantity(numpy.eye(3) * 20, unit.nanometer)
-
     # make the openmm system
     interchange = Interchange.from_smirnoff(force_field, topology)
     openmm_system = interchange.to_openmm(combine_nonbonded_forces=False)
-    # workaround interchange by setting nonbonded method to NoCutoff
-    forces = {force.__class__.__name__: force for force in openmm_system.getForces()}
-    vdw_force: openmm.CustomNonbondedForce = forces["CustomNonbondedForce"]
-    vdw_force.setNonbondedMethod(openmm.NonbondedForce.NoCutoff)
-    vdw_force.setUseSwitchingFunction(False)
-    vdw_force.setUseLongRangeCorrection(False)
-    nonbond: openmm.NonbondedForce = forces["NonbondedForce"]
-    nonbond.setNonbondedMethod(openmm.NonbondedForce.NoCutoff)
-    openmm_topology = interchange.to_openmm_topology()
     openmm_positions: openmm.unit.Quantity = ensure_quantity(
         to_openmm_positions(
             interchange,
@@ -291,46 +713,34 @@ def evaluate_water_energy_at_distances(
         "openmm",
     )
 
-    integrator = openmm.LangevinIntegrator(
-        300 * openmm.unit.kelvin,
-        1.0 / openmm.unit.picosecond,
-        0.01 * openmm.unit.femtoseconds,
-    )
-
-    platform = openmm.Platform.getPlatformByName("CPU")
-
-    simulation = openmm.app.Simulation(
-        openmm_topology, openmm_system, integrator, platform
-    )
-
     n_positions_per_water = int(openmm_positions.shape[0] / 2)
 
     energies = []
-    for distance in distances:
-        new_positions = openmm.unit.Quantity(
-            numpy.vstack(
-                [
-                    openmm_positions[:n_positions_per_water, :].value_in_unit(
-                        openmm.unit.angstrom
-                    ),
-                    openmm_positions[n_positions_per_water:, :].value_in_unit(
-                        openmm.unit.angstrom
-                    )
-                    # only translate the second water in x
-                    + numpy.array([distance, 0, 0]),
-                ]
-            ),
-            openmm.unit.angstrom,
-        )
 
-        simulation.context.setPositions(
-            new_positions.value_in_unit(openmm.unit.nanometer)
-        )
-        simulation.context.computeVirtualSites()
-        state = simulation.context.getState(getEnergy=True)
-        energies.append(
-            state.getPotentialEnergy().value_in_unit(openmm.unit.kilojoule_per_mole)
-        )
+    with get_context_pool().context(openmm_system, "CPU") as context:
+        for distance in distances:
+            new_positions = openmm.unit.Quantity(
+                numpy.vstack(
+                    [
+                        openmm_positions[:n_positions_per_water, :].value_in_unit(
+                            openmm.unit.angstrom
+                        ),
+                        openmm_positions[n_positions_per_water:, :].value_in_unit(
+                            openmm.unit.angstrom
+                        )
+                        # only translate the second water in x
+                        + numpy.array([distance, 0, 0]),
+                    ]
+                ),
+                openmm.unit.angstrom,
+            )
+
+            context.setPositions(new_positions.value_in_unit(openmm.unit.nanometer))
+            context.computeVirtualSites()
+            state = context.getState(getEnergy=True)
+            energies.append(
+                state.getPotentialEnergy().value_in_unit(openmm.unit.kilojoule_per_mole)
+            )
 
     return energies
 
@@ -348,7 +758,8 @@ def evaluate_energy(
     system:
         The openmm system that should be used to evaluate the energies.
     topology:
-        The openmm topology that should be used to build the simulation object.
+        The openmm topology of the system. This is no longer needed now that the
+        energy is evaluated using a pooled context, but is kept for compatibility.
     positions:
         The positions that should be used when evaluating the energies.
 
@@ -357,17 +768,93 @@ def evaluate_energy(
     -------
         The energy in kcal/mol,
     """
-    integrator = openmm.LangevinIntegrator(
-        300 * openmm.unit.kelvin,  # simulation temperature,
-        1.0 / openmm.unit.picosecond,  # friction
-        2.0 * openmm.unit.femtoseconds,  # simulation timestep
+    with get_context_pool().context(system, "Reference") as context:
+        # assume the positions are already padded.
+        context.setPositions(positions)
+        context.computeVirtualSites()
+        state = context.getState(getEnergy=True)
+
+    return state.getPotentialEnergy().value_in_unit(openmm.unit.kilojoule_per_mole)
+
+
+def evaluate_energies(
+    system: openmm.System,
+    conformers: openmm.unit.Quantity,
+    box_vectors: Optional[openmm.unit.Quantity] = None,
+    platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "Reference",
+    compute_forces: bool = False,
+) -> Tuple[numpy.ndarray, Optional[numpy.ndarray]]:
+    """
+    Evaluate the energies, and optionally the forces, of a batch of conformers using a
+    single OpenMM context.
+
+    Parameters
+    ----------
+    system:
+        The openmm system that should be used to evaluate the energies.
+    conformers:
+        The coordinates of each conformer with shape=(n_conformers, n_particles, 3). If
+        the coordinates of the virtual sites are not included, i.e. n_particles is the
+        number of non-virtual particles in the system, they will be padded and computed
+        automatically.
+    box_vectors:
+        The optional box vectors to use for every conformer.
+    platform:
+        The platform to evaluate the energies using.
+    compute_forces:
+        Whether to also return the forces acting on each particle.
+
+    Returns
+    -------
+        The energies in kJ/mol with shape=(n_conformers,) and, if requested, the forces
+        in kJ/mol/nm with the same shape as ``conformers``.
+    """
+    coordinates = numpy.asarray(
+        ensure_quantity(conformers, "openmm").value_in_unit(openmm.unit.nanometer),
+        dtype=float,
     )
+    coordinates = coordinates.reshape(len(coordinates), -1, 3)
 
-    platform = openmm.Platform.getPlatformByName("Reference")
+    n_particles = system.getNumParticles()
 
-    simulation = openmm.app.Simulation(topology, system, integrator, platform)
-    # assume the positions are already padded.
-    simulation.context.setPositions(positions)
-    simulation.context.computeVirtualSites()
-    state = simulation.context.getState(getEnergy=True)
-    return state.getPotentialEnergy().value_in_unit(openmm.unit.kilojoule_per_mole)
+    particle_indices = numpy.arange(n_particles)
+
+    if coordinates.shape[1] != n_particles:
+        particle_indices = numpy.array(
+            [i for i in range(n_particles) if not system.isVirtualSite(i)], dtype=int
+        )
+
+        assert coordinates.shape[1] == len(particle_indices), (
+            "the conformers must contain the coordinates of either every particle or of "
+            "every non-virtual particle in the system."
+        )
+
+    energies = numpy.zeros(len(coordinates))
+    forces = numpy.zeros_like(coordinates) if compute_forces else None
+
+    positions = numpy.zeros((n_particles, 3))
+
+    with get_context_pool().context(system, platform) as context:
+        if box_vectors is not None:
+            box_vectors = ensure_quantity(box_vectors, "openmm")
+            context.setPeriodicBoxVectors(
+                box_vectors[0], box_vectors[1], box_vectors[2]
+            )
+
+        for i, conformer in enumerate(coordinates):
+            positions[particle_indices] = conformer
+
+            context.setPositions(positions)
+            context.computeVirtualSites()
+
+            state = context.getState(getEnergy=True, getForces=compute_forces)
+            energies[i] = state.getPotentialEnergy().value_in_unit(
+                openmm.unit.kilojoule_per_mole
+            )
+
+            if compute_forces:
+                forces[i] = state.getForces(asNumpy=True).value_in_unit(
+                    openmm.unit.kilojoule_per_mole / openmm.unit.nanometer
+                )[particle_indices]
+
+    return energies, forces
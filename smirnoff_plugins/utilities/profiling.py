@@ -0,0 +1,259 @@
+"""Utilities for profiling the cost of evaluating each force in an OpenMM system, and
+of evaluating alternative forms of a custom nonbonded energy expression."""
+import copy
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Union
+
+import numpy
+import openmm
+import openmm.unit
+from openff.units.openmm import ensure_quantity
+
+logger = logging.getLogger(__name__)
+
+_MAX_FORCE_GROUPS = 32
+
+# Roughly the number density of the atoms of liquid water.
+_BENCHMARK_DENSITY = 100.0  # nm^-3
+
+
+def _time_call(function: Callable[[], None], n_repeats: int) -> float:
+    """Return the mean wall-clock time of calling a function, after a warm-up call
+    which may include compiling any kernels it uses."""
+    function()
+
+    start = time.perf_counter()
+
+    for _ in range(n_repeats):
+        function()
+
+    return (time.perf_counter() - start) / n_repeats
+
+
+def profile_forces(
+    system: openmm.System,
+    positions: openmm.unit.Quantity,
+    box_vectors: Optional[openmm.unit.Quantity] = None,
+    platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "Reference",
+    n_repeats: int = 10,
+) -> List[Dict[str, Union[str, int, float]]]:
+    """Measure the cost of evaluating the forces of each force in a system, as well as
+    of applying its constraints and computing its virtual sites.
+
+    Each force is assigned to its own force group in a copy of the system, and the time
+    taken by ``getState(getForces=True, groups=1 << group)`` is averaged over a number
+    of repeats. The fixed overhead of calling ``getState`` is measured by requesting no
+    groups, subtracted from the time of each force and reported separately.
+
+    Parameters
+    ----------
+    system
+        The system to profile, e.g. as created by ``interchange.to_openmm``.
+    positions
+        The positions of every particle in the system, including virtual sites.
+    box_vectors
+        The optional box vectors, by default those of the system.
+    platform
+        The platform to profile the system on.
+    n_repeats
+        The number of times to evaluate each force.
+
+    Returns
+    -------
+        A row per force, as well as for the constraints, virtual sites and overhead
+        where relevant, containing its ``name``, ``type``, force ``group`` (or -1), the
+        mean ``time`` per evaluation in seconds and the ``fraction`` of the total.
+    """
+    if system.getNumForces() > _MAX_FORCE_GROUPS:
+        raise ValueError(
+            f"Only systems with at most {_MAX_FORCE_GROUPS} forces can be profiled, "
+            f"as each force must be assigned to its own force group."
+        )
+
+    system = copy.deepcopy(system)
+
+    for group, force in enumerate(system.getForces()):
+        force.setForceGroup(group)
+
+        if isinstance(force, openmm.NonbondedForce):
+            # Otherwise the reciprocal space part of PME may be left in a group that
+            # belongs to a different force.
+            force.setReciprocalSpaceForceGroup(group)
+
+    context = openmm.Context(
+        system,
+        openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds),
+        openmm.Platform.getPlatformByName(platform),
+    )
+
+    if box_vectors is not None:
+        box_vectors = ensure_quantity(box_vectors, "openmm")
+        context.setPeriodicBoxVectors(box_vectors[0], box_vectors[1], box_vectors[2])
+
+    context.setPositions(positions)
+
+    overhead_time = _time_call(
+        lambda: context.getState(getForces=True, groups=0), n_repeats
+    )
+
+    rows: List[Dict[str, Union[str, int, float]]] = []
+
+    for group, force in enumerate(system.getForces()):
+        force_time = _time_call(
+            lambda: context.getState(getForces=True, groups=1 << group), n_repeats
+        )
+
+        rows.append(
+            {
+                "name": force.getName(),
+                "type": force.__class__.__name__,
+                "group": group,
+                "time": max(force_time - overhead_time, 0.0),
+            }
+        )
+
+    if system.getNumConstraints() > 0:
+        rows.append(
+            {
+                "name": "Constraints",
+                "type": "Constraints",
+                "group": -1,
+                "time": _time_call(lambda: context.applyConstraints(1.0e-5), n_repeats),
+            }
+        )
+
+    if any(system.isVirtualSite(i) for i in range(system.getNumParticles())):
+        rows.append(
+            {
+                "name": "VirtualSites",
+                "type": "VirtualSites",
+                "group": -1,
+                "time": _time_call(context.computeVirtualSites, n_repeats),
+            }
+        )
+
+    rows.append(
+        {"name": "Overhead", "type": "Overhead", "group": -1, "time": overhead_time}
+    )
+
+    total_time = sum(float(row["time"]) for row in rows)
+
+    for row in rows:
+        row["fraction"] = float(row["time"]) / total_time if total_time > 0.0 else 0.0
+
+    return rows
+
+
+def format_force_profile(rows: List[Dict[str, Union[str, int, float]]]) -> str:
+    """Format the rows returned by ``profile_forces`` as a table, ordered from the most
+    to the least expensive."""
+    rows = sorted(rows, key=lambda row: -float(row["time"]))
+
+    name_width = max([len("Name")] + [len(str(row["name"])) for row in rows])
+    type_width = max([len("Type")] + [len(str(row["type"])) for row in rows])
+
+    lines = [
+        f"{'Name':<{name_width}}  {'Type':<{type_width}}  {'Group':>5}  "
+        f"{'Time (ms)':>10}  {'Fraction':>8}"
+    ]
+    lines.extend(
+        f"{row['name']:<{name_width}}  {row['type']:<{type_width}}  "
+        f"{row['group']:>5}  {float(row['time']) * 1000.0:>10.3f}  "
+        f"{float(row['fraction']) * 100.0:>7.1f}%"
+        for row in rows
+    )
+
+    return "\n".join(lines)
+
+
+def benchmark_expression(
+    expression: str,
+    per_particle_parameters: Iterable[str],
+    global_parameters: Dict[str, float],
+    particle_parameters: numpy.ndarray,
+    cutoff: float = 0.9,
+    n_particles: int = 2000,
+    platform: Literal["Reference", "OpenCL", "CUDA", "CPU"] = "CPU",
+    n_repeats: int = 10,
+) -> float:
+    """Measure the cost of evaluating the energy and forces of a periodic box of
+    particles which interact through a custom nonbonded energy expression.
+
+    The particles are placed on a slightly perturbed cubic lattice at roughly the
+    density of the atoms of liquid water, and cycle through the rows of the per-particle
+    parameters.
+
+    Parameters
+    ----------
+    expression
+        The OpenMM energy expression, including its intermediate definitions.
+    per_particle_parameters
+        The names of the per-particle parameters.
+    global_parameters
+        The values of every global parameter referenced by the expression.
+    particle_parameters
+        The values of the per-particle parameters with shape=(n_types, n_parameters).
+    cutoff
+        The cutoff [nm].
+    n_particles
+        The number of particles in the box.
+    platform
+        The platform to evaluate the expression on.
+    n_repeats
+        The number of times to evaluate the expression.
+
+    Returns
+    -------
+        The mean time per evaluation in seconds.
+    """
+    particle_parameters = numpy.asarray(particle_parameters, dtype=float)
+    particle_parameters = particle_parameters.reshape(len(particle_parameters), -1)
+
+    box_length = max((n_particles / _BENCHMARK_DENSITY) ** (1.0 / 3.0), 2.0 * cutoff)
+
+    n_per_side = int(math.ceil(n_particles ** (1.0 / 3.0)))
+    spacing = box_length / n_per_side
+
+    lattice = numpy.stack(
+        numpy.meshgrid(*[numpy.arange(n_per_side)] * 3, indexing="ij"), axis=-1
+    ).reshape(-1, 3)[:n_particles]
+
+    random = numpy.random.default_rng(0)
+    positions = (lattice + 0.5) * spacing + random.uniform(
+        -0.1 * spacing, 0.1 * spacing, (n_particles, 3)
+    )
+
+    force = openmm.CustomNonbondedForce(expression)
+    force.setNonbondedMethod(openmm.CustomNonbondedForce.CutoffPeriodic)
+    force.setCutoffDistance(cutoff)
+
+    for name in per_particle_parameters:
+        force.addPerParticleParameter(name)
+    for name, value in global_parameters.items():
+        force.addGlobalParameter(name, value)
+
+    system = openmm.System()
+    system.setDefaultPeriodicBoxVectors(
+        openmm.Vec3(box_length, 0.0, 0.0),
+        openmm.Vec3(0.0, box_length, 0.0),
+        openmm.Vec3(0.0, 0.0, box_length),
+    )
+
+    for i in range(n_particles):
+        system.addParticle(1.0)
+        force.addParticle(particle_parameters[i % len(particle_parameters)].tolist())
+
+    system.addForce(force)
+
+    context = openmm.Context(
+        system,
+        openmm.VerletIntegrator(1.0 * openmm.unit.femtoseconds),
+        openmm.Platform.getPlatformByName(platform),
+    )
+    context.setPositions(positions * openmm.unit.nanometers)
+
+    return _time_call(
+        lambda: context.getState(getEnergy=True, getForces=True), n_repeats
+    )
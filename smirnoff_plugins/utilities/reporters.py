@@ -0,0 +1,135 @@
+"""OpenMM reporters which hand the reported states to a background thread, so that the
+simulation does not wait on the filesystem between steps."""
+import logging
+import queue
+import threading
+from typing import Any, Optional
+
+import openmm
+import openmm.app
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _flush_output(reporter: Any):
+    """Flush the file that a built-in OpenMM reporter writes to, if it has one."""
+    output = getattr(reporter, "_out", None)
+
+    if output is not None and hasattr(output, "flush") and not output.closed:
+        output.flush()
+
+
+def flush_reporter(reporter: Any):
+    """Make sure every state reported so far by a reporter has been written to disk,
+    waiting for the writer thread of an ``AsyncReporter``."""
+    if isinstance(reporter, AsyncReporter):
+        reporter.flush()
+    else:
+        _flush_output(reporter)
+
+
+class _SimulationSnapshot:
+    """A view of a simulation which records the step it was reported at, and otherwise
+    forwards every attribute to the simulation itself.
+
+    Reporters commonly read ``currentStep`` when writing a state, which would otherwise
+    have moved on by the time the background thread writes it.
+    """
+
+    def __init__(self, simulation: openmm.app.Simulation):
+        self._simulation = simulation
+        self.currentStep = simulation.currentStep
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._simulation, name)
+
+
+class AsyncReporter:
+    """Wrap an OpenMM reporter so that its states are written by a background thread.
+
+    Each reported state, which OpenMM has already copied out of the context, is placed
+    in a bounded buffer and written in order by a writer thread. The simulation only
+    waits when the buffer is full, which provides backpressure if the writer cannot
+    keep up.
+
+    The reporter must be closed once the simulation has finished, ideally through a
+    ``with`` block or ``try`` / ``finally``, which writes any buffered states and
+    raises any error encountered by the writer thread.
+
+    Parameters
+    ----------
+    reporter
+        The reporter to write the states with, e.g. a ``DCDReporter``.
+    buffer_size
+        The maximum number of states which may be waiting to be written.
+    """
+
+    def __init__(self, reporter: Any, buffer_size: int = 32):
+        assert buffer_size > 0, "the buffer must be able to store at least one state."
+
+        self.reporter = reporter
+
+        self._buffer: "queue.Queue[Any]" = queue.Queue(maxsize=buffer_size)
+        self._error: Optional[BaseException] = None
+
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "AsyncReporter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write(self):
+        while True:
+            item = self._buffer.get()
+
+            try:
+                if item is _STOP:
+                    return
+
+                # Keep draining the buffer after an error so the simulation is never
+                # blocked, but skip any further writes.
+                if self._error is None:
+                    self.reporter.report(*item)
+
+            except BaseException as e:
+                logger.exception("Failed to write a reported state.")
+                self._error = e
+
+            finally:
+                self._buffer.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def describeNextReport(self, simulation: openmm.app.Simulation):
+        return self.reporter.describeNextReport(simulation)
+
+    def report(self, simulation: openmm.app.Simulation, state: openmm.State):
+        self._raise_error()
+        self._buffer.put((_SimulationSnapshot(simulation), state))
+
+    def flush(self):
+        """Wait for every buffered state to be written and flush the output, while
+        leaving the reporter open."""
+        if self._thread.is_alive():
+            self._buffer.join()
+
+        _flush_output(self.reporter)
+        self._raise_error()
+
+    def close(self):
+        """Wait for every buffered state to be written, flush the output and stop the
+        writer thread."""
+        if self._thread.is_alive():
+            self._buffer.put(_STOP)
+            self._thread.join()
+
+        _flush_output(self.reporter)
+        self._raise_error()
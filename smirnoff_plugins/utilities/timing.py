@@ -0,0 +1,51 @@
+"""Utilities for recording the wall-clock time spent in each phase of a workflow."""
+import contextlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimer:
+    """Accumulate the wall-clock time spent in named phases, alongside any extra
+    metrics that should be reported with them.
+
+    Entering the same phase more than once adds to its total, so that e.g. every block
+    of MD between checkpoints counts towards a single phase.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.metrics: Dict[str, Any] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as part of a phase."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+            logger.debug(f"{name} took {elapsed:.3f} seconds")
+
+    @property
+    def total(self) -> float:
+        """The total wall-clock time in seconds of every phase."""
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": dict(self.phases),
+            "total": self.total,
+            **self.metrics,
+        }
+
+    def write(self, path: str):
+        """Write the timings and metrics to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)